@@ -0,0 +1,237 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from stub_server import USER_PASSWORD, StubBroker
+
+from kstock_account.mirae import MiraeAccount
+from kstock_account.symbols import SymbolCache, SymbolResolver
+from kstock_account.tokens import FileTokenStore
+from kstock_account.transport import MiraeTransport
+from kstock_account.utils import convert_to_yfinance_symbol
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def main() -> None:
+    """Runs the benchmarks and writes the results to a JSON file."""
+    parser = argparse.ArgumentParser(description="Benchmark kstock-account against a local stub broker.")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="the JSON file to write, defaults to a timestamped file in results/",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="the number of timed runs of each benchmark")
+    parser.add_argument("--latency", type=float, default=5.0, help="the latency of each stub response in milliseconds")
+    parser.add_argument("--compare", type=Path, help="an earlier results file to compare the medians with")
+    parser.add_argument("--only", help="run only the benchmarks whose name contains this string")
+    args = parser.parse_args()
+
+    results: list[dict[str, Any]] = []
+    with StubBroker(latency=args.latency / 1000) as broker:
+        for benchmark in _benchmarks(broker):
+            if args.only and args.only not in benchmark["name"]:
+                continue
+            result = _measure(broker, args.repeat, **benchmark)
+            print(f"{result['name']:<40} median {result['median'] * 1000:10.2f} ms", file=sys.stderr)
+            results.append(result)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "commit": _git_commit(),
+        "repeat": args.repeat,
+        "latency_ms": args.latency,
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"wrote {output}", file=sys.stderr)
+    if args.compare:
+        _compare(json.loads(args.compare.read_text(encoding="utf-8")), report)
+
+
+def _benchmarks(broker: StubBroker) -> list[dict[str, Any]]:
+    benchmarks: list[dict[str, Any]] = []
+    end_date = date(2024, 6, 30)
+    for years in (1, 5, 10):
+        start_date = end_date - timedelta(days=365 * years)
+        for max_workers in (1, 8):
+            benchmarks.append(
+                {
+                    "name": f"get_history[{years}y,workers={max_workers}]",
+                    "params": {"years": years, "max_workers": max_workers},
+                    "setup": partial(_account, broker),
+                    "run": partial(_get_history, start_date, end_date, max_workers),
+                },
+            )
+    for holdings in (10, 100, 1000):
+        benchmarks.append(
+            {
+                "name": f"get_assets[{holdings},cold]",
+                "params": {"holdings": holdings, "symbol_cache": "cold"},
+                "setup": partial(_account, broker, holdings),
+                "run": lambda account: len(account.get_assets()),
+            },
+        )
+        benchmarks.append(
+            {
+                "name": f"get_assets[{holdings},warm]",
+                "params": {"holdings": holdings, "symbol_cache": "warm"},
+                "setup": partial(_warm_account, broker, holdings),
+                "run": lambda account: len(account.get_assets()),
+            },
+        )
+        benchmarks.append(
+            {
+                "name": f"get_assets_frame[{holdings},warm]",
+                "params": {"holdings": holdings, "symbol_cache": "warm"},
+                "setup": partial(_warm_account, broker, holdings),
+                "run": lambda account: len(account.get_assets_frame()),
+            },
+        )
+    benchmarks.append(
+        {
+            "name": "login[fresh]",
+            "params": {"token_store": "empty"},
+            "setup": lambda: FileTokenStore(Path(tempfile.mkdtemp()) / "tokens.json"),
+            "run": partial(_login, broker),
+        },
+    )
+    benchmarks.append(
+        {
+            "name": "login[token_reuse]",
+            "params": {"token_store": "saved"},
+            "setup": partial(_saved_token_store, broker),
+            "run": partial(_login, broker),
+        },
+    )
+    benchmarks.append(
+        {
+            "name": "import[kstock_account.mirae]",
+            "params": {"module": "kstock_account.mirae"},
+            "setup": lambda: None,
+            "run": lambda _: _import_time("kstock_account.mirae"),
+            "timer": "reported",
+        },
+    )
+    return benchmarks
+
+
+def _measure(
+    broker: StubBroker,
+    repeat: int,
+    name: str,
+    params: dict[str, Any],
+    setup: Callable[[], Any],
+    run: Callable[[Any], Any],
+    timer: str = "wall",
+) -> dict[str, Any]:
+    times: list[float] = []
+    requests: list[int] = []
+    items: Optional[int] = None
+    for _ in range(repeat):
+        state = setup()
+        request_count = broker.request_count
+        started_at = time.perf_counter()
+        outcome = run(state)
+        elapsed = time.perf_counter() - started_at
+        times.append(outcome if timer == "reported" else elapsed)
+        requests.append(broker.request_count - request_count)
+        if timer != "reported":
+            items = outcome
+    median = statistics.median(times)
+    result = {
+        "name": name,
+        "params": params,
+        "times": times,
+        "min": min(times),
+        "median": median,
+        "mean": statistics.fmean(times),
+        "requests": statistics.median(requests),
+    }
+    if items:
+        result["items"] = items
+        result["items_per_second"] = items / median
+    return result
+
+
+def _account(broker: StubBroker, holdings: int = 10) -> MiraeAccount:
+    broker.holdings = holdings
+    resolver = SymbolResolver(
+        SymbolCache(":memory:"),
+        partial(convert_to_yfinance_symbol, search_url=broker.yahoo_search_url),
+    )
+    return MiraeAccount("stub", transport=MiraeTransport("stub", base_url=broker.url), symbol_resolver=resolver)
+
+
+def _warm_account(broker: StubBroker, holdings: int) -> MiraeAccount:
+    account = _account(broker, holdings)
+    account.get_equity_assets()
+    return account
+
+
+def _get_history(start_date: date, end_date: date, max_workers: int, account: MiraeAccount) -> int:
+    return len(account.get_history(start_date, end_date, max_workers=max_workers))
+
+
+def _saved_token_store(broker: StubBroker) -> FileTokenStore:
+    token_store = FileTokenStore(Path(tempfile.mkdtemp()) / "tokens.json")
+    _login(broker, token_store)
+    return token_store
+
+
+def _login(broker: StubBroker, token_store: FileTokenStore) -> int:
+    MiraeAccount.login(
+        "user",
+        USER_PASSWORD,
+        webdriver_fn=_no_webdriver,
+        transport=MiraeTransport(base_url=broker.url),
+        token_store=token_store,
+        http_login=True,
+    )
+    return 1
+
+
+def _no_webdriver() -> Any:
+    raise RuntimeError("the benchmarks never start a browser")
+
+
+def _import_time(module: str) -> float:
+    code = f"import time; started_at = time.perf_counter(); import {module}; print(time.perf_counter() - started_at)"
+    return float(subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(baseline: dict[str, Any], report: dict[str, Any]) -> None:
+    medians = {result["name"]: result["median"] for result in baseline["results"]}
+    for result in report["results"]:
+        if (before := medians.get(result["name"])) is not None:
+            print(f"{result['name']:<40} {result['median'] / before:6.2f}x of {baseline.get('commit')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import json
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+ACCESS_TOKEN = "stub-access-token"
+"""The access token the stub login hands out."""
+
+USER_PASSWORD = "password"
+"""The password the stub login accepts, for any user ID."""
+
+
+class StubBroker:
+    """A local HTTP server that answers like the Mirae Asset Securities API.
+
+    The responses are synthetic but have the shape of the real ones, including
+    the `grid01`/`GRID01` tables, so the full request and parsing path of
+    `MiraeAccount` can be measured without a network. The server also serves
+    the login form, which accepts `USER_PASSWORD`, and the Yahoo Finance
+    search endpoint.
+
+    Attributes:
+        holdings (int): The number of equities in the `a03` response.
+        accounts (int): The number of accounts in the account list.
+        latency (float): The delay in seconds added to every API response.
+        request_count (int): The number of requests served so far.
+    """
+
+    def __init__(self, holdings: int = 10, accounts: int = 2, latency: float = 0.0) -> None:
+        """Constructs a StubBroker instance.
+
+        Args:
+            holdings (int, optional): The number of equities held. Defaults to 10.
+            accounts (int, optional): The number of accounts. Defaults to 2.
+            latency (float, optional): The delay in seconds added to every API response. Defaults to 0.
+        """
+        self.holdings = holdings
+        self.accounts = accounts
+        self.latency = latency
+        self.request_count = 0
+        self._bodies: dict[tuple[Any, ...], bytes] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        """The base URL of the running server."""
+        if self._server is None:
+            raise RuntimeError("the server is not running")
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def yahoo_search_url(self) -> str:
+        """The URL of the stub Yahoo Finance search endpoint."""
+        return self.url + "/v1/finance/search"
+
+    def start(self) -> "StubBroker":
+        """Starts serving on a free local port in a daemon thread."""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubBroker":
+        """Starts the server."""
+        return self.start()
+
+    def __exit__(self, *args: object) -> None:
+        """Stops the server."""
+        self.stop()
+
+    def respond(self, path: str, form: dict[str, str]) -> bytes:
+        """Returns the response body for a POST request."""
+        if path.endswith("/a01.json"):
+            return json.dumps(_holding_period_record(form)).encode()
+        key = (path, form.get("pd_tcd"), self.holdings, self.accounts)
+        with self._lock:
+            body = self._bodies.get(key)
+        if body is None:
+            body = json.dumps(self._payload(path, form)).encode()
+            with self._lock:
+                self._bodies[key] = body
+        return body
+
+    def _payload(self, path: str, form: dict[str, str]) -> Any:
+        account_numbers = [f"{10000000000 + i * 1111:011d}" for i in range(self.accounts)]
+        if path.endswith("/getMyAccountListData.json"):
+            return {"grid01": [{"acno": account_number} for account_number in account_numbers]}
+        if path.endswith("/a11.json"):
+            return {
+                "GRID01": [
+                    {"acno": account_numbers[0], "curr_cd": "USD", "bas_exr": "1380.5", "mnyo_abl_a": "1380500"},
+                ],
+            }
+        if path.endswith("/a05.json"):
+            return {
+                "grid01": [
+                    {
+                        "acno": account_numbers[0],
+                        "rp_pd_nm": "RP",
+                        "curr_cd": "KRW",
+                        "ea": "1000000",
+                        "frc_ea": "1000000",
+                        "rpc_parg_dt": "20241231",
+                        "frc_rp_ctrt_a": "990000",
+                    },
+                ],
+            }
+        if path.endswith("/a03.json") and form.get("pd_tcd") == "04":
+            return {"grid01": [_holding(account_numbers[0], "KRX Gold", "04020000", 0)]}
+        if path.endswith("/a03.json"):
+            return {
+                "grid01": [
+                    _holding(account_numbers[i % self.accounts], f"Equity {i}", f"A{i + 1:06d}", i)
+                    for i in range(self.holdings)
+                ],
+            }
+        return {}
+
+
+def _handler(broker: StubBroker) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            (path, _, query) = self.path.partition("?")
+            if path == "/v1/finance/search":
+                symbol = urllib.parse.parse_qs(query)["q"][0]
+                quote = f"{symbol}.KS" if symbol.isdigit() else symbol
+                self._send(json.dumps({"quotes": [{"symbol": quote}]}).encode(), "application/json")
+            else:
+                self._send(_LOGIN_FORM, "text/html")
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            form = {key: values[0] for (key, values) in urllib.parse.parse_qs(self.rfile.read(length).decode()).items()}
+            if self.path == "/mw/loginProc.do":
+                # A rejected login is sent back to the login form, but still gets a session cookie.
+                accepted = form.get("clt_ecp_pwd") == USER_PASSWORD
+                self.send_response(302)
+                self.send_header("Location", "/mw/main.do" if accepted else "/mw/login.do")
+                self.send_header("Set-Cookie", f"MIREADW_D={ACCESS_TOKEN if accepted else 'anonymous'}; Path=/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if broker.latency > 0:
+                time.sleep(broker.latency)
+            self._send(broker.respond(self.path, form), "application/json")
+
+        def _send(self, body: bytes, content_type: str) -> None:
+            with broker._lock:
+                broker.request_count += 1
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def _holding(account_number: str, name: str, symbol: str, i: int) -> dict[str, str]:
+    quantity = 1 + i % 50
+    price = 10000 + (i * 37) % 90000
+    return {
+        "admn_acno": account_number,
+        "itm_nm1": name,
+        "curr_cd": "KRW",
+        "ea": str(quantity * price),
+        "pitm_ea": str(quantity * price),
+        "itm_no": symbol,
+        "hldg_q": str(quantity),
+        "pchs_a1": str(quantity * (price - 500)),
+    }
+
+
+def _holding_period_record(form: dict[str, str]) -> dict[str, str]:
+    day = datetime.strptime(form["strt_dt"], "%Y%m%d").toordinal()
+    initial_value = 100_000_000 + (day * 7919) % 5_000_000
+    return {
+        "bss_ea": str(initial_value),
+        "eot_ea": str(initial_value + (day * 104729) % 2_000_000 - 1_000_000),
+        "mnyi_a": str((day % 3) * 100_000),
+        "inq_a": "0",
+        "mnyo_a": str((day % 5) * 50_000),
+        "outq_a": "0",
+    }
+
+
+_LOGIN_FORM = (
+    b'<html><body><form id="loginForm" action="/mw/loginProc.do" method="post">'
+    b'<input type="hidden" name="csrf" value="stub">'
+    b'<input id="usid" name="usid"><input id="clt_ecp_pwd" name="clt_ecp_pwd" type="password">'
+    b"</form></body></html>"
+)
@@ -4,7 +4,7 @@ from matplotlib import pyplot as plt
 import numpy as np
 import pandas as pd
 from scipy.cluster.hierarchy import dendrogram, linkage, to_tree
-from .common import download_weekly_prices
+from .common import price_loader
 
 
 def cluster_variance(covs, cluster):
@@ -26,7 +26,7 @@ equities = sorted(
 
 equity_names = {equity.symbol: equity.name for equity in equities}
 
-prices = pd.concat([download_weekly_prices(equity.symbol, start_date, end_date) for equity in equities], axis=1)
+prices = price_loader.get_weekly_prices_frame([equity.symbol for equity in equities], start_date, end_date)
 returns = prices.pct_change(fill_method=None).dropna()
 
 corrs = returns.corr()
@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 from kstock_account.mirae import MiraeAccount
 import numpy as np
 import pandas as pd
-from .common import capm_expected_return, download_weekly_prices
+from .common import capm_engine, market_risk_free_rates, market_risk_premiums, price_loader
 
 end_date = datetime.now().date() - timedelta(days=1)
 start_date = end_date - timedelta(weeks=52)
@@ -11,12 +11,19 @@ start_date = end_date - timedelta(weeks=52)
 account = MiraeAccount.login("", "")
 equities = account.get_equity_assets()
 equities = sorted(equities, key=lambda x: x.market_value * x.exchange_rate, reverse=True)
-equity_prices = pd.concat([download_weekly_prices(equity.symbol, start_date, end_date) for equity in equities], axis=1)
+equity_prices = price_loader.get_weekly_prices_frame([equity.symbol for equity in equities], start_date, end_date)
 equity_returns = equity_prices.pct_change(fill_method=None).dropna()
 equity_covs = equity_returns.cov() * 52
 
 equity_expected_returns = pd.Series(
-    [capm_expected_return(equity.symbol, equity.currency[0:2], start_date, end_date) for equity in equities],
+    capm_engine.expected_returns(
+        [equity.symbol for equity in equities],
+        [equity.currency[0:2] for equity in equities],
+        start_date,
+        end_date,
+        market_risk_free_rates,
+        market_risk_premiums,
+    ),
     index=[equity.name for equity in equities],
 )
 print("Expected Return:")
@@ -3,7 +3,7 @@ from kstock_account.mirae import MiraeAccount
 import math
 import numpy as np
 import pandas as pd
-from .common import download_weekly_prices
+from .common import price_loader
 
 end_date = datetime.now().date() - timedelta(days=1)
 start_date = end_date - timedelta(weeks=52)
@@ -15,7 +15,7 @@ portfolio_returns = pd.Series(
     index=[record.end_date for record in account_history],
 )
 
-market_prices = download_weekly_prices("VT", start_date, end_date)
+market_prices = price_loader.get_weekly_prices_frame(["VT"], start_date, end_date)["VT"]
 market_returns = market_prices.pct_change(fill_method=None).dropna()
 
 portfolio_period_return = np.cumprod([1 + n for n in portfolio_returns.values])[-1] - 1
@@ -0,0 +1,248 @@
+import threading
+from collections.abc import Mapping, Sequence
+from datetime import date
+from typing import Literal, Optional
+
+import numpy as np
+
+from kstock_account.prices import PriceLoader
+
+MARKET_INDICES = {
+    "US": "^GSPC",
+    "KR": "^KS11",
+    "JP": "^N225",
+}
+"""The yfinance symbol of the market index of each country.
+
+Countries are keyed like the first two letters of a currency code, such as
+`KR` for a `KRW` holding.
+"""
+
+ReturnFrequency = Literal["D", "W"]
+"""The frequency of returns: daily, or W-FRI weekly."""
+
+
+class CapmEngine:
+    """An estimator of CAPM betas and expected returns for many holdings at once.
+
+    The prices of every holding are loaded as one panel, and the betas of all
+    holdings are computed with one masked matrix operation, each column against
+    the returns of the market index of its country. Each beta uses the periods in
+    which both the holding and the index have a return, as a pairwise
+    `pandas.concat(...).dropna()` would. Market returns are memoized by index,
+    date range and frequency for the life of the engine.
+
+    Attributes:
+        loader (PriceLoader): The loader of price panels.
+        indices (Mapping[str, str]): The market index of each country.
+    """
+
+    def __init__(self, loader: Optional[PriceLoader] = None, indices: Mapping[str, str] = MARKET_INDICES) -> None:
+        """Constructs a CapmEngine instance.
+
+        Args:
+            loader (Optional[PriceLoader]): The loader of price panels. Defaults to a
+                `PriceLoader` with the default provider and store.
+            indices (Mapping[str, str], optional): The market index of each country.
+                Defaults to `MARKET_INDICES`.
+        """
+        self.loader = loader or PriceLoader()
+        self.indices = indices
+        self._market_returns: dict[tuple[str, date, date, str], tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def market_returns(
+        self,
+        country: str,
+        start_date: date,
+        end_date: date,
+        frequency: ReturnFrequency = "W",
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the returns of the market index of a country.
+
+        Args:
+            country (str): The country, such as `KR`.
+            start_date (date): The first date.
+            end_date (date): The date after the last one.
+            frequency (ReturnFrequency, optional): The frequency of returns. Defaults to `"W"`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The date of each period and the return of
+            the index over it, NaN if the index has no price in it or the one before.
+        """
+        index = self.indices[country]
+        self._load_panel([], [], [index], start_date, end_date, frequency)
+        return self._market_returns[(index, start_date, end_date, frequency)]
+
+    def betas(
+        self,
+        symbols: Sequence[str],
+        countries: Sequence[str],
+        start_date: date,
+        end_date: date,
+        frequency: ReturnFrequency = "W",
+    ) -> np.ndarray:
+        """Returns the beta of each holding against the market index of its country.
+
+        Args:
+            symbols (Sequence[str]): The yfinance symbol of each holding.
+            countries (Sequence[str]): The country of each holding, such as `KR`.
+            start_date (date): The first date.
+            end_date (date): The date after the last one.
+            frequency (ReturnFrequency, optional): The frequency of returns. Defaults to `"W"`.
+
+        Returns:
+            np.ndarray: The beta of each holding, NaN if it shares fewer than two
+            returns with its market index.
+        """
+        (_, returns, market_returns) = self._load_holdings(symbols, countries, start_date, end_date, frequency)
+        if len(returns) == 0:
+            return np.full(len(symbols), np.nan)
+        betas: np.ndarray = _windowed_betas(returns, market_returns, len(returns))[-1]
+        return betas
+
+    def expected_returns(
+        self,
+        symbols: Sequence[str],
+        countries: Sequence[str],
+        start_date: date,
+        end_date: date,
+        risk_free_rates: Mapping[str, float],
+        risk_premiums: Mapping[str, float],
+        frequency: ReturnFrequency = "W",
+    ) -> np.ndarray:
+        """Returns the CAPM expected return of each holding.
+
+        The expected return of a holding is `risk_free_rate + beta * risk_premium`
+        with the rate and the premium of its country.
+
+        Args:
+            symbols (Sequence[str]): The yfinance symbol of each holding.
+            countries (Sequence[str]): The country of each holding, such as `KR`.
+            start_date (date): The first date of the returns the betas are estimated from.
+            end_date (date): The date after the last one.
+            risk_free_rates (Mapping[str, float]): The risk-free rate of each country.
+            risk_premiums (Mapping[str, float]): The market risk premium of each country.
+            frequency (ReturnFrequency, optional): The frequency of returns. Defaults to `"W"`.
+
+        Returns:
+            np.ndarray: The expected return of each holding.
+        """
+        betas = self.betas(symbols, countries, start_date, end_date, frequency)
+        rates = np.array([risk_free_rates[country] for country in countries], dtype="f8")
+        premiums = np.array([risk_premiums[country] for country in countries], dtype="f8")
+        expected_returns: np.ndarray = rates + betas * premiums
+        return expected_returns
+
+    def rolling_betas(
+        self,
+        symbols: Sequence[str],
+        countries: Sequence[str],
+        start_date: date,
+        end_date: date,
+        window: int,
+        frequency: ReturnFrequency = "W",
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the betas of each holding over every window of consecutive periods.
+
+        The sums a beta is made of are accumulated once over the whole range, so
+        the betas of all windows are differences of them rather than one
+        regression per window.
+
+        Args:
+            symbols (Sequence[str]): The yfinance symbol of each holding.
+            countries (Sequence[str]): The country of each holding, such as `KR`.
+            start_date (date): The first date.
+            end_date (date): The date after the last one.
+            window (int): The number of periods in a window.
+            frequency (ReturnFrequency, optional): The frequency of returns. Defaults to `"W"`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The date of the last period of each window
+            and a `(windows, holdings)` array of betas.
+
+        Raises:
+            ValueError: If `window` is less than 2.
+        """
+        if window < 2:
+            raise ValueError("a window must span at least 2 periods")
+        (dates, returns, market_returns) = self._load_holdings(symbols, countries, start_date, end_date, frequency)
+        if len(returns) < window:
+            return (dates[:0], np.empty((0, len(symbols))))
+        return (dates[window - 1 :], _windowed_betas(returns, market_returns, window))
+
+    def clear(self) -> None:
+        """Discards the memoized market returns."""
+        with self._lock:
+            self._market_returns.clear()
+
+    def _load_holdings(
+        self,
+        symbols: Sequence[str],
+        countries: Sequence[str],
+        start_date: date,
+        end_date: date,
+        frequency: ReturnFrequency,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if len(symbols) != len(countries):
+            raise ValueError("symbols and countries must have the same length")
+        indices = [self.indices[country] for country in countries]
+        return self._load_panel(symbols, indices, list(dict.fromkeys(indices)), start_date, end_date, frequency)
+
+    def _load_panel(
+        self,
+        symbols: Sequence[str],
+        indices: Sequence[str],
+        wanted: Sequence[str],
+        start_date: date,
+        end_date: date,
+        frequency: ReturnFrequency,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # The indices that are not memoized yet are loaded in the same batch as the holdings.
+        with self._lock:
+            missing = [
+                index for index in wanted if (index, start_date, end_date, frequency) not in self._market_returns
+            ]
+        load = self.loader.get_weekly_prices if frequency == "W" else self.loader.get_daily_prices
+        (dates, prices) = load([*symbols, *missing], start_date, end_date)
+        returns = _returns(prices, skip_gaps=frequency == "D")
+        with self._lock:
+            for i, index in enumerate(missing, len(symbols)):
+                valid = ~np.isnan(prices[:, i]) if frequency == "D" else np.ones(len(dates), dtype=bool)
+                self._market_returns[(index, start_date, end_date, frequency)] = (dates[valid], returns[valid, i])
+            market = [self._market_returns[(index, start_date, end_date, frequency)] for index in indices]
+        market_returns = np.full((len(dates), len(symbols)), np.nan)
+        for i, (index_dates, index_returns) in enumerate(market):
+            positions = np.searchsorted(dates, index_dates)
+            found = positions < len(dates)
+            found[found] = dates[positions[found]] == index_dates[found]
+            market_returns[positions[found], i] = index_returns[found]
+        return (dates, returns[:, : len(symbols)], market_returns)
+
+
+def _returns(prices: np.ndarray, skip_gaps: bool) -> np.ndarray:
+    returns = np.full(prices.shape, np.nan)
+    if len(prices) < 2:
+        return returns
+    if skip_gaps:
+        # Daily returns are taken from the last earlier price, as on the symbol's own trading dates.
+        rows = np.arange(len(prices))[:, None]
+        previous = np.maximum.accumulate(np.where(np.isnan(prices), -1, rows), axis=0)[:-1]
+        base = np.where(previous >= 0, prices[np.maximum(previous, 0), np.arange(prices.shape[1])], np.nan)
+    else:
+        base = prices[:-1]
+    returns[1:] = prices[1:] / base - 1
+    return returns
+
+
+def _windowed_betas(returns: np.ndarray, market_returns: np.ndarray, window: int) -> np.ndarray:
+    valid = ~(np.isnan(returns) | np.isnan(market_returns))
+    (x, y) = (np.where(valid, market_returns, 0.0), np.where(valid, returns, 0.0))
+    sums = [
+        np.concatenate([np.zeros((1, returns.shape[1])), np.cumsum(column, axis=0)])
+        for column in (valid.astype("f8"), x, y, x * x, x * y)
+    ]
+    (n, sx, sy, sxx, sxy) = (total[window:] - total[:-window] for total in sums)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        betas = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    return np.where(n >= 2, betas, np.nan)
@@ -0,0 +1,64 @@
+import json
+from functools import cache
+from importlib.util import find_spec
+from typing import Any, Callable, Optional, Union
+
+
+@cache
+def json_backend() -> str:
+    """Returns the name of the package that decodes responses.
+
+    `orjson` or `msgspec` is used when installed, which `orjson` is with the
+    `fast` extra, and the standard library `json` otherwise. The packages are
+    imported on the first decode, so importing this module stays cheap.
+
+    Returns:
+        str: `orjson`, `msgspec` or `json`.
+    """
+    for name in ("orjson", "msgspec"):
+        if find_spec(name) is not None:
+            return name
+    return "json"
+
+
+def loads(content: Union[bytes, str]) -> Any:
+    """Decode a JSON document with the fastest available package.
+
+    Args:
+        content (Union[bytes, str]): The UTF-8 encoded or decoded JSON document.
+
+    Returns:
+        Any: The decoded document.
+
+    Raises:
+        ValueError: If the document is not valid JSON.
+    """
+    backend = json_backend()
+    if backend == "orjson":
+        import orjson
+
+        return orjson.loads(content)
+    if backend == "msgspec":
+        import msgspec
+
+        try:
+            return msgspec.json.decode(content)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e))
+    return json.loads(content)
+
+
+def json_decoder(content: bytes, encoding: Optional[str], fallback: Callable[[], Any]) -> Callable[[], Any]:
+    """Returns the function that decodes a response body.
+
+    Args:
+        content (bytes): The response body.
+        encoding (Optional[str]): The charset of the response, if known.
+        fallback (Callable[[], Any]): The decoder of the HTTP client, such as `requests.Response.json`.
+
+    Returns:
+        Callable[[], Any]: `loads` of the body if it is UTF-8, and `fallback` otherwise.
+    """
+    if encoding is None or encoding.lower().replace("-", "").replace("_", "") in ("utf8", "ascii", "usascii"):
+        return lambda: loads(content)
+    return fallback
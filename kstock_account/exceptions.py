@@ -1,6 +1,155 @@
+from datetime import date
+from typing import Optional
+
+from kstock_account.schemas import HoldingPeriodRecord
+
+
 class LoginFailedException(Exception):
     """Exception raised when login fails.
 
     This exception is raised when the login attempt to a financial institution fails.
     It is typically raised when the user credentials are incorrect or the service is unavailable.
     """
+
+
+class HistoryFetchException(Exception):
+    """Exception raised when some periods of a history could not be fetched.
+
+    The periods that were fetched successfully are kept, so the caller can use
+    them or retry only the periods that failed.
+
+    Attributes:
+        records (list[HoldingPeriodRecord]): The records that were fetched, in chronological order.
+        failures (dict[tuple[date, date], Exception]): The error raised for each period that failed.
+    """
+
+    def __init__(
+        self,
+        records: list[HoldingPeriodRecord],
+        failures: dict[tuple[date, date], Exception],
+    ) -> None:
+        """Constructs a HistoryFetchException instance.
+
+        Args:
+            records (list[HoldingPeriodRecord]): The records that were fetched.
+            failures (dict[tuple[date, date], Exception]): The error raised for each period that failed.
+        """
+        super().__init__(f"failed to fetch {len(failures)} of {len(records) + len(failures)} periods")
+        self.records = records
+        self.failures = failures
+
+    @property
+    def failed_periods(self) -> list[tuple[date, date]]:
+        """The periods that failed, in chronological order."""
+        return sorted(self.failures)
+
+
+class SymbolNotFoundException(Exception):
+    """Exception raised when a symbol has no Yahoo Finance listing.
+
+    Attributes:
+        symbol (str): The symbol that could not be resolved.
+    """
+
+    def __init__(self, symbol: str) -> None:
+        """Constructs a SymbolNotFoundException instance.
+
+        Args:
+            symbol (str): The symbol that could not be resolved.
+        """
+        super().__init__(f"no Yahoo Finance symbol found for {symbol!r}")
+        self.symbol = symbol
+
+
+class SessionExpiredException(Exception):
+    """Exception raised when the API no longer accepts the access token.
+
+    Log in again to obtain a new access token.
+    """
+
+
+class ThrottledException(Exception):
+    """Exception raised when the API rejects a request because too many were sent.
+
+    Attributes:
+        retry_after (Optional[float]): How long in seconds the API asked to wait, if it did.
+    """
+
+    def __init__(self, retry_after: Optional[float] = None) -> None:
+        """Constructs a ThrottledException instance.
+
+        Args:
+            retry_after (Optional[float]): How long in seconds the API asked to wait.
+        """
+        message = "too many requests" if retry_after is None else f"too many requests, retry after {retry_after}s"
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ServiceUnavailableException(Exception):
+    """Exception raised when the API answers with a server error.
+
+    Attributes:
+        status_code (int): The HTTP status code of the response.
+    """
+
+    def __init__(self, status_code: int) -> None:
+        """Constructs a ServiceUnavailableException instance.
+
+        Args:
+            status_code (int): The HTTP status code of the response.
+        """
+        super().__init__(f"server error {status_code}")
+        self.status_code = status_code
+
+
+class MalformedResponseException(Exception):
+    """Exception raised when a response does not have the expected shape.
+
+    Attributes:
+        path (str): The request path.
+    """
+
+    def __init__(self, path: str, reason: str) -> None:
+        """Constructs a MalformedResponseException instance.
+
+        Args:
+            path (str): The request path.
+            reason (str): What is wrong with the response.
+        """
+        super().__init__(f"malformed response from {path}: {reason}")
+        self.path = path
+
+
+class CircuitOpenException(Exception):
+    """Exception raised when a request is refused because the API keeps failing.
+
+    Attributes:
+        retry_after (float): How long in seconds until a trial request is let through.
+    """
+
+    def __init__(self, retry_after: float) -> None:
+        """Constructs a CircuitOpenException instance.
+
+        Args:
+            retry_after (float): How long in seconds until a trial request is let through.
+        """
+        super().__init__(f"circuit open, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class RecordingNotFoundException(Exception):
+    """Exception raised when a replayed request was never recorded.
+
+    Attributes:
+        request (str): The request, as its path and sorted form fields.
+    """
+
+    def __init__(self, request: str) -> None:
+        """Constructs a RecordingNotFoundException instance.
+
+        Args:
+            request (str): The request, as its path and sorted form fields.
+        """
+        super().__init__(f"no recorded response to {request}")
+        self.request = request
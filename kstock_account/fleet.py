@@ -0,0 +1,273 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Generic, Optional, TypeVar, Union
+
+from kstock_account.mirae import AsyncMiraeAccount, MiraeAccount
+from kstock_account.schemas import HeldAsset, HoldingPeriodRecord
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class FleetResult(Generic[T]):
+    """A dataclass that represents the outcome of a call made on every account of a fleet."""
+
+    merged: T
+    """The results of the accounts that succeeded, merged into one."""
+
+    results: dict[str, T]
+    """The result of each account that succeeded, by account name."""
+
+    errors: dict[str, Exception]
+    """The exception raised by each account that failed, by account name."""
+
+
+class AccountFleet:
+    """Schedules calls on many Mirae Asset Securities accounts at once.
+
+    Calls are spread over a thread pool within two budgets: `max_concurrency`
+    caps the calls in flight across the whole fleet, and
+    `max_concurrency_per_account` caps the calls in flight on any one account,
+    as well as the weeks `get_history` fetches in parallel for it. Both budgets
+    are shared by every thread using the fleet. An account that fails does not
+    fail the others; its exception is reported in `FleetResult.errors`.
+
+    Attributes:
+        accounts (dict[str, MiraeAccount]): The accounts of the fleet, by name.
+        max_concurrency (int): The maximum number of calls in flight across the fleet.
+        max_concurrency_per_account (int): The maximum number of calls in flight on one account.
+    """
+
+    def __init__(
+        self,
+        accounts: Mapping[str, MiraeAccount],
+        max_concurrency: int = 8,
+        max_concurrency_per_account: int = 1,
+    ) -> None:
+        """Constructs an AccountFleet instance.
+
+        Args:
+            accounts (Mapping[str, MiraeAccount]): The accounts to manage, by a name
+                such as the user ID.
+            max_concurrency (int, optional): The maximum number of calls in flight
+                across the fleet. Defaults to 8.
+            max_concurrency_per_account (int, optional): The maximum number of calls
+                in flight on one account. Defaults to 1.
+        """
+        self.accounts = dict(accounts)
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_account = max_concurrency_per_account
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._account_semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def get_assets(self) -> FleetResult[list[HeldAsset]]:
+        """Returns the assets held in every account.
+
+        Returns:
+            FleetResult[list[HeldAsset]]: The assets of each account, and all of them
+            merged into one list in account order.
+        """
+        (results, errors) = self.call(lambda account: account.get_assets())
+        return FleetResult(merge_assets(results.values()), results, errors)
+
+    def get_history(self, start_date: date, end_date: Optional[date] = None) -> FleetResult[list[HoldingPeriodRecord]]:
+        """Returns the weekly performance history of every account.
+
+        An account with weeks that could not be fetched fails with a
+        `HistoryFetchException`, which holds the weeks that were fetched.
+
+        Args:
+            start_date (date): The start date of the history.
+            end_date (Optional[date]): The end date of the history. Defaults to today.
+
+        Returns:
+            FleetResult[list[HoldingPeriodRecord]]: The history of each account, and the
+            combined history of the fleet as merged by `merge_history`.
+        """
+        (results, errors) = self.call(
+            lambda account: account.get_history(start_date, end_date, max_workers=self.max_concurrency_per_account),
+        )
+        return FleetResult(merge_history(results.values()), results, errors)
+
+    def call(self, fn: Callable[[MiraeAccount], T]) -> tuple[dict[str, T], dict[str, Exception]]:
+        """Calls a function on every account within the concurrency budgets.
+
+        Args:
+            fn (Callable[[MiraeAccount], T]): The function to call with each account.
+
+        Returns:
+            tuple[dict[str, T], dict[str, Exception]]: The return value of each account
+            that succeeded and the exception raised by each account that failed, by
+            account name.
+        """
+
+        def run(name: str) -> Union[T, Exception]:
+            with self._semaphore, self._account_semaphore(name):
+                try:
+                    return fn(self.accounts[name])
+                except Exception as e:  # noqa: BLE001 - returned as the account's failure
+                    return e
+
+        names = list(self.accounts)
+        if not names:
+            return ({}, {})
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(names))) as executor:
+            outcomes = list(executor.map(run, names))
+        return _split_outcomes(names, outcomes)
+
+    def _account_semaphore(self, name: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if name not in self._account_semaphores:
+                self._account_semaphores[name] = threading.BoundedSemaphore(self.max_concurrency_per_account)
+            return self._account_semaphores[name]
+
+
+class AsyncAccountFleet:
+    """Schedules calls on many Mirae Asset Securities accounts at once with asyncio.
+
+    The asyncio counterpart of `AccountFleet`, managing `AsyncMiraeAccount`
+    instances. The budgets are shared by every task using the fleet.
+
+    Attributes:
+        accounts (dict[str, AsyncMiraeAccount]): The accounts of the fleet, by name.
+        max_concurrency (int): The maximum number of calls in flight across the fleet.
+        max_concurrency_per_account (int): The maximum number of calls in flight on one account.
+    """
+
+    def __init__(
+        self,
+        accounts: Mapping[str, AsyncMiraeAccount],
+        max_concurrency: int = 8,
+        max_concurrency_per_account: int = 1,
+    ) -> None:
+        """Constructs an AsyncAccountFleet instance.
+
+        Args:
+            accounts (Mapping[str, AsyncMiraeAccount]): The accounts to manage, by a name
+                such as the user ID.
+            max_concurrency (int, optional): The maximum number of calls in flight
+                across the fleet. Defaults to 8.
+            max_concurrency_per_account (int, optional): The maximum number of calls
+                in flight on one account. Defaults to 1.
+        """
+        self.accounts = dict(accounts)
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_account = max_concurrency_per_account
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._account_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    async def get_assets(self) -> FleetResult[list[HeldAsset]]:
+        """Returns the assets held in every account.
+
+        Returns:
+            FleetResult[list[HeldAsset]]: The assets of each account, and all of them
+            merged into one list in account order.
+        """
+        (results, errors) = await self.call(lambda account: account.get_assets())
+        return FleetResult(merge_assets(results.values()), results, errors)
+
+    async def get_history(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+    ) -> FleetResult[list[HoldingPeriodRecord]]:
+        """Returns the weekly performance history of every account.
+
+        Args:
+            start_date (date): The start date of the history.
+            end_date (Optional[date]): The end date of the history. Defaults to today.
+
+        Returns:
+            FleetResult[list[HoldingPeriodRecord]]: The history of each account, and the
+            combined history of the fleet as merged by `merge_history`.
+        """
+        (results, errors) = await self.call(lambda account: account.get_history(start_date, end_date))
+        return FleetResult(merge_history(results.values()), results, errors)
+
+    async def call(
+        self,
+        fn: Callable[[AsyncMiraeAccount], Awaitable[T]],
+    ) -> tuple[dict[str, T], dict[str, Exception]]:
+        """Calls a coroutine function on every account within the concurrency budgets.
+
+        Args:
+            fn (Callable[[AsyncMiraeAccount], Awaitable[T]]): The coroutine function to
+                call with each account.
+
+        Returns:
+            tuple[dict[str, T], dict[str, Exception]]: The return value of each account
+            that succeeded and the exception raised by each account that failed, by
+            account name.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        semaphore = self._semaphore
+
+        async def run(name: str) -> T:
+            if name not in self._account_semaphores:
+                self._account_semaphores[name] = asyncio.Semaphore(self.max_concurrency_per_account)
+            async with semaphore, self._account_semaphores[name]:
+                return await fn(self.accounts[name])
+
+        names = list(self.accounts)
+        outcomes = await asyncio.gather(*(run(name) for name in names), return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+                raise outcome
+        return _split_outcomes(names, outcomes)
+
+
+def merge_assets(assets: Iterable[list[HeldAsset]]) -> list[HeldAsset]:
+    """Merges the assets of many accounts into one list.
+
+    Args:
+        assets (Iterable[list[HeldAsset]]): The assets of each account.
+
+    Returns:
+        list[HeldAsset]: All assets, in the given order.
+    """
+    return [asset for account_assets in assets for asset in account_assets]
+
+
+def merge_history(histories: Iterable[list[HoldingPeriodRecord]]) -> list[HoldingPeriodRecord]:
+    """Merges the histories of many accounts into the history of their combined assets.
+
+    Records of the same period are summed, so the merged history tracks the
+    performance of all accounts as if they were one.
+
+    Args:
+        histories (Iterable[list[HoldingPeriodRecord]]): The history of each account.
+
+    Returns:
+        list[HoldingPeriodRecord]: One record per period, sorted by period.
+    """
+    totals: dict[tuple[date, date], list[int]] = {}
+    for history in histories:
+        for record in history:
+            total = totals.setdefault((record.start_date, record.end_date), [0, 0, 0, 0])
+            total[0] += record.initial_value
+            total[1] += record.closing_value
+            total[2] += record.cash_inflow
+            total[3] += record.cash_outflow
+    return [
+        HoldingPeriodRecord(start_date, end_date, *total) for ((start_date, end_date), total) in sorted(totals.items())
+    ]
+
+
+def _split_outcomes(
+    names: list[str],
+    outcomes: Iterable[Union[T, BaseException]],
+) -> tuple[dict[str, T], dict[str, Exception]]:
+    results: dict[str, T] = {}
+    errors: dict[str, Exception] = {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, Exception):
+            errors[name] = outcome
+        elif not isinstance(outcome, BaseException):
+            results[name] = outcome
+    return (results, errors)
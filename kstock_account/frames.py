@@ -0,0 +1,226 @@
+from collections.abc import Iterable, Mapping, Sequence
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Union
+
+import numpy as np
+
+from kstock_account.schemas import HeldAsset, HoldingPeriodRecord
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+HISTORY_DTYPE = np.dtype(
+    [
+        ("start_date", "datetime64[D]"),
+        ("end_date", "datetime64[D]"),
+        ("initial_value", "i8"),
+        ("closing_value", "i8"),
+        ("cash_inflow", "i8"),
+        ("cash_outflow", "i8"),
+        ("pnl", "f8"),
+        ("pnl_percent", "f8"),
+    ],
+)
+"""The structured dtype of a holding period record array."""
+
+ASSET_DTYPE = np.dtype(
+    [
+        ("kind", "O"),
+        ("account_number", "O"),
+        ("name", "O"),
+        ("currency", "O"),
+        ("symbol", "O"),
+        ("exchange_rate", "f8"),
+        ("market_value", "f8"),
+        ("quantity", "f8"),
+        ("entry_value", "f8"),
+        ("maturity_date", "datetime64[D]"),
+        ("pnl", "f8"),
+        ("pnl_percent", "f8"),
+        ("market_price", "f8"),
+        ("entry_price", "f8"),
+    ],
+)
+"""The structured dtype of a held asset array.
+
+`kind` is the name of the matching `HeldAsset` subclass. Columns that do not
+apply to an asset kind, such as the quantity of cash, are NaN or NaT.
+"""
+
+
+def history_array(
+    start_dates: Union[Sequence[Any], np.ndarray],
+    end_dates: Union[Sequence[Any], np.ndarray],
+    initial_values: Union[Sequence[int], np.ndarray],
+    closing_values: Union[Sequence[int], np.ndarray],
+    cash_inflows: Union[Sequence[int], np.ndarray],
+    cash_outflows: Union[Sequence[int], np.ndarray],
+) -> np.ndarray:
+    """Build a holding period record array from its columns.
+
+    `pnl` and `pnl_percent` are computed for all rows at once, with the same
+    formulas as the `HoldingPeriodRecord` properties. A period with no invested
+    value gets a NaN or infinite `pnl_percent` instead of raising.
+
+    Args:
+        start_dates (Union[Sequence[Any], np.ndarray]): The start date of each period.
+        end_dates (Union[Sequence[Any], np.ndarray]): The end date of each period.
+        initial_values (Union[Sequence[int], np.ndarray]): The initial value of each period.
+        closing_values (Union[Sequence[int], np.ndarray]): The closing value of each period.
+        cash_inflows (Union[Sequence[int], np.ndarray]): The cash inflow of each period.
+        cash_outflows (Union[Sequence[int], np.ndarray]): The cash outflow of each period.
+
+    Returns:
+        np.ndarray: A structured array with `HISTORY_DTYPE`.
+    """
+    array = np.empty(len(start_dates), dtype=HISTORY_DTYPE)
+    array["start_date"] = np.asarray(start_dates, dtype="datetime64[D]")
+    array["end_date"] = np.asarray(end_dates, dtype="datetime64[D]")
+    array["initial_value"] = initial_values
+    array["closing_value"] = closing_values
+    array["cash_inflow"] = cash_inflows
+    array["cash_outflow"] = cash_outflows
+    invested = array["initial_value"] + array["cash_inflow"] - array["cash_outflow"]
+    array["pnl"] = array["closing_value"] - invested
+    with np.errstate(divide="ignore", invalid="ignore"):
+        array["pnl_percent"] = array["pnl"] / invested
+    return array
+
+
+def asset_array(columns: Mapping[str, Union[Sequence[Any], np.ndarray]]) -> np.ndarray:
+    """Build a held asset array from its columns.
+
+    `pnl`, `pnl_percent`, `market_price` and `entry_price` are computed for all
+    rows at once, with the same formulas as the `HeldAsset` subclass properties.
+
+    Args:
+        columns (Mapping[str, Union[Sequence[Any], np.ndarray]]): The columns of `ASSET_DTYPE` up to and
+            including `maturity_date`. Missing numeric columns are filled with NaN,
+            missing `symbol` with None and missing `maturity_date` with NaT.
+
+    Returns:
+        np.ndarray: A structured array with `ASSET_DTYPE`.
+    """
+    size = len(columns["kind"])
+    array = np.empty(size, dtype=ASSET_DTYPE)
+    for name in ("kind", "account_number", "name", "currency"):
+        array[name] = columns[name]
+    array["symbol"] = columns.get("symbol", [None] * size)
+    for name in ("exchange_rate", "market_value", "quantity", "entry_value"):
+        array[name] = np.asarray(columns[name], dtype="f8") if name in columns else np.nan
+    array["maturity_date"] = (
+        np.asarray(columns["maturity_date"], dtype="datetime64[D]")
+        if "maturity_date" in columns
+        else np.datetime64("NaT")
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        array["pnl"] = array["market_value"] - array["entry_value"]
+        array["pnl_percent"] = array["pnl"] / array["entry_value"]
+        array["market_price"] = array["market_value"] / array["quantity"]
+        array["entry_price"] = array["entry_value"] / array["quantity"]
+    return array
+
+
+def parse_columns(rows: Sequence[Mapping[str, Any]], columns: Mapping[str, str]) -> dict[str, np.ndarray]:
+    """Read fields of decoded response rows straight into typed arrays.
+
+    The API returns every number and date as a string. Only the requested
+    fields are read, each with one pass over the rows into a preallocated
+    array, and dates are converted for all rows at once instead of with
+    `datetime.strptime` per row.
+
+    Args:
+        rows (Sequence[Mapping[str, Any]]): The rows, such as the `grid01` list of a response.
+        columns (Mapping[str, str]): The type of each field to read: `f8` for a float,
+            `i8` for an integer, `M8[D]` for a `YYYYMMDD` date and `O` for anything else.
+
+    Returns:
+        dict[str, np.ndarray]: The array of each field.
+    """
+    size = len(rows)
+    parsed: dict[str, np.ndarray] = {}
+    for name, kind in columns.items():
+        values = map(itemgetter(name), rows)
+        if kind == "f8":
+            parsed[name] = np.fromiter(map(float, values), dtype="f8", count=size)
+        elif kind == "i8":
+            parsed[name] = np.fromiter(map(int, values), dtype="i8", count=size)
+        elif kind == "M8[D]":
+            parsed[name] = _parse_dates(np.fromiter(map(int, values), dtype="i8", count=size))
+        elif kind == "O":
+            parsed[name] = np.array(list(values), dtype="O")
+        else:
+            raise ValueError(f"unsupported column type {kind!r}")
+    return parsed
+
+
+def history_to_array(records: Iterable[HoldingPeriodRecord]) -> np.ndarray:
+    """Convert holding period records to a structured array.
+
+    Args:
+        records (Iterable[HoldingPeriodRecord]): The records to convert.
+
+    Returns:
+        np.ndarray: A structured array with `HISTORY_DTYPE`.
+    """
+    records = list(records)
+    return history_array(
+        [record.start_date for record in records],
+        [record.end_date for record in records],
+        [record.initial_value for record in records],
+        [record.closing_value for record in records],
+        [record.cash_inflow for record in records],
+        [record.cash_outflow for record in records],
+    )
+
+
+def assets_to_array(assets: Iterable[HeldAsset]) -> np.ndarray:
+    """Convert held assets to a structured array.
+
+    Args:
+        assets (Iterable[HeldAsset]): The assets to convert.
+
+    Returns:
+        np.ndarray: A structured array with `ASSET_DTYPE`.
+    """
+    assets = list(assets)
+    return asset_array(
+        {
+            "kind": [type(asset).__name__ for asset in assets],
+            "account_number": [asset.account_number for asset in assets],
+            "name": [asset.name for asset in assets],
+            "currency": [asset.currency for asset in assets],
+            "symbol": [getattr(asset, "symbol", None) for asset in assets],
+            "exchange_rate": [asset.exchange_rate for asset in assets],
+            "market_value": [asset.market_value for asset in assets],
+            "quantity": [getattr(asset, "quantity", np.nan) for asset in assets],
+            "entry_value": [getattr(asset, "entry_value", np.nan) for asset in assets],
+            "maturity_date": [getattr(asset, "maturity_date", None) for asset in assets],
+        },
+    )
+
+
+def to_dataframe(array: np.ndarray) -> "pd.DataFrame":
+    """Convert a structured array to a pandas DataFrame.
+
+    Requires the `pandas` package.
+
+    Args:
+        array (np.ndarray): A structured array, such as one returned by `history_array`.
+
+    Returns:
+        pd.DataFrame: A DataFrame with one column per field.
+    """
+    import pandas as pd
+
+    return pd.DataFrame({name: array[name] for name in array.dtype.names or ()})
+
+
+def _parse_dates(values: np.ndarray) -> np.ndarray:
+    (years, month_days) = np.divmod(values, 10000)
+    (months, days) = np.divmod(month_days, 100)
+    return np.asarray(
+        (years - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+        + (months - 1).astype("timedelta64[M]")
+        + (days - 1).astype("timedelta64[D]"),
+    )
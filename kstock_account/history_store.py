@@ -0,0 +1,118 @@
+import sqlite3
+import threading
+from collections.abc import Iterable
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional, Union
+
+from kstock_account.schemas import HoldingPeriodRecord
+from kstock_account.utils import default_cache_dir
+
+
+class HistoryStore:
+    """A persistent store of holding period records, backed by SQLite.
+
+    Records are keyed by the set of accounts they cover and by their exact
+    period. Only closed periods, those that ended before today, are stored,
+    because the record of a period that is still open changes until it ends.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        """Constructs a HistoryStore instance.
+
+        Args:
+            path (Optional[Union[str, Path]]): The path of the SQLite database, or
+                `":memory:"` to keep the store in process only. Defaults to
+                `history.sqlite3` in `default_cache_dir()`.
+        """
+        if path is None:
+            path = default_cache_dir() / "history.sqlite3"
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "accounts TEXT, start_date TEXT, end_date TEXT, "
+                "initial_value INTEGER, closing_value INTEGER, cash_inflow INTEGER, cash_outflow INTEGER, "
+                "PRIMARY KEY (accounts, start_date, end_date))",
+            )
+
+    def load(
+        self,
+        raw_account_numbers: list[str],
+        periods: Iterable[tuple[date, date]],
+    ) -> dict[tuple[date, date], HoldingPeriodRecord]:
+        """Returns the stored records for the given periods.
+
+        Args:
+            raw_account_numbers (list[str]): The accounts the records cover.
+            periods (Iterable[tuple[date, date]]): The periods to look up.
+
+        Returns:
+            dict[tuple[date, date], HoldingPeriodRecord]: The stored record of each period
+            that is in the store. Periods that are not stored are left out.
+        """
+        periods = list(periods)
+        if not periods:
+            return {}
+        start_date = min(start_date for (start_date, _) in periods)
+        end_date = max(end_date for (_, end_date) in periods)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT start_date, end_date, initial_value, closing_value, cash_inflow, cash_outflow "
+                "FROM records WHERE accounts = ? AND start_date >= ? AND end_date <= ?",
+                (_accounts_key(raw_account_numbers), start_date.isoformat(), end_date.isoformat()),
+            ).fetchall()
+        wanted = set(periods)
+        records = {}
+        for row in rows:
+            period = (date.fromisoformat(row[0]), date.fromisoformat(row[1]))
+            if period in wanted:
+                records[period] = HoldingPeriodRecord(period[0], period[1], *row[2:])
+        return records
+
+    def save(self, raw_account_numbers: list[str], records: Iterable[HoldingPeriodRecord]) -> int:
+        """Stores the records of closed periods.
+
+        Records whose period has not ended before today are skipped.
+
+        Args:
+            raw_account_numbers (list[str]): The accounts the records cover.
+            records (Iterable[HoldingPeriodRecord]): The records to store.
+
+        Returns:
+            int: The number of stored records.
+        """
+        today = datetime.now().date()
+        accounts = _accounts_key(raw_account_numbers)
+        rows = [
+            (
+                accounts,
+                record.start_date.isoformat(),
+                record.end_date.isoformat(),
+                record.initial_value,
+                record.closing_value,
+                record.cash_inflow,
+                record.cash_outflow,
+            )
+            for record in records
+            if record.end_date < today
+        ]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def clear(self) -> None:
+        """Removes every record from the store."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM records")
+
+    def close(self) -> None:
+        """Closes the underlying database."""
+        self._db.close()
+
+
+def _accounts_key(raw_account_numbers: list[str]) -> str:
+    return ",".join(sorted(raw_account_numbers))
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable
+from concurrent.futures import Future
+from datetime import timedelta
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class MetadataCache:
+    """A cache of session metadata, such as account numbers, with single-flight loading.
+
+    Values expire `ttl` after they were loaded. Callers that ask for a key
+    that is missing or expired while it is already being loaded wait for that
+    load instead of starting their own, whether they are threads calling `get`
+    or coroutines awaiting `get_async`, so a burst of calls makes one request.
+    A failed load is not cached, and its exception is raised to every caller
+    that waited for it.
+
+    Attributes:
+        ttl (timedelta): How long a loaded value is served.
+    """
+
+    def __init__(self, ttl: timedelta = timedelta(minutes=10)) -> None:
+        """Constructs a MetadataCache instance.
+
+        Args:
+            ttl (timedelta, optional): How long a loaded value is served. Defaults to 10 minutes.
+        """
+        self.ttl = ttl
+        self._entries: dict[str, tuple[float, Any]] = {}
+        self._loads: dict[str, Future[Any]] = {}
+        self._tasks: dict[tuple[str, asyncio.AbstractEventLoop], asyncio.Task[Any]] = {}
+        self._generation = 0
+        self._key_generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, loader: Callable[[], T]) -> T:
+        """Returns the value of a key, loading it if it is missing or expired.
+
+        Args:
+            key (str): The key of the value.
+            loader (Callable[[], T]): The function that loads the value.
+
+        Returns:
+            T: The cached or loaded value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                value: T = entry[1]
+                return value
+            load = self._loads.get(key)
+            if load is not None:
+                owner = False
+            else:
+                (owner, load, generation) = (True, Future(), self._generation_of(key))
+                self._loads[key] = load
+        if not owner:
+            result: T = load.result()
+            return result
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._loads[key]
+            load.set_exception(e)
+            raise
+        with self._lock:
+            del self._loads[key]
+            self._store(key, value, generation)
+        load.set_result(value)
+        return value
+
+    async def get_async(self, key: str, loader: Callable[[], Awaitable[T]]) -> T:
+        """Returns the value of a key, loading it if it is missing or expired.
+
+        The load runs as a task of its own, so cancelling one of the coroutines
+        waiting for it does not cancel it for the others.
+
+        Args:
+            key (str): The key of the value.
+            loader (Callable[[], Awaitable[T]]): The coroutine function that loads the value.
+
+        Returns:
+            T: The cached or loaded value.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                value: T = entry[1]
+                return value
+            task = self._tasks.get((key, loop))
+            if task is None:
+                task = loop.create_task(_await(loader()))
+                self._tasks[(key, loop)] = task
+                generation = self._generation_of(key)
+                task.add_done_callback(lambda task: self._finish_task(key, loop, generation, task))
+        result: T = await asyncio.shield(task)
+        return result
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Discards a cached value, or every cached value.
+
+        A load of a discarded key that is in flight still completes for the
+        callers waiting for it, but its value is not cached. Loads of other keys
+        are cached as usual.
+
+        Args:
+            key (Optional[str]): The key to discard. Defaults to every key.
+        """
+        with self._lock:
+            if key is None:
+                self._generation += 1
+                self._key_generations.clear()
+                self._entries.clear()
+            else:
+                self._key_generations[key] = self._key_generations.get(key, 0) + 1
+                self._entries.pop(key, None)
+
+    def _generation_of(self, key: str) -> tuple[int, int]:
+        return (self._generation, self._key_generations.get(key, 0))
+
+    def _store(self, key: str, value: Any, generation: tuple[int, int]) -> None:
+        if generation == self._generation_of(key):
+            self._entries[key] = (time.monotonic() + self.ttl.total_seconds(), value)
+
+    def _finish_task(
+        self,
+        key: str,
+        loop: asyncio.AbstractEventLoop,
+        generation: tuple[int, int],
+        task: "asyncio.Task[Any]",
+    ) -> None:
+        with self._lock:
+            if self._tasks.get((key, loop)) is task:
+                del self._tasks[(key, loop)]
+            if not task.cancelled() and task.exception() is None:
+                self._store(key, task.result(), generation)
+
+
+async def _await(awaitable: Awaitable[T]) -> T:
+    return await awaitable
@@ -0,0 +1,236 @@
+import bisect
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""The default upper bounds of the latency histogram buckets, in seconds."""
+
+
+@dataclass(frozen=True)
+class CallEvent:
+    """A dataclass that represents one instrumented call.
+
+    Calls to the API are reported by the transport with the name of the
+    endpoint, such as `a01` or `getMyAccountListData`. Symbol resolution and
+    history store lookups are reported by the account as `symbols` and
+    `history_store`.
+    """
+
+    endpoint: str
+    """The endpoint or component that was called."""
+
+    latency: float
+    """The wall time of the call in seconds, including retries."""
+
+    bytes_received: int = 0
+    """The size of the response body."""
+
+    rows: int = 0
+    """The number of rows in the response, or the number of items looked up."""
+
+    retries: int = 0
+    """The number of retries after the first attempt."""
+
+    cache_hits: int = 0
+    """The number of items answered from a cache."""
+
+    decode_time: float = 0.0
+    """The part of `latency` spent decoding the response body."""
+
+    error: Optional[str] = None
+    """The name of the exception the call failed with, if it failed."""
+
+
+Observer = Callable[[CallEvent], None]
+"""A function that receives every `CallEvent` of an account or transport."""
+
+
+class MetricsCollector:
+    """Aggregates call events into per-endpoint counters and latency histograms.
+
+    Pass the collector as the `observer` of an account or transport. The
+    collected metrics can be rendered in the Prometheus text exposition format
+    with `to_prometheus` and scraped with `start_http_server`.
+
+    Attributes:
+        buckets (tuple[float, ...]): The upper bounds of the latency histogram buckets, in seconds.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Constructs a MetricsCollector instance.
+
+        Args:
+            buckets (Sequence[float], optional): The upper bounds of the latency histogram
+                buckets, in seconds. Defaults to `DEFAULT_BUCKETS`.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._endpoints: dict[str, _EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: CallEvent) -> None:
+        """Records a call event."""
+        with self._lock:
+            metrics = self._endpoints.get(event.endpoint)
+            if metrics is None:
+                metrics = self._endpoints[event.endpoint] = _EndpointMetrics(len(self.buckets))
+            metrics.calls += 1
+            metrics.errors += event.error is not None
+            metrics.latency_sum += event.latency
+            metrics.decode_time_sum += event.decode_time
+            metrics.bytes_received += event.bytes_received
+            metrics.rows += event.rows
+            metrics.retries += event.retries
+            metrics.cache_hits += event.cache_hits
+            metrics.bucket_counts[bisect.bisect_left(self.buckets, event.latency)] += 1
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Returns the collected metrics of each endpoint.
+
+        Returns:
+            dict[str, dict[str, Any]]: The counters of each endpoint, including the
+            cumulative `buckets` of its latency histogram.
+        """
+        with self._lock:
+            return {endpoint: metrics.to_dict(self.buckets) for (endpoint, metrics) in self._endpoints.items()}
+
+    def reset(self) -> None:
+        """Discards every collected metric."""
+        with self._lock:
+            self._endpoints.clear()
+
+    def to_prometheus(self, prefix: str = "kstock_account") -> str:
+        """Renders the collected metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix (str, optional): The prefix of every metric name. Defaults to `kstock_account`.
+
+        Returns:
+            str: The metrics, one sample per line.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_call_duration_seconds The wall time of calls, including retries.",
+            f"# TYPE {prefix}_call_duration_seconds histogram",
+        ]
+        for endpoint, metrics in snapshot.items():
+            for bound, count in metrics["buckets"].items():
+                lines.append(f'{prefix}_call_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_call_duration_seconds_sum{{endpoint="{endpoint}"}} {metrics["latency_sum"]}')
+            lines.append(f'{prefix}_call_duration_seconds_count{{endpoint="{endpoint}"}} {metrics["calls"]}')
+        for name, key, help_text in _COUNTERS:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            lines.extend(
+                f'{prefix}_{name}{{endpoint="{endpoint}"}} {metrics[key]}' for (endpoint, metrics) in snapshot.items()
+            )
+        return "\n".join(lines) + "\n"
+
+
+def start_http_server(
+    collector: MetricsCollector,
+    port: int = 9464,
+    host: str = "127.0.0.1",
+) -> ThreadingHTTPServer:
+    """Serves the metrics of a collector for Prometheus to scrape.
+
+    The server runs in a daemon thread and answers every GET request with
+    `collector.to_prometheus()`. Call `shutdown` on the returned server to stop it.
+
+    Args:
+        collector (MetricsCollector): The collector to expose.
+        port (int, optional): The port to listen on, or 0 to pick a free one. Defaults to 9464.
+        host (str, optional): The address to listen on. Defaults to the loopback address.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = collector.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+_COUNTERS = (
+    ("errors_total", "errors", "The number of calls that failed."),
+    ("decode_seconds_total", "decode_time_sum", "The time spent decoding response bodies."),
+    ("received_bytes_total", "bytes_received", "The size of the response bodies."),
+    ("rows_total", "rows", "The number of rows received or items looked up."),
+    ("retries_total", "retries", "The number of retried attempts."),
+    ("cache_hits_total", "cache_hits", "The number of items answered from a cache."),
+)
+
+
+class _EndpointMetrics:
+    def __init__(self, bucket_count: int) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.decode_time_sum = 0.0
+        self.bytes_received = 0
+        self.rows = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.bucket_counts = [0] * (bucket_count + 1)
+
+    def to_dict(self, buckets: tuple[float, ...]) -> dict[str, Any]:
+        cumulative: dict[str, int] = {}
+        total = 0
+        for bound, count in zip([*map(str, buckets), "+Inf"], self.bucket_counts):
+            total += count
+            cumulative[bound] = total
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_sum": self.latency_sum,
+            "decode_time_sum": self.decode_time_sum,
+            "bytes_received": self.bytes_received,
+            "rows": self.rows,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "buckets": cumulative,
+        }
+
+
+def count_rows(data: Any) -> int:
+    """Returns the number of rows in a decoded API response.
+
+    Args:
+        data (Any): The decoded response body.
+
+    Returns:
+        int: The length of the first list in the response, 1 for a response with
+        no list, such as `a01`, and 0 for anything else.
+    """
+    if not isinstance(data, dict):
+        return 0
+    for value in data.values():
+        if isinstance(value, list):
+            return len(value)
+    return 1
+
+
+def endpoint_name(path: str) -> str:
+    """Returns the short endpoint name of a request path.
+
+    Args:
+        path (str): The request path, such as `/hkd/hkd1005/a01.json`.
+
+    Returns:
+        str: The last path segment without the `.json` suffix, such as `a01`.
+    """
+    return path.rsplit("/", 1)[-1].removesuffix(".json")
@@ -1,12 +1,25 @@
-from datetime import date, datetime
-from typing import Callable, Optional
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import partial
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, Any, Callable, Generic, Optional, TypeVar, Union, cast
+from urllib.parse import urljoin, urlsplit
 
 import requests
-from selenium import webdriver
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.wait import WebDriverWait
 
-from kstock_account.exceptions import LoginFailedException
+from kstock_account.exceptions import (
+    HistoryFetchException,
+    LoginFailedException,
+    MalformedResponseException,
+    SessionExpiredException,
+)
+from kstock_account.history_store import HistoryStore
+from kstock_account.metadata import MetadataCache
+from kstock_account.metrics import CallEvent, Observer
 from kstock_account.schemas import (
     HeldAsset,
     HeldCash,
@@ -15,30 +28,171 @@ from kstock_account.schemas import (
     HeldGoldSpot,
     HoldingPeriodRecord,
 )
-from kstock_account.utils import convert_to_yfinance_symbol, create_headless_edge_webdriver, weekrange
+from kstock_account.symbols import SymbolResolver, default_symbol_resolver
+from kstock_account.tokens import FileTokenStore, StoredToken, TokenRefresher
+from kstock_account.transport import MIRAE_ACCESS_TOKEN_COOKIE, MIRAE_BASE_URL, AsyncMiraeTransport, MiraeTransport
+from kstock_account.utils import create_headless_edge_webdriver, weekrange
+from kstock_account.webdriver_pool import WebDriverPool
+
+if TYPE_CHECKING:
+    import numpy as np
+    from selenium import webdriver
+
+    from kstock_account.periods import Frequency, TradingCalendar
+
+ACCOUNT_LIST_PATH = "/banking/getMyAccountListData.json"
+FOREIGN_CURRENCY_PATH = "/hkd/hkd1003/a11.json"
+CASH_EQUIVALENT_PATH = "/hkd/hkd1003/a05.json"
+HOLDING_PATH = "/hkd/hkd1003/a03.json"
+HOLDING_PERIOD_RECORD_PATH = "/hkd/hkd1005/a01.json"
+
+EQUITY_HOLDING_FORM = {"pd_tcd": "01"}
+GOLD_SPOT_HOLDING_FORM = {"pd_tcd": "04"}
+FOREIGN_CURRENCY_FORM = {"qry_tcd": "1"}
+
+ASSET_REQUESTS: dict[str, tuple[str, Optional[dict[str, Any]]]] = {
+    "foreign_currencies": (FOREIGN_CURRENCY_PATH, FOREIGN_CURRENCY_FORM),
+    "cash_equivalents": (CASH_EQUIVALENT_PATH, None),
+    "equities": (HOLDING_PATH, EQUITY_HOLDING_FORM),
+    "gold_spots": (HOLDING_PATH, GOLD_SPOT_HOLDING_FORM),
+}
+"""The independent requests behind `get_assets`, by the name used in its timings."""
+
+ACCOUNT_NUMBERS_KEY = "account_numbers"
+"""The `metadata_cache` key of the formatted account numbers."""
+
+RAW_ACCOUNT_NUMBERS_KEY = "raw_account_numbers"
+"""The `metadata_cache` key of the account numbers as the API returns them."""
+
+RESPONSE_KEYS = {
+    ACCOUNT_LIST_PATH: "grid01",
+    FOREIGN_CURRENCY_PATH: "GRID01",
+    CASH_EQUIVALENT_PATH: "grid01",
+    HOLDING_PATH: "grid01",
+    HOLDING_PERIOD_RECORD_PATH: "eot_ea",
+}
+"""A key every successful response of each endpoint has, used to tell data from error replies."""
+
+_TransportT = TypeVar("_TransportT", MiraeTransport, AsyncMiraeTransport)
+
+
+class _BaseMiraeAccount(Generic[_TransportT]):
+    """The state shared by `MiraeAccount` and `AsyncMiraeAccount`, which differ only in how they send requests."""
+
+    def __init__(
+        self,
+        access_token: str,
+        transport: _TransportT,
+        symbol_resolver: Optional[SymbolResolver],
+        history_store: Optional[HistoryStore],
+        observer: Optional[Observer],
+        metadata_cache: Optional[MetadataCache],
+    ) -> None:
+        self.transport: _TransportT = transport
+        self._symbol_resolver = symbol_resolver
+        self.history_store = history_store
+        self.token_refresher: Optional[TokenRefresher] = None
+        self.metadata_cache = metadata_cache if metadata_cache is not None else MetadataCache()
+        self.access_token = access_token
+        self.observer = observer if observer is not None else self.transport.observer
 
+    @property
+    def access_token(self) -> str:
+        """The access token for the account API."""
+        return self._access_token
 
-class MiraeAccount:
+    @access_token.setter
+    def access_token(self, access_token: str) -> None:
+        self._access_token = access_token
+        self.transport.access_token = access_token
+        self.metadata_cache.invalidate()
+
+    @property
+    def symbol_resolver(self) -> SymbolResolver:
+        """The resolver used to map equity symbols to Yahoo Finance symbols, the shared one until set."""
+        if self._symbol_resolver is None:
+            self._symbol_resolver = default_symbol_resolver()
+        return self._symbol_resolver
+
+    @symbol_resolver.setter
+    def symbol_resolver(self, symbol_resolver: SymbolResolver) -> None:
+        self._symbol_resolver = symbol_resolver
+
+    @property
+    def observer(self) -> Optional[Observer]:
+        """The function called with a `CallEvent` after each instrumented call, shared with the transport."""
+        return self._observer
+
+    @observer.setter
+    def observer(self, observer: Optional[Observer]) -> None:
+        self._observer = observer
+        self.transport.observer = observer
+
+    def _attach_token_refresher(
+        self,
+        user_id: str,
+        login_fn: Callable[[], str],
+        token: StoredToken,
+        token_store: Optional[FileTokenStore],
+        token_ttl: timedelta,
+        auto_refresh: bool,
+    ) -> None:
+        if token_store is not None or auto_refresh:
+            self.token_refresher = TokenRefresher(user_id, login_fn, token, token_store, token_ttl)
+            if auto_refresh:
+                self.token_refresher.start(lambda access_token: setattr(self, "access_token", access_token))
+
+
+class MiraeAccount(_BaseMiraeAccount[MiraeTransport]):
     """Represents a Mirae Asset Securities account.
 
     Attributes:
         access_token (str): The access token for the account API.
+        symbol_resolver (SymbolResolver): The resolver used to map equity symbols to Yahoo Finance symbols.
+        history_store (Optional[HistoryStore]): The store of closed weeks consulted by `get_history`.
+        transport (MiraeTransport): The pooled HTTP transport used for API calls.
+        observer (Optional[Observer]): The function called with a `CallEvent` after each instrumented call.
+        metadata_cache (MetadataCache): The cache of the account numbers and other session metadata.
     """
 
     @staticmethod
     def login(
         user_id: str,
         user_password: str,
-        webdriver_fn: Callable[[], webdriver.Remote] = create_headless_edge_webdriver,
+        webdriver_fn: Callable[[], "webdriver.Remote"] = create_headless_edge_webdriver,
+        transport: Optional[MiraeTransport] = None,
+        token_store: Optional[FileTokenStore] = None,
+        token_ttl: timedelta = timedelta(minutes=30),
+        auto_refresh: bool = False,
+        http_login: bool = False,
     ) -> "MiraeAccount":
         """Logs in to Mirae Asset Securities website using the provided user credentials.
 
+        With a `token_store`, a token saved by an earlier login is reused if the
+        API still accepts it, and the browser login only runs when the token is
+        expired or rejected. New tokens are saved back to the store, and the
+        account logs in again by itself once its token expires.
+
+        With `http_login`, the login form is submitted over plain HTTP first,
+        which avoids starting a browser at all when the server accepts it.
+
         Args:
             user_id (str): The user ID for the Mirae Asset account.
             user_password (str): The password for the Mirae Asset account.
             webdriver_fn (Callable[[], webdriver.Remote], optional):
                 A function that creates a webdriver instance. Defaults to
                 `create_headless_edge_webdriver`.
+            transport (Optional[MiraeTransport]): The transport for the logged-in
+                account. Defaults to a new `MiraeTransport`.
+            token_store (Optional[FileTokenStore]): The store to reuse and save access tokens.
+            token_ttl (timedelta, optional): How long a new access token is assumed to
+                stay valid. Defaults to 30 minutes.
+            auto_refresh (bool, optional): Whether to refresh the access token in the
+                background before it expires. Defaults to False.
+            http_login (bool, optional): Whether to first try logging in by submitting
+                the login form over plain HTTP, without a browser. The login succeeds
+                only if it lands on the main page; the browser login is used if it
+                fails. Defaults to False.
 
         Returns:
             MiraeAccount: An instance of the MiraeAccount class with the
@@ -47,183 +201,499 @@ class MiraeAccount:
         Raises:
             LoginFailedException: If the login attempt fails.
         """
-        try:
-            driver = webdriver_fn()
-            driver.get("https://securities.miraeasset.com/mw/login.do")
-
-            driver.execute_script(f"document.querySelector('#usid').value = '{user_id}';")
-            driver.execute_script(f"document.querySelector('#clt_ecp_pwd').value = '{user_password}';")
-            driver.execute_script("doSubmit();")
-            _ = WebDriverWait(driver, 5).until(
-                lambda x: x.current_url == "https://securities.miraeasset.com/mw/main.do",
-            )
-
-            if cookie := driver.get_cookie("MIREADW_D"):
-                access_token = cookie["value"]
-            else:
-                raise LoginFailedException
-        except TimeoutException:
-            raise LoginFailedException
-        finally:
-            driver.close()
-        return MiraeAccount(access_token)
+        login_fn = _login_fn(user_id, user_password, webdriver_fn, http_login, transport)
+        token = token_store.load(user_id) if token_store is not None else None
+        if token is not None and not token.is_expired():
+            account = MiraeAccount(token.access_token, transport)
+            if not account._has_valid_token():
+                token = None
+        if token is None or token.is_expired():
+            token = StoredToken(login_fn(), datetime.now() + token_ttl)
+            if token_store is not None:
+                token_store.save(user_id, token)
+            account = MiraeAccount(token.access_token, transport)
+        account._attach_token_refresher(user_id, login_fn, token, token_store, token_ttl, auto_refresh)
+        return account
 
-    def __init__(self, access_token: str) -> None:
+    @staticmethod
+    def login_many(
+        credentials: Iterable[tuple[str, str]],
+        pool_size: int = 4,
+        webdriver_fn: Callable[[], "webdriver.Remote"] = create_headless_edge_webdriver,
+        transport_fn: Callable[[], MiraeTransport] = MiraeTransport,
+    ) -> dict[str, Union["MiraeAccount", Exception]]:
+        """Logs in to many Mirae Asset Securities accounts with a shared pool of webdrivers.
+
+        Up to `pool_size` logins run at once, each on a driver borrowed from a
+        `WebDriverPool`, so the browsers start once for the whole batch instead
+        of once per account. The drivers are shut down when the batch is done.
+
+        Args:
+            credentials (Iterable[tuple[str, str]]): The user ID and password of each account.
+            pool_size (int, optional): The number of webdrivers to run. Defaults to 4.
+            webdriver_fn (Callable[[], webdriver.Remote], optional):
+                A function that creates a webdriver instance. Defaults to
+                `create_headless_edge_webdriver`.
+            transport_fn (Callable[[], MiraeTransport], optional): A function that creates
+                the transport of each logged-in account. Defaults to `MiraeTransport`.
+
+        Returns:
+            dict[str, Union[MiraeAccount, Exception]]: The logged-in account for each user ID,
+            or the exception raised by its login, such as `LoginFailedException`.
+        """
+        credentials = list(credentials)
+        with WebDriverPool(pool_size, webdriver_fn) as pool:
+
+            def login(credential: tuple[str, str]) -> Union[MiraeAccount, Exception]:
+                try:
+                    with pool.driver() as driver:
+                        access_token = _login_with_driver(driver, *credential)
+                    return MiraeAccount(access_token, transport_fn())
+                except Exception as e:  # noqa: BLE001 - returned for its user ID, like the accounts that logged in
+                    return e
+
+            with ThreadPoolExecutor(max_workers=max(1, pool_size)) as executor:
+                results = list(executor.map(login, credentials))
+        return {user_id: result for ((user_id, _), result) in zip(credentials, results)}
+
+    def __init__(
+        self,
+        access_token: str,
+        transport: Optional[MiraeTransport] = None,
+        symbol_resolver: Optional[SymbolResolver] = None,
+        history_store: Optional[HistoryStore] = None,
+        observer: Optional[Observer] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+    ) -> None:
         """Constructs a MiraeAccount instance.
 
         Args:
             access_token (str): The access token for the account.
+            transport (Optional[MiraeTransport]): The HTTP transport to send requests
+                through. Defaults to a new pooled `MiraeTransport`.
+            symbol_resolver (Optional[SymbolResolver]): The resolver used to map equity
+                symbols to Yahoo Finance symbols. Defaults to the shared, disk-cached resolver,
+                which is created on the first resolution.
+            history_store (Optional[HistoryStore]): The store that `get_history` reads
+                closed weeks from and saves them to. Defaults to no store.
+            observer (Optional[Observer]): A function called with a `CallEvent` after each
+                request, symbol resolution and history store lookup. Defaults to none,
+                which skips the instrumentation entirely.
+            metadata_cache (Optional[MetadataCache]): The cache of the account numbers and
+                other session metadata. It is cleared whenever the access token changes.
+                Defaults to a new cache that serves values for 10 minutes.
         """
-        self.access_token = access_token
+        super().__init__(
+            access_token,
+            transport if transport is not None else MiraeTransport(),
+            symbol_resolver,
+            history_store,
+            observer,
+            metadata_cache,
+        )
+
+    def _post(self, path: str, data: Optional[dict[str, Any]] = None) -> Any:
+        if self.token_refresher is not None and self.token_refresher.needs_refresh():
+            self.access_token = self.token_refresher.refresh()
+        return _check_response(path, self.transport.post(path, data))
+
+    def _timed_post(self, path: str, data: Optional[dict[str, Any]] = None) -> tuple[Any, float]:
+        started_at = time.perf_counter()
+        response = self._post(path, data)
+        return (response, time.perf_counter() - started_at)
+
+    def _post_changed(
+        self,
+        path: str,
+        data: Optional[dict[str, Any]] = None,
+        digest: Optional[bytes] = None,
+    ) -> tuple[bytes, Any]:
+        if self.token_refresher is not None and self.token_refresher.needs_refresh():
+            self.access_token = self.token_refresher.refresh()
+        (digest, response) = self.transport.post_changed(path, data, digest)
+        return (digest, None if response is None else _check_response(path, response))
+
+    def _has_valid_token(self) -> bool:
+        self.metadata_cache.invalidate(RAW_ACCOUNT_NUMBERS_KEY)
+        try:
+            self._get_raw_account_numbers()
+        except (SessionExpiredException, MalformedResponseException):
+            return False
+        return True
 
     def get_account_numbers(self) -> list[str]:
         """Returns the account numbers of the user's accounts.
 
+        The account numbers are cached in `metadata_cache`.
+
         Returns:
             list[str]: A list of account numbers.
         """
-        return [self._prettify_account_number(account_number) for account_number in self._get_raw_account_numbers()]
+        return list(
+            self.metadata_cache.get(
+                ACCOUNT_NUMBERS_KEY,
+                lambda: list(map(_prettify_account_number, self._get_raw_account_numbers())),
+            ),
+        )
 
     def _get_raw_account_numbers(self) -> list[str]:
-        r = requests.post(
-            "https://securities.miraeasset.com/banking/getMyAccountListData.json",
-            cookies={"MIREADW_D": self.access_token},
+        return list(
+            self.metadata_cache.get(
+                RAW_ACCOUNT_NUMBERS_KEY,
+                lambda: _parse_account_numbers(self._post(ACCOUNT_LIST_PATH)),
+            ),
         )
-        account_numbers = [row["acno"] for row in r.json()["grid01"]]
-        return account_numbers
 
-    def get_assets(self) -> list[HeldAsset]:
+    def get_assets(self, timings: Optional[dict[str, float]] = None) -> list[HeldAsset]:
         """Returns the assets held by the user.
 
-        The list includes cash assets, equities, and gold spots.
+        The list includes cash assets, equities, and gold spots. The holdings
+        endpoints are requested concurrently.
+
+        Args:
+            timings (Optional[dict[str, float]]): A dictionary to fill with the time
+                in seconds spent on each request, keyed by the names in `ASSET_REQUESTS`,
+                and on `symbol_resolution`.
 
         Returns:
             list[HeldAsset]: A list of held assets.
         """
-        return [*self.get_cash_assets(), *self.get_equity_assets(), *self.get_gold_spot_assets()]
+        responses = self._fetch_asset_payloads(timings)
+        started_at = time.perf_counter()
+        equities = self._build_equities(responses["equities"])
+        if timings is not None:
+            timings["symbol_resolution"] = time.perf_counter() - started_at
+        return _assemble_assets(responses, equities)
+
+    def get_assets_frame(self) -> "np.ndarray":
+        """Returns the assets held by the user as columns.
+
+        The responses are read straight into a NumPy structured array with
+        `ASSET_DTYPE`, without building a `HeldAsset` per holding, and `pnl`,
+        `pnl_percent`, `market_price` and `entry_price` are computed for all
+        holdings at once. The rows are in the same order as `get_assets`.
+
+        Returns:
+            np.ndarray: The held assets, one row per holding.
+        """
+        responses = self._fetch_asset_payloads()
+        symbols = _resolve_symbols(self.symbol_resolver, responses["equities"], self.observer)
+        return _asset_array(responses, symbols)
+
+    def _fetch_asset_payloads(self, timings: Optional[dict[str, float]] = None) -> dict[str, Any]:
+        with ThreadPoolExecutor(max_workers=len(ASSET_REQUESTS)) as executor:
+            futures = {
+                name: executor.submit(self._timed_post, path, data) for (name, (path, data)) in ASSET_REQUESTS.items()
+            }
+            return _split_timings({name: future.result() for (name, future) in futures.items()}, timings)
+
+    def _fetch_changed_asset_payloads(self, digests: Mapping[str, bytes]) -> dict[str, tuple[bytes, Any]]:
+        with ThreadPoolExecutor(max_workers=len(ASSET_REQUESTS)) as executor:
+            futures = {
+                name: executor.submit(self._post_changed, path, data, digests.get(name))
+                for (name, (path, data)) in ASSET_REQUESTS.items()
+            }
+            return {name: future.result() for (name, future) in futures.items()}
 
     def get_cash_assets(self) -> list[HeldCash]:
         """Returns the cash assets held by the user.
-        
+
         Returns:
             list[HeldCash]: A list of held cash assets.
         """
-        r = requests.post(
-            "https://securities.miraeasset.com/hkd/hkd1003/a11.json",
-            data={"qry_tcd": "1"},
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-            cookies={"MIREADW_D": self.access_token},
-        )
-        foreign_currencies = [
-            HeldCash(
-                account_number=self._prettify_account_number(row["acno"]),
-                name=row["curr_cd"],
-                currency=row["curr_cd"],
-                exchange_rate=float(row["bas_exr"]),
-                market_value=float(row["mnyo_abl_a"]) / float(row["bas_exr"]),
-            )
-            for row in r.json()["GRID01"]
-        ]
-
-        r = requests.post(
-            "https://securities.miraeasset.com/hkd/hkd1003/a05.json",
-            cookies={"MIREADW_D": self.access_token},
-        )
-        cash_equivalents = [
-            HeldCashEquivalent(
-                account_number=self._prettify_account_number(row["acno"]),
-                name=row["rp_pd_nm"],
-                currency=row["curr_cd"],
-                exchange_rate=float(row["ea"]) / float(row["frc_ea"]),
-                market_value=float(row["frc_ea"]),
-                maturity_date=datetime.strptime(row["rpc_parg_dt"], "%Y%m%d").date(),
-                entry_value=float(row["frc_rp_ctrt_a"]),
-            )
-            for row in r.json()["grid01"]
-        ]
-
+        foreign_currency_data = self._post(FOREIGN_CURRENCY_PATH, FOREIGN_CURRENCY_FORM)
+        cash_equivalent_data = self._post(CASH_EQUIVALENT_PATH)
+        foreign_currencies = _parse_foreign_currencies(foreign_currency_data)
+        cash_equivalents = _parse_cash_equivalents(cash_equivalent_data)
         return [*foreign_currencies, *cash_equivalents]
 
     def get_equity_assets(self) -> list[HeldEquity]:
         """Returns the equities held by the user.
-        
+
+        Each distinct symbol is resolved once. An equity whose symbol cannot be
+        resolved keeps the broker's symbol.
+
         Returns:
             list[HeldEquity]: A list of held equities.
         """
-        r = requests.post(
-            "https://securities.miraeasset.com/hkd/hkd1003/a03.json",
-            data={"pd_tcd": "01"},
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-            cookies={"MIREADW_D": self.access_token},
-        )
-        equities = [
-            HeldEquity(
-                account_number=self._prettify_account_number(row["admn_acno"]),
-                name=row["itm_nm1"],
-                currency=row["curr_cd"],
-                exchange_rate=float(row["ea"]) / float(row["pitm_ea"]),
-                market_value=float(row["pitm_ea"]),
-                symbol=convert_to_yfinance_symbol(row["itm_no"]),
-                quantity=float(row["hldg_q"]),
-                entry_value=float(row["pchs_a1"]),
-            )
-            for row in r.json()["grid01"]
-        ]
-        return equities
+        return self._build_equities(self._post(HOLDING_PATH, EQUITY_HOLDING_FORM))
+
+    def _build_equities(self, data: Any) -> list[HeldEquity]:
+        symbols = _resolve_symbols(self.symbol_resolver, data, self.observer)
+        return _parse_equities(data, symbols)
+
+    def _build_assets(self, name: str, data: Any) -> Sequence[HeldAsset]:
+        if name == "equities":
+            return self._build_equities(data)
+        return _parse_assets(name, data)
 
     def get_gold_spot_assets(self) -> list[HeldGoldSpot]:
         """Returns the gold spots held by the user.
-        
+
         Returns:
             list[HeldGoldSpot]: A list of held gold spots.
         """
-        r = requests.post(
-            "https://securities.miraeasset.com/hkd/hkd1003/a03.json",
-            data={"pd_tcd": "04"},
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-            cookies={"MIREADW_D": self.access_token},
-        )
-        golds = [
-            HeldGoldSpot(
-                account_number=self._prettify_account_number(row["admn_acno"]),
-                name=row["itm_nm1"],
-                currency=row["curr_cd"],
-                exchange_rate=float(row["ea"]) / float(row["pitm_ea"]),
-                market_value=float(row["pitm_ea"]),
-                symbol=row["itm_no"],
-                quantity=float(row["hldg_q"]),
-                entry_value=float(row["pchs_a1"]),
-            )
-            for row in r.json()["grid01"]
-        ]
-        return golds
-
-    def get_history(self, start_date: date, end_date: Optional[date] = None) -> list[HoldingPeriodRecord]:
+        return _parse_gold_spots(self._post(HOLDING_PATH, GOLD_SPOT_HOLDING_FORM))
+
+    def get_history(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        max_workers: int = 1,
+        frequency: "Frequency" = "W",
+        calendar: Optional["TradingCalendar"] = None,
+    ) -> list[HoldingPeriodRecord]:
         """Returns the history of the weekly performance of the user's assets.
 
+        Weeks are independent of each other, so with `max_workers` greater than 1
+        they are fetched in parallel. The number of requests in flight is further
+        capped by the transport's `max_concurrency`. With a `history_store`, only
+        the weeks missing from the store and the still-open current week are
+        requested.
+
         Args:
             start_date (date): The start date of the history.
             end_date (Optional[date]): The end date of the history. Defaults to today.
+            max_workers (int, optional): The maximum number of weeks to fetch at once. Defaults to 1.
+            frequency (Frequency, optional): The length of the periods, as in `plan_periods`.
+                Defaults to weekly.
+            calendar (Optional[TradingCalendar]): A trading calendar, such as `KRX_CALENDAR`.
+                Periods with no trading day are merged into their neighbours instead of
+                being requested. Defaults to none.
 
         Returns:
             List[HoldingPeriodRecord]: The history of the weekly performance of the user's assets.
+
+        Raises:
+            HistoryFetchException: If some weeks could not be fetched. The weeks that
+                were fetched are available on the exception.
         """
-        if end_date is None:
-            end_date = datetime.now().date()
+        periods = _plan_periods(start_date, end_date, frequency, calendar)
+        return self._get_account_history(periods, self._get_raw_account_numbers(), max_workers)
+
+    def get_histories(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        frequencies: Iterable["Frequency"] = ("W", "M"),
+        calendar: Optional["TradingCalendar"] = None,
+        max_workers: int = 1,
+    ) -> dict["Frequency", list[HoldingPeriodRecord]]:
+        """Returns the history of the user's assets at several frequencies at once.
+
+        Only the periods of `common_periods` are requested, once each, and every
+        frequency is aggregated from them, so a weekly and monthly report costs
+        about as many requests as the weekly one alone.
+
+        Args:
+            start_date (date): The start date of the history.
+            end_date (Optional[date]): The end date of the history. Defaults to today.
+            frequencies (Iterable[Frequency], optional): The lengths of the periods, as in
+                `plan_periods`. Defaults to weekly and monthly.
+            calendar (Optional[TradingCalendar]): A trading calendar, such as `KRX_CALENDAR`.
+                Periods with no trading day are merged into their neighbours instead of
+                being requested. Defaults to none.
+            max_workers (int, optional): The maximum number of periods to fetch at once. Defaults to 1.
+
+        Returns:
+            dict[Frequency, list[HoldingPeriodRecord]]: The history at each frequency.
+
+        Raises:
+            HistoryFetchException: If some periods could not be fetched.
+        """
+        (plans, periods) = _plan_histories(start_date, end_date, frequencies, calendar)
+        records = self._get_account_history(periods, self._get_raw_account_numbers(), max_workers)
+        return _aggregate_histories(records, plans)
+
+    def _get_account_history(
+        self,
+        periods: list[tuple[date, date]],
+        raw_account_numbers: list[str],
+        max_workers: int,
+    ) -> list[HoldingPeriodRecord]:
+        stored = _load_history(self.history_store, raw_account_numbers, periods, self.observer)
+        missing_periods = [period for period in periods if period not in stored]
+        payloads = self._fetch_holding_period_payloads(missing_periods, raw_account_numbers, max_workers)
+        fetched = _parse_holding_period_payloads(missing_periods, payloads)
+        if self.history_store is not None:
+            self.history_store.save(raw_account_numbers, _fetched_records(fetched))
+        return _merge_history(periods, stored, fetched)
+
+    def _fetch_holding_period_payloads(
+        self,
+        periods: list[tuple[date, date]],
+        raw_account_numbers: list[str],
+        max_workers: int,
+    ) -> list[Union[Any, Exception]]:
+        def fetch(period: tuple[date, date]) -> Union[Any, Exception]:
+            try:
+                return self._post(
+                    HOLDING_PERIOD_RECORD_PATH,
+                    _holding_period_record_form(period[0], period[1], raw_account_numbers),
+                )
+            except Exception as e:  # noqa: BLE001 - reported per period by HistoryFetchException
+                return e
+
+        if max_workers > 1 and len(periods) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(periods))) as executor:
+                return list(executor.map(fetch, periods))
+        return [fetch(period) for period in periods]
+
+    def get_history_frame(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        max_workers: int = 1,
+        frequency: "Frequency" = "W",
+        calendar: Optional["TradingCalendar"] = None,
+    ) -> "np.ndarray":
+        """Returns the history of the weekly performance of the user's assets as columns.
+
+        The responses are read straight into a NumPy structured array with
+        `HISTORY_DTYPE`, without building a `HoldingPeriodRecord` per week, and
+        `pnl` and `pnl_percent` are computed for all weeks at once. Use
+        `to_dataframe` to turn the result into a pandas DataFrame.
+
+        Args:
+            start_date (date): The start date of the history.
+            end_date (Optional[date]): The end date of the history. Defaults to today.
+            max_workers (int, optional): The maximum number of weeks to fetch at once. Defaults to 1.
+            frequency (Frequency, optional): The length of the periods, as in `plan_periods`.
+                Defaults to weekly.
+            calendar (Optional[TradingCalendar]): A trading calendar, such as `KRX_CALENDAR`.
+                Periods with no trading day are merged into their neighbours instead of
+                being requested. Defaults to none.
+
+        Returns:
+            np.ndarray: The history, one row per week.
+
+        Raises:
+            HistoryFetchException: If some weeks could not be fetched.
+        """
+        from kstock_account.frames import history_to_array
+
+        periods = _plan_periods(start_date, end_date, frequency, calendar)
         account_numbers = self._get_raw_account_numbers()
-        history = [
-            self._get_account_holding_period_record(target_start_date, target_end_date, account_numbers)
-            for (target_start_date, target_end_date) in weekrange(start_date, end_date)
-        ]
-        return history
+        if self.history_store is not None:
+            return history_to_array(self._get_account_history(periods, account_numbers, max_workers))
+        return _holding_period_array(
+            periods,
+            self._fetch_holding_period_payloads(periods, account_numbers, max_workers),
+        )
+
+    def sync_history(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        max_workers: int = 1,
+        frequency: "Frequency" = "W",
+        calendar: Optional["TradingCalendar"] = None,
+    ) -> list[HoldingPeriodRecord]:
+        """Brings the history store up to date and returns the history.
+
+        Every closed week between `start_date` and `end_date` that is missing
+        from the store is fetched and saved.
+
+        Args:
+            start_date (date): The start date of the history.
+            end_date (Optional[date]): The end date of the history. Defaults to today.
+            max_workers (int, optional): The maximum number of weeks to fetch at once. Defaults to 1.
+            frequency (Frequency, optional): The length of the periods, as in `plan_periods`.
+                Defaults to weekly.
+            calendar (Optional[TradingCalendar]): A trading calendar, such as `KRX_CALENDAR`.
+                Periods with no trading day are merged into their neighbours instead of
+                being requested. Defaults to none.
+
+        Returns:
+            List[HoldingPeriodRecord]: The history of the weekly performance of the user's assets.
+
+        Raises:
+            ValueError: If the account has no history store.
+            HistoryFetchException: If some weeks could not be fetched.
+        """
+        if self.history_store is None:
+            raise ValueError("the account has no history store")
+        return self.get_history(start_date, end_date, max_workers, frequency, calendar)
+
+    def iter_history(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        resume_after: Optional[date] = None,
+        max_workers: int = 1,
+        read_ahead: Optional[int] = None,
+        frequency: "Frequency" = "W",
+        calendar: Optional["TradingCalendar"] = None,
+    ) -> "HistoryIterator":
+        """Iterates over the weekly performance of the user's assets as each week arrives.
+
+        Unlike `get_history`, records are yielded one at a time, so a long
+        backfill makes progress visible and does not hold the whole history in
+        memory. If the iteration fails, its `cursor` holds the end date of the
+        last week yielded, which can be passed back as `resume_after`.
+
+        Args:
+            start_date (date): The start date of the history.
+            end_date (Optional[date]): The end date of the history. Defaults to today.
+            resume_after (Optional[date]): The cursor of an earlier iteration. Weeks
+                ending on or before it are skipped.
+            max_workers (int, optional): The maximum number of weeks to fetch at once. Defaults to 1.
+            read_ahead (Optional[int]): The maximum number of weeks fetched ahead of the
+                one being yielded. Defaults to twice `max_workers`.
+            frequency (Frequency, optional): The length of the periods, as in `plan_periods`.
+                Defaults to weekly.
+            calendar (Optional[TradingCalendar]): A trading calendar, such as `KRX_CALENDAR`.
+                Periods with no trading day are merged into their neighbours instead of
+                being requested. Defaults to none.
+
+        Returns:
+            HistoryIterator: An iterator over the history, in chronological order.
+        """
+        periods = _plan_periods(start_date, end_date, frequency, calendar, resume_after)
+        records = self._iter_account_history(periods, max_workers, read_ahead or 2 * max_workers)
+        return HistoryIterator(records, resume_after)
+
+    def _iter_account_history(
+        self,
+        periods: list[tuple[date, date]],
+        max_workers: int,
+        read_ahead: int,
+    ) -> Iterator[HoldingPeriodRecord]:
+        if not periods:
+            return
+        raw_account_numbers = self._get_raw_account_numbers()
+        stored = _load_history(self.history_store, raw_account_numbers, periods, self.observer)
+
+        def fetch(period: tuple[date, date]) -> HoldingPeriodRecord:
+            record = self._get_account_holding_period_record(period[0], period[1], raw_account_numbers)
+            if self.history_store is not None:
+                self.history_store.save(raw_account_numbers, [record])
+            return record
+
+        if max_workers <= 1:
+            for period in periods:
+                yield stored[period] if period in stored else fetch(period)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            window: deque[Union[HoldingPeriodRecord, Future[HoldingPeriodRecord]]] = deque()
+            for period in periods:
+                window.append(stored[period] if period in stored else executor.submit(fetch, period))
+                if len(window) > read_ahead:
+                    yield _await_record(window.popleft())
+            while window:
+                yield _await_record(window.popleft())
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def get_holding_period_record(self, start_date: date, end_date: Optional[date] = None) -> HoldingPeriodRecord:
         """Returns the record of PnL of the user's assets.
-        
+
         Args:
             start_date (date): The start date of the history.
             end_date (Optional[date]): The end date of the history. Defaults to today.
-        
+
         Returns:
             HoldingPeriodRecord: The record of PnL of the user's assets.
         """
@@ -239,28 +709,1046 @@ class MiraeAccount:
         end_date: date,
         raw_account_numbers: list[str],
     ) -> HoldingPeriodRecord:
-        r = requests.post(
-            "https://securities.miraeasset.com/hkd/hkd1005/a01.json",
-            data={
-                "ivst_pca_tp": "3",
-                "bns_tlex_mtd_tp": "2",
-                "strt_dt": start_date.strftime("%Y%m%d"),
-                "end_dt": end_date.strftime("%Y%m%d"),
-                "grid_cnt01": len(raw_account_numbers),
-                **{f"GRID01_IN_acno_{i}": account_number for (i, account_number) in enumerate(raw_account_numbers)},
-            },
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-            cookies={"MIREADW_D": self.access_token},
+        data = self._post(
+            HOLDING_PERIOD_RECORD_PATH,
+            _holding_period_record_form(start_date, end_date, raw_account_numbers),
+        )
+        return _parse_holding_period_record(data, start_date, end_date)
+
+
+class AsyncMiraeAccount(_BaseMiraeAccount[AsyncMiraeTransport]):
+    """Represents a Mirae Asset Securities account accessed with asyncio.
+
+    It mirrors the API of `MiraeAccount` and shares its response parsing, but
+    sends requests through an `AsyncMiraeTransport`, so many requests can be in
+    flight without a thread each. Requires the `httpx` package.
+
+    Attributes:
+        access_token (str): The access token for the account API.
+        symbol_resolver (SymbolResolver): The resolver used to map equity symbols to Yahoo Finance symbols.
+        history_store (Optional[HistoryStore]): The store of closed weeks consulted by `get_history`.
+        transport (AsyncMiraeTransport): The async HTTP transport used for API calls.
+        observer (Optional[Observer]): The function called with a `CallEvent` after each instrumented call.
+        metadata_cache (MetadataCache): The cache of the account numbers and other session metadata.
+    """
+
+    @staticmethod
+    async def login(
+        user_id: str,
+        user_password: str,
+        webdriver_fn: Callable[[], "webdriver.Remote"] = create_headless_edge_webdriver,
+        transport: Optional[AsyncMiraeTransport] = None,
+        token_store: Optional[FileTokenStore] = None,
+        token_ttl: timedelta = timedelta(minutes=30),
+        auto_refresh: bool = False,
+        http_login: bool = False,
+    ) -> "AsyncMiraeAccount":
+        """Logs in to Mirae Asset Securities website using the provided user credentials.
+
+        The browser login runs in a worker thread so that it does not block the
+        event loop. Token reuse works as in `MiraeAccount.login`.
+
+        Args:
+            user_id (str): The user ID for the Mirae Asset account.
+            user_password (str): The password for the Mirae Asset account.
+            webdriver_fn (Callable[[], webdriver.Remote], optional):
+                A function that creates a webdriver instance. Defaults to
+                `create_headless_edge_webdriver`.
+            transport (Optional[AsyncMiraeTransport]): The transport for the logged-in
+                account. Defaults to a new `AsyncMiraeTransport`.
+            token_store (Optional[FileTokenStore]): The store to reuse and save access tokens.
+            token_ttl (timedelta, optional): How long a new access token is assumed to
+                stay valid. Defaults to 30 minutes.
+            auto_refresh (bool, optional): Whether to refresh the access token in the
+                background before it expires. Defaults to False.
+            http_login (bool, optional): Whether to first try logging in by submitting
+                the login form over plain HTTP, without a browser. The login succeeds
+                only if it lands on the main page; the browser login is used if it
+                fails. Defaults to False.
+
+        Returns:
+            AsyncMiraeAccount: An instance of the AsyncMiraeAccount class with the
+            access token.
+
+        Raises:
+            LoginFailedException: If the login attempt fails.
+        """
+        login_fn = _login_fn(user_id, user_password, webdriver_fn, http_login, transport)
+        token = await asyncio.to_thread(token_store.load, user_id) if token_store is not None else None
+        if token is not None and not token.is_expired():
+            account = AsyncMiraeAccount(token.access_token, transport)
+            if not await account._has_valid_token():
+                token = None
+        if token is None or token.is_expired():
+            token = StoredToken(await asyncio.to_thread(login_fn), datetime.now() + token_ttl)
+            if token_store is not None:
+                await asyncio.to_thread(token_store.save, user_id, token)
+            account = AsyncMiraeAccount(token.access_token, transport)
+        account._attach_token_refresher(user_id, login_fn, token, token_store, token_ttl, auto_refresh)
+        return account
+
+    def __init__(
+        self,
+        access_token: str,
+        transport: Optional[AsyncMiraeTransport] = None,
+        symbol_resolver: Optional[SymbolResolver] = None,
+        history_store: Optional[HistoryStore] = None,
+        observer: Optional[Observer] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+    ) -> None:
+        """Constructs an AsyncMiraeAccount instance.
+
+        Args:
+            access_token (str): The access token for the account.
+            transport (Optional[AsyncMiraeTransport]): The async HTTP transport to send
+                requests through. Defaults to a new `AsyncMiraeTransport`.
+            symbol_resolver (Optional[SymbolResolver]): The resolver used to map equity
+                symbols to Yahoo Finance symbols. Defaults to the shared, disk-cached resolver,
+                which is created on the first resolution.
+            history_store (Optional[HistoryStore]): The store that `get_history` reads
+                closed weeks from and saves them to. Defaults to no store.
+            observer (Optional[Observer]): A function called with a `CallEvent` after each
+                request, symbol resolution and history store lookup. Defaults to none,
+                which skips the instrumentation entirely.
+            metadata_cache (Optional[MetadataCache]): The cache of the account numbers and
+                other session metadata. It is cleared whenever the access token changes.
+                Defaults to a new cache that serves values for 10 minutes.
+        """
+        super().__init__(
+            access_token,
+            transport if transport is not None else AsyncMiraeTransport(),
+            symbol_resolver,
+            history_store,
+            observer,
+            metadata_cache,
+        )
+
+    async def _post(self, path: str, data: Optional[dict[str, Any]] = None) -> Any:
+        if self.token_refresher is not None and self.token_refresher.needs_refresh():
+            self.access_token = await asyncio.to_thread(self.token_refresher.refresh)
+        return _check_response(path, await self.transport.post(path, data))
+
+    async def _timed_post(self, path: str, data: Optional[dict[str, Any]] = None) -> tuple[Any, float]:
+        started_at = time.perf_counter()
+        response = await self._post(path, data)
+        return (response, time.perf_counter() - started_at)
+
+    async def _post_changed(
+        self,
+        path: str,
+        data: Optional[dict[str, Any]] = None,
+        digest: Optional[bytes] = None,
+    ) -> tuple[bytes, Any]:
+        if self.token_refresher is not None and self.token_refresher.needs_refresh():
+            self.access_token = await asyncio.to_thread(self.token_refresher.refresh)
+        (digest, response) = await self.transport.post_changed(path, data, digest)
+        return (digest, None if response is None else _check_response(path, response))
+
+    async def _has_valid_token(self) -> bool:
+        self.metadata_cache.invalidate(RAW_ACCOUNT_NUMBERS_KEY)
+        try:
+            await self._get_raw_account_numbers()
+        except (SessionExpiredException, MalformedResponseException):
+            return False
+        return True
+
+    async def get_account_numbers(self) -> list[str]:
+        """Returns the account numbers of the user's accounts.
+
+        The account numbers are cached in `metadata_cache`.
+
+        Returns:
+            list[str]: A list of account numbers.
+        """
+
+        async def load() -> list[str]:
+            return list(map(_prettify_account_number, await self._get_raw_account_numbers()))
+
+        return list(await self.metadata_cache.get_async(ACCOUNT_NUMBERS_KEY, load))
+
+    async def _get_raw_account_numbers(self) -> list[str]:
+        async def load() -> list[str]:
+            return _parse_account_numbers(await self._post(ACCOUNT_LIST_PATH))
+
+        return list(await self.metadata_cache.get_async(RAW_ACCOUNT_NUMBERS_KEY, load))
+
+    async def get_assets(self, timings: Optional[dict[str, float]] = None) -> list[HeldAsset]:
+        """Returns the assets held by the user.
+
+        The list includes cash assets, equities, and gold spots. The holdings
+        endpoints are requested concurrently.
+
+        Args:
+            timings (Optional[dict[str, float]]): A dictionary to fill with the time
+                in seconds spent on each request, keyed by the names in `ASSET_REQUESTS`,
+                and on `symbol_resolution`.
+
+        Returns:
+            list[HeldAsset]: A list of held assets.
+        """
+        responses = await self._fetch_asset_payloads(timings)
+        started_at = time.perf_counter()
+        equities = await self._build_equities(responses["equities"])
+        if timings is not None:
+            timings["symbol_resolution"] = time.perf_counter() - started_at
+        return _assemble_assets(responses, equities)
+
+    async def get_assets_frame(self) -> "np.ndarray":
+        """Returns the assets held by the user as columns.
+
+        The asyncio counterpart of `MiraeAccount.get_assets_frame`.
+
+        Returns:
+            np.ndarray: The held assets, one row per holding.
+        """
+        responses = await self._fetch_asset_payloads()
+        symbols = await asyncio.to_thread(_resolve_symbols, self.symbol_resolver, responses["equities"], self.observer)
+        return _asset_array(responses, symbols)
+
+    async def _fetch_asset_payloads(self, timings: Optional[dict[str, float]] = None) -> dict[str, Any]:
+        responses = await asyncio.gather(*(self._timed_post(path, data) for (path, data) in ASSET_REQUESTS.values()))
+        return _split_timings(dict(zip(ASSET_REQUESTS, responses)), timings)
+
+    async def _fetch_changed_asset_payloads(self, digests: Mapping[str, bytes]) -> dict[str, tuple[bytes, Any]]:
+        responses = await asyncio.gather(
+            *(self._post_changed(path, data, digests.get(name)) for (name, (path, data)) in ASSET_REQUESTS.items()),
+        )
+        return dict(zip(ASSET_REQUESTS, responses))
+
+    async def get_cash_assets(self) -> list[HeldCash]:
+        """Returns the cash assets held by the user.
+
+        Returns:
+            list[HeldCash]: A list of held cash assets.
+        """
+        foreign_currency_data, cash_equivalent_data = await asyncio.gather(
+            self._post(FOREIGN_CURRENCY_PATH, FOREIGN_CURRENCY_FORM),
+            self._post(CASH_EQUIVALENT_PATH),
+        )
+        return [*_parse_foreign_currencies(foreign_currency_data), *_parse_cash_equivalents(cash_equivalent_data)]
+
+    async def get_equity_assets(self) -> list[HeldEquity]:
+        """Returns the equities held by the user.
+
+        Each distinct symbol is resolved once. An equity whose symbol cannot be
+        resolved keeps the broker's symbol.
+
+        Returns:
+            list[HeldEquity]: A list of held equities.
+        """
+        return await self._build_equities(await self._post(HOLDING_PATH, EQUITY_HOLDING_FORM))
+
+    async def _build_equities(self, data: Any) -> list[HeldEquity]:
+        symbols = await asyncio.to_thread(_resolve_symbols, self.symbol_resolver, data, self.observer)
+        return _parse_equities(data, symbols)
+
+    async def _build_assets(self, name: str, data: Any) -> Sequence[HeldAsset]:
+        if name == "equities":
+            return await self._build_equities(data)
+        return _parse_assets(name, data)
+
+    async def get_gold_spot_assets(self) -> list[HeldGoldSpot]:
+        """Returns the gold spots held by the user.
+
+        Returns:
+            list[HeldGoldSpot]: A list of held gold spots.
+        """
+        return _parse_gold_spots(await self._post(HOLDING_PATH, GOLD_SPOT_HOLDING_FORM))
+
+    async def get_history(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        frequency: "Frequency" = "W",
+        calendar: Optional["TradingCalendar"] = None,
+    ) -> list[HoldingPeriodRecord]:
+        """Returns the history of the weekly performance of the user's assets.
+
+        All weeks are requested concurrently, capped by the transport's `max_concurrency`.
+        With a `history_store`, only the weeks missing from the store and the
+        still-open current week are requested.
+
+        Args:
+            start_date (date): The start date of the history.
+            end_date (Optional[date]): The end date of the history. Defaults to today.
+            frequency (Frequency, optional): The length of the periods, as in `plan_periods`.
+                Defaults to weekly.
+            calendar (Optional[TradingCalendar]): A trading calendar, such as `KRX_CALENDAR`.
+                Periods with no trading day are merged into their neighbours instead of
+                being requested. Defaults to none.
+
+        Returns:
+            List[HoldingPeriodRecord]: The history of the weekly performance of the user's assets.
+
+        Raises:
+            HistoryFetchException: If some weeks could not be fetched. The weeks that
+                were fetched are available on the exception.
+        """
+        periods = _plan_periods(start_date, end_date, frequency, calendar)
+        return await self._get_account_history(periods, await self._get_raw_account_numbers())
+
+    async def get_histories(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        frequencies: Iterable["Frequency"] = ("W", "M"),
+        calendar: Optional["TradingCalendar"] = None,
+    ) -> dict["Frequency", list[HoldingPeriodRecord]]:
+        """Returns the history of the user's assets at several frequencies at once.
+
+        The asyncio counterpart of `MiraeAccount.get_histories`.
+
+        Args:
+            start_date (date): The start date of the history.
+            end_date (Optional[date]): The end date of the history. Defaults to today.
+            frequencies (Iterable[Frequency], optional): The lengths of the periods, as in
+                `plan_periods`. Defaults to weekly and monthly.
+            calendar (Optional[TradingCalendar]): A trading calendar, such as `KRX_CALENDAR`.
+                Periods with no trading day are merged into their neighbours instead of
+                being requested. Defaults to none.
+
+        Returns:
+            dict[Frequency, list[HoldingPeriodRecord]]: The history at each frequency.
+
+        Raises:
+            HistoryFetchException: If some periods could not be fetched.
+        """
+        (plans, periods) = _plan_histories(start_date, end_date, frequencies, calendar)
+        records = await self._get_account_history(periods, await self._get_raw_account_numbers())
+        return _aggregate_histories(records, plans)
+
+    async def _get_account_history(
+        self,
+        periods: list[tuple[date, date]],
+        raw_account_numbers: list[str],
+    ) -> list[HoldingPeriodRecord]:
+        stored = await self._load_history(raw_account_numbers, periods)
+        missing_periods = [period for period in periods if period not in stored]
+        payloads = await self._fetch_holding_period_payloads(missing_periods, raw_account_numbers)
+        fetched = _parse_holding_period_payloads(missing_periods, payloads)
+        if self.history_store is not None:
+            await asyncio.to_thread(self.history_store.save, raw_account_numbers, _fetched_records(fetched))
+        return _merge_history(periods, stored, fetched)
+
+    async def _load_history(
+        self,
+        raw_account_numbers: list[str],
+        periods: list[tuple[date, date]],
+    ) -> dict[tuple[date, date], HoldingPeriodRecord]:
+        if self.history_store is None:
+            return {}
+        return await asyncio.to_thread(_load_history, self.history_store, raw_account_numbers, periods, self.observer)
+
+    async def _fetch_holding_period_payloads(
+        self,
+        periods: list[tuple[date, date]],
+        raw_account_numbers: list[str],
+    ) -> list[Union[Any, BaseException]]:
+        forms = [_holding_period_record_form(*period, raw_account_numbers) for period in periods]
+        return await asyncio.gather(
+            *(self._post(HOLDING_PERIOD_RECORD_PATH, form) for form in forms),
+            return_exceptions=True,
+        )
+
+    async def get_history_frame(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        frequency: "Frequency" = "W",
+        calendar: Optional["TradingCalendar"] = None,
+    ) -> "np.ndarray":
+        """Returns the history of the weekly performance of the user's assets as columns.
+
+        The asyncio counterpart of `MiraeAccount.get_history_frame`.
+
+        Args:
+            start_date (date): The start date of the history.
+            end_date (Optional[date]): The end date of the history. Defaults to today.
+            frequency (Frequency, optional): The length of the periods, as in `plan_periods`.
+                Defaults to weekly.
+            calendar (Optional[TradingCalendar]): A trading calendar, such as `KRX_CALENDAR`.
+                Periods with no trading day are merged into their neighbours instead of
+                being requested. Defaults to none.
+
+        Returns:
+            np.ndarray: The history, one row per week.
+
+        Raises:
+            HistoryFetchException: If some weeks could not be fetched.
+        """
+        from kstock_account.frames import history_to_array
+
+        periods = _plan_periods(start_date, end_date, frequency, calendar)
+        account_numbers = await self._get_raw_account_numbers()
+        if self.history_store is not None:
+            return history_to_array(await self._get_account_history(periods, account_numbers))
+        return _holding_period_array(periods, await self._fetch_holding_period_payloads(periods, account_numbers))
+
+    async def sync_history(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        frequency: "Frequency" = "W",
+        calendar: Optional["TradingCalendar"] = None,
+    ) -> list[HoldingPeriodRecord]:
+        """Brings the history store up to date and returns the history.
+
+        Every closed week between `start_date` and `end_date` that is missing
+        from the store is fetched and saved.
+
+        Args:
+            start_date (date): The start date of the history.
+            end_date (Optional[date]): The end date of the history. Defaults to today.
+            frequency (Frequency, optional): The length of the periods, as in `plan_periods`.
+                Defaults to weekly.
+            calendar (Optional[TradingCalendar]): A trading calendar, such as `KRX_CALENDAR`.
+                Periods with no trading day are merged into their neighbours instead of
+                being requested. Defaults to none.
+
+        Returns:
+            List[HoldingPeriodRecord]: The history of the weekly performance of the user's assets.
+
+        Raises:
+            ValueError: If the account has no history store.
+            HistoryFetchException: If some weeks could not be fetched.
+        """
+        if self.history_store is None:
+            raise ValueError("the account has no history store")
+        return await self.get_history(start_date, end_date, frequency, calendar)
+
+    def iter_history(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        resume_after: Optional[date] = None,
+        read_ahead: int = 8,
+        frequency: "Frequency" = "W",
+        calendar: Optional["TradingCalendar"] = None,
+    ) -> "AsyncHistoryIterator":
+        """Iterates over the weekly performance of the user's assets as each week arrives.
+
+        The asyncio counterpart of `MiraeAccount.iter_history`. Up to
+        `read_ahead` weeks are requested concurrently ahead of the one being
+        yielded.
+
+        Args:
+            start_date (date): The start date of the history.
+            end_date (Optional[date]): The end date of the history. Defaults to today.
+            resume_after (Optional[date]): The cursor of an earlier iteration. Weeks
+                ending on or before it are skipped.
+            read_ahead (int, optional): The maximum number of weeks fetched ahead of the
+                one being yielded. Defaults to 8.
+            frequency (Frequency, optional): The length of the periods, as in `plan_periods`.
+                Defaults to weekly.
+            calendar (Optional[TradingCalendar]): A trading calendar, such as `KRX_CALENDAR`.
+                Periods with no trading day are merged into their neighbours instead of
+                being requested. Defaults to none.
+
+        Returns:
+            AsyncHistoryIterator: An async iterator over the history, in chronological order.
+        """
+        periods = _plan_periods(start_date, end_date, frequency, calendar, resume_after)
+        return AsyncHistoryIterator(self._iter_account_history(periods, read_ahead), resume_after)
+
+    async def _iter_account_history(
+        self,
+        periods: list[tuple[date, date]],
+        read_ahead: int,
+    ) -> AsyncIterator[HoldingPeriodRecord]:
+        if not periods:
+            return
+        raw_account_numbers = await self._get_raw_account_numbers()
+        stored = await self._load_history(raw_account_numbers, periods)
+
+        async def fetch(period: tuple[date, date]) -> HoldingPeriodRecord:
+            record = await self._get_account_holding_period_record(period[0], period[1], raw_account_numbers)
+            if self.history_store is not None:
+                await asyncio.to_thread(self.history_store.save, raw_account_numbers, [record])
+            return record
+
+        window: deque[Union[HoldingPeriodRecord, asyncio.Task[HoldingPeriodRecord]]] = deque()
+        try:
+            for period in periods:
+                window.append(stored[period] if period in stored else asyncio.ensure_future(fetch(period)))
+                if len(window) > read_ahead:
+                    yield await _await_record_async(window.popleft())
+            while window:
+                yield await _await_record_async(window.popleft())
+        finally:
+            for pending in window:
+                if isinstance(pending, asyncio.Task):
+                    pending.cancel()
+
+    async def get_holding_period_record(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+    ) -> HoldingPeriodRecord:
+        """Returns the record of PnL of the user's assets.
+
+        Args:
+            start_date (date): The start date of the history.
+            end_date (Optional[date]): The end date of the history. Defaults to today.
+
+        Returns:
+            HoldingPeriodRecord: The record of PnL of the user's assets.
+        """
+        if end_date is None:
+            end_date = datetime.now().date()
+        account_numbers = await self._get_raw_account_numbers()
+        return await self._get_account_holding_period_record(start_date, end_date, account_numbers)
+
+    async def _get_account_holding_period_record(
+        self,
+        start_date: date,
+        end_date: date,
+        raw_account_numbers: list[str],
+    ) -> HoldingPeriodRecord:
+        data = await self._post(
+            HOLDING_PERIOD_RECORD_PATH,
+            _holding_period_record_form(start_date, end_date, raw_account_numbers),
         )
-        data = r.json()
-        return HoldingPeriodRecord(
-            start_date=start_date,
-            end_date=end_date,
-            initial_value=int(data["bss_ea"]),
-            closing_value=int(data["eot_ea"]),
-            cash_inflow=int(data["mnyi_a"]) + int(data["inq_a"]),
-            cash_outflow=int(data["mnyo_a"]) + int(data["outq_a"]),
+        return _parse_holding_period_record(data, start_date, end_date)
+
+
+class HistoryIterator(Iterator[HoldingPeriodRecord]):
+    """An iterator over holding period records that tracks how far it got.
+
+    Attributes:
+        cursor (Optional[date]): The end date of the last record yielded. Pass it
+            as `resume_after` to continue after a failure.
+    """
+
+    def __init__(self, records: Iterator[HoldingPeriodRecord], cursor: Optional[date] = None) -> None:
+        """Constructs a HistoryIterator instance.
+
+        Args:
+            records (Iterator[HoldingPeriodRecord]): The records to iterate over.
+            cursor (Optional[date]): The cursor to start from.
+        """
+        self._records = records
+        self.cursor = cursor
+
+    def __next__(self) -> HoldingPeriodRecord:
+        """Returns the next record and advances the cursor."""
+        record = next(self._records)
+        self.cursor = record.end_date
+        return record
+
+    def close(self) -> None:
+        """Stops the iteration and cancels the weeks fetched ahead."""
+        close = getattr(self._records, "close", None)
+        if close is not None:
+            close()
+
+
+class AsyncHistoryIterator(AsyncIterator[HoldingPeriodRecord]):
+    """An async iterator over holding period records that tracks how far it got.
+
+    Attributes:
+        cursor (Optional[date]): The end date of the last record yielded. Pass it
+            as `resume_after` to continue after a failure.
+    """
+
+    def __init__(self, records: AsyncIterator[HoldingPeriodRecord], cursor: Optional[date] = None) -> None:
+        """Constructs an AsyncHistoryIterator instance.
+
+        Args:
+            records (AsyncIterator[HoldingPeriodRecord]): The records to iterate over.
+            cursor (Optional[date]): The cursor to start from.
+        """
+        self._records = records
+        self.cursor = cursor
+
+    async def __anext__(self) -> HoldingPeriodRecord:
+        """Returns the next record and advances the cursor."""
+        record = await self._records.__anext__()
+        self.cursor = record.end_date
+        return record
+
+    async def aclose(self) -> None:
+        """Stops the iteration and cancels the weeks fetched ahead."""
+        aclose = getattr(self._records, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def _login(
+    user_id: str,
+    user_password: str,
+    webdriver_fn: Callable[[], "webdriver.Remote"],
+    http_login: bool,
+    base_url: str,
+) -> str:
+    if http_login:
+        try:
+            return _login_with_http(user_id, user_password, base_url)
+        except (LoginFailedException, requests.RequestException):
+            pass
+    return _login_with_webdriver(user_id, user_password, webdriver_fn)
+
+
+def _login_fn(
+    user_id: str,
+    user_password: str,
+    webdriver_fn: Callable[[], "webdriver.Remote"],
+    http_login: bool,
+    transport: Optional[Union[MiraeTransport, AsyncMiraeTransport]],
+) -> Callable[[], str]:
+    base_url = transport.base_url if transport is not None else MIRAE_BASE_URL
+    return partial(_login, user_id, user_password, webdriver_fn, http_login, base_url)
+
+
+def _login_with_http(user_id: str, user_password: str, base_url: str, timeout: float = 10.0) -> str:
+    with requests.Session() as session:
+        r = session.get(base_url + "/mw/login.do", timeout=timeout)
+        r.raise_for_status()
+        parser = _LoginFormParser()
+        parser.feed(r.text)
+        if parser.action is None:
+            raise LoginFailedException
+
+        # The login page's `doSubmit()` may transform `clt_ecp_pwd` in the browser before posting the form.
+        # The password is posted as typed here, so a login is trusted only if it lands on the main page, the
+        # same check as the browser login; the server may set the cookie on a rejected login too.
+        r = session.post(
+            urljoin(r.url, parser.action),
+            data={**parser.fields, "usid": user_id, "clt_ecp_pwd": user_password},
+            timeout=timeout,
+        )
+        r.raise_for_status()
+        if urlsplit(r.url).path != "/mw/main.do":
+            raise LoginFailedException
+        if access_token := session.cookies.get(MIRAE_ACCESS_TOKEN_COOKIE):
+            return access_token
+        raise LoginFailedException
+
+
+class _LoginFormParser(HTMLParser):
+    """Finds the form that contains the `usid` field and collects its fields."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.action: Optional[str] = None
+        self.fields: dict[str, str] = {}
+        self._form_action: Optional[str] = None
+        self._form_fields: dict[str, str] = {}
+        self._has_user_id_field = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        attributes = dict(attrs)
+        if tag == "form":
+            self._form_action = attributes.get("action") or ""
+            self._form_fields = {}
+            self._has_user_id_field = False
+        elif tag == "input" and self._form_action is not None and (name := attributes.get("name")):
+            self._form_fields[name] = attributes.get("value") or ""
+            self._has_user_id_field |= name == "usid"
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "form" and self._form_action is not None:
+            if self._has_user_id_field and self.action is None:
+                self.action = self._form_action
+                self.fields = self._form_fields
+            self._form_action = None
+
+
+def _login_with_webdriver(user_id: str, user_password: str, webdriver_fn: Callable[[], "webdriver.Remote"]) -> str:
+    driver = webdriver_fn()
+    try:
+        return _login_with_driver(driver, user_id, user_password)
+    finally:
+        driver.quit()
+
+
+def _login_with_driver(driver: "webdriver.Remote", user_id: str, user_password: str) -> str:
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.wait import WebDriverWait
+
+    try:
+        driver.get("https://securities.miraeasset.com/mw/login.do")
+
+        driver.execute_script(f"document.querySelector('#usid').value = '{user_id}';")
+        driver.execute_script(f"document.querySelector('#clt_ecp_pwd').value = '{user_password}';")
+        driver.execute_script("doSubmit();")
+        _ = WebDriverWait(driver, 5).until(
+            lambda x: x.current_url == "https://securities.miraeasset.com/mw/main.do",
         )
+    except TimeoutException:
+        raise LoginFailedException
+
+    if cookie := driver.get_cookie("MIREADW_D"):
+        access_token: str = cookie["value"]
+        return access_token
+    raise LoginFailedException
+
+
+def _collect_history(
+    periods: list[tuple[date, date]],
+    results: Sequence[Union[HoldingPeriodRecord, BaseException]],
+) -> list[HoldingPeriodRecord]:
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            raise result
+    history = [result for result in results if isinstance(result, HoldingPeriodRecord)]
+    failures = {period: result for (period, result) in zip(periods, results) if isinstance(result, Exception)}
+    if failures:
+        raise HistoryFetchException(history, failures)
+    return history
+
+
+def _await_record(record: Union[HoldingPeriodRecord, "Future[HoldingPeriodRecord]"]) -> HoldingPeriodRecord:
+    return record if isinstance(record, HoldingPeriodRecord) else record.result()
+
+
+async def _await_record_async(
+    record: Union[HoldingPeriodRecord, "asyncio.Task[HoldingPeriodRecord]"],
+) -> HoldingPeriodRecord:
+    return record if isinstance(record, HoldingPeriodRecord) else await record
+
+
+def _plan_periods(
+    start_date: date,
+    end_date: Optional[date],
+    frequency: "Frequency",
+    calendar: Optional["TradingCalendar"],
+    resume_after: Optional[date] = None,
+) -> list[tuple[date, date]]:
+    if end_date is None:
+        end_date = datetime.now().date()
+    if resume_after is not None:
+        start_date = max(start_date, resume_after + timedelta(days=1))
+    if start_date > end_date:
+        return []
+    if frequency == "W" and calendar is None:
+        return list(weekrange(start_date, end_date))
+    from kstock_account.periods import plan_periods
+
+    return plan_periods(start_date, end_date, frequency, calendar)
+
+
+def _plan_histories(
+    start_date: date,
+    end_date: Optional[date],
+    frequencies: Iterable["Frequency"],
+    calendar: Optional["TradingCalendar"],
+) -> tuple[dict["Frequency", list[tuple[date, date]]], list[tuple[date, date]]]:
+    from kstock_account.periods import common_periods, plan_periods
+
+    if end_date is None:
+        end_date = datetime.now().date()
+    plans = {frequency: plan_periods(start_date, end_date, frequency, calendar) for frequency in frequencies}
+    return (plans, common_periods(plans.values()))
+
+
+def _aggregate_histories(
+    records: list[HoldingPeriodRecord],
+    plans: dict["Frequency", list[tuple[date, date]]],
+) -> dict["Frequency", list[HoldingPeriodRecord]]:
+    from kstock_account.periods import aggregate_history
+
+    return {frequency: aggregate_history(records, periods) for (frequency, periods) in plans.items()}
+
+
+def _parse_holding_period_payloads(
+    periods: list[tuple[date, date]],
+    payloads: Sequence[Union[Any, BaseException]],
+) -> dict[tuple[date, date], Union[HoldingPeriodRecord, BaseException]]:
+    fetched: dict[tuple[date, date], Union[HoldingPeriodRecord, BaseException]] = {}
+    for (period, payload) in zip(periods, payloads):
+        if isinstance(payload, BaseException):
+            fetched[period] = payload
+            continue
+        try:
+            fetched[period] = _parse_holding_period_record(payload, *period)
+        except (KeyError, TypeError, ValueError) as e:
+            fetched[period] = e
+    return fetched
+
+
+def _fetched_records(
+    fetched: dict[tuple[date, date], Union[HoldingPeriodRecord, BaseException]],
+) -> list[HoldingPeriodRecord]:
+    return [result for result in fetched.values() if isinstance(result, HoldingPeriodRecord)]
+
+
+def _merge_history(
+    periods: list[tuple[date, date]],
+    stored: dict[tuple[date, date], HoldingPeriodRecord],
+    fetched: dict[tuple[date, date], Union[HoldingPeriodRecord, BaseException]],
+) -> list[HoldingPeriodRecord]:
+    return _collect_history(periods, [stored[period] if period in stored else fetched[period] for period in periods])
+
+
+def _holding_period_array(
+    periods: list[tuple[date, date]],
+    payloads: Sequence[Union[Any, BaseException]],
+) -> "np.ndarray":
+    from kstock_account.frames import history_array, parse_columns
+
+    if any(isinstance(payload, BaseException) for payload in payloads):
+        _collect_history(periods, list(_parse_holding_period_payloads(periods, payloads).values()))
+    columns = parse_columns(
+        cast("list[Any]", payloads),
+        dict.fromkeys(("bss_ea", "eot_ea", "mnyi_a", "inq_a", "mnyo_a", "outq_a"), "i8"),
+    )
+    return history_array(
+        [start_date for (start_date, _) in periods],
+        [end_date for (_, end_date) in periods],
+        columns["bss_ea"],
+        columns["eot_ea"],
+        columns["mnyi_a"] + columns["inq_a"],
+        columns["mnyo_a"] + columns["outq_a"],
+    )
+
+
+def _asset_array(responses: dict[str, Any], symbols: dict[str, str]) -> "np.ndarray":
+    import numpy as np
+
+    from kstock_account.frames import asset_array, parse_columns
+
+    foreign_currencies = parse_columns(
+        responses["foreign_currencies"]["GRID01"],
+        {"acno": "O", "curr_cd": "O", "bas_exr": "f8", "mnyo_abl_a": "f8"},
+    )
+    cash_equivalents = parse_columns(
+        responses["cash_equivalents"]["grid01"],
+        {
+            "acno": "O",
+            "rp_pd_nm": "O",
+            "curr_cd": "O",
+            "ea": "f8",
+            "frc_ea": "f8",
+            "frc_rp_ctrt_a": "f8",
+            "rpc_parg_dt": "M8[D]",
+        },
+    )
+    equity_rows = responses["equities"]["grid01"]
+    holdings = parse_columns(
+        [*equity_rows, *responses["gold_spots"]["grid01"]],
+        {
+            "admn_acno": "O",
+            "itm_nm1": "O",
+            "curr_cd": "O",
+            "itm_no": "O",
+            "ea": "f8",
+            "pitm_ea": "f8",
+            "hldg_q": "f8",
+            "pchs_a1": "f8",
+        },
+    )
+    cash_count = len(foreign_currencies["acno"]) + len(cash_equivalents["acno"])
+    holding_symbols = holdings["itm_no"].copy()
+    holding_symbols[: len(equity_rows)] = [
+        symbols.get(symbol, symbol) for symbol in holding_symbols[: len(equity_rows)]
+    ]
+    return asset_array(
+        {
+            "kind": [
+                *["HeldCash"] * len(foreign_currencies["acno"]),
+                *["HeldCashEquivalent"] * len(cash_equivalents["acno"]),
+                *["HeldEquity"] * len(equity_rows),
+                *["HeldGoldSpot"] * (len(holdings["itm_no"]) - len(equity_rows)),
+            ],
+            "account_number": [
+                _prettify_account_number(account_number)
+                for account_number in (*foreign_currencies["acno"], *cash_equivalents["acno"], *holdings["admn_acno"])
+            ],
+            "name": np.concatenate([foreign_currencies["curr_cd"], cash_equivalents["rp_pd_nm"], holdings["itm_nm1"]]),
+            "currency": np.concatenate(
+                [foreign_currencies["curr_cd"], cash_equivalents["curr_cd"], holdings["curr_cd"]],
+            ),
+            "symbol": np.concatenate([np.full(cash_count, None, dtype="O"), holding_symbols]),
+            "exchange_rate": np.concatenate(
+                [
+                    foreign_currencies["bas_exr"],
+                    cash_equivalents["ea"] / cash_equivalents["frc_ea"],
+                    holdings["ea"] / holdings["pitm_ea"],
+                ],
+            ),
+            "market_value": np.concatenate(
+                [
+                    foreign_currencies["mnyo_abl_a"] / foreign_currencies["bas_exr"],
+                    cash_equivalents["frc_ea"],
+                    holdings["pitm_ea"],
+                ],
+            ),
+            "quantity": np.concatenate([np.full(cash_count, np.nan), holdings["hldg_q"]]),
+            "entry_value": np.concatenate(
+                [
+                    np.full(len(foreign_currencies["acno"]), np.nan),
+                    cash_equivalents["frc_rp_ctrt_a"],
+                    holdings["pchs_a1"],
+                ],
+            ),
+            "maturity_date": np.concatenate(
+                [
+                    np.full(len(foreign_currencies["acno"]), np.datetime64("NaT"), dtype="datetime64[D]"),
+                    cash_equivalents["rpc_parg_dt"],
+                    np.full(len(holdings["itm_no"]), np.datetime64("NaT"), dtype="datetime64[D]"),
+                ],
+            ),
+        },
+    )
+
+
+def _split_timings(
+    responses: dict[str, tuple[Any, float]],
+    timings: Optional[dict[str, float]],
+) -> dict[str, Any]:
+    if timings is not None:
+        timings.update({name: elapsed for (name, (_, elapsed)) in responses.items()})
+    return {name: payload for (name, (payload, _)) in responses.items()}
+
+
+def _assemble_assets(responses: dict[str, Any], equities: list[HeldEquity]) -> list[HeldAsset]:
+    return [
+        *_parse_foreign_currencies(responses["foreign_currencies"]),
+        *_parse_cash_equivalents(responses["cash_equivalents"]),
+        *equities,
+        *_parse_gold_spots(responses["gold_spots"]),
+    ]
+
+
+def _resolve_symbols(symbol_resolver: SymbolResolver, data: Any, observer: Optional[Observer]) -> dict[str, str]:
+    symbols = [row["itm_no"] for row in data["grid01"]]
+    if observer is None:
+        return symbol_resolver.resolve_many(symbols)
+    stats: dict[str, int] = {}
+    started_at = time.perf_counter()
+    resolved = symbol_resolver.resolve_many(symbols, stats=stats)
+    observer(CallEvent("symbols", time.perf_counter() - started_at, rows=len(resolved), cache_hits=stats["hits"]))
+    return resolved
+
+
+def _load_history(
+    history_store: Optional[HistoryStore],
+    raw_account_numbers: list[str],
+    periods: list[tuple[date, date]],
+    observer: Optional[Observer],
+) -> dict[tuple[date, date], HoldingPeriodRecord]:
+    if history_store is None:
+        return {}
+    if observer is None:
+        return history_store.load(raw_account_numbers, periods)
+    started_at = time.perf_counter()
+    stored = history_store.load(raw_account_numbers, periods)
+    observer(CallEvent("history_store", time.perf_counter() - started_at, rows=len(periods), cache_hits=len(stored)))
+    return stored
+
+
+def _check_response(path: str, data: Any) -> Any:
+    key = RESPONSE_KEYS.get(path)
+    if key is not None and (not isinstance(data, dict) or key not in data):
+        raise MalformedResponseException(path, f"no {key!r} in the response")
+    return data
+
+
+def _parse_account_numbers(data: Any) -> list[str]:
+    return [row["acno"] for row in data["grid01"]]
+
+
+def _parse_foreign_currencies(data: Any) -> list[HeldCash]:
+    return [
+        HeldCash(
+            account_number=_prettify_account_number(row["acno"]),
+            name=row["curr_cd"],
+            currency=row["curr_cd"],
+            exchange_rate=float(row["bas_exr"]),
+            market_value=float(row["mnyo_abl_a"]) / float(row["bas_exr"]),
+        )
+        for row in data["GRID01"]
+    ]
+
+
+def _parse_cash_equivalents(data: Any) -> list[HeldCashEquivalent]:
+    return [
+        HeldCashEquivalent(
+            account_number=_prettify_account_number(row["acno"]),
+            name=row["rp_pd_nm"],
+            currency=row["curr_cd"],
+            exchange_rate=float(row["ea"]) / float(row["frc_ea"]),
+            market_value=float(row["frc_ea"]),
+            maturity_date=datetime.strptime(row["rpc_parg_dt"], "%Y%m%d").date(),
+            entry_value=float(row["frc_rp_ctrt_a"]),
+        )
+        for row in data["grid01"]
+    ]
+
+
+def _parse_equities(data: Any, symbols: dict[str, str]) -> list[HeldEquity]:
+    return [
+        HeldEquity(
+            account_number=_prettify_account_number(row["admn_acno"]),
+            name=row["itm_nm1"],
+            currency=row["curr_cd"],
+            exchange_rate=float(row["ea"]) / float(row["pitm_ea"]),
+            market_value=float(row["pitm_ea"]),
+            symbol=symbols[row["itm_no"]],
+            quantity=float(row["hldg_q"]),
+            entry_value=float(row["pchs_a1"]),
+        )
+        for row in data["grid01"]
+    ]
+
+
+def _parse_gold_spots(data: Any) -> list[HeldGoldSpot]:
+    return [
+        HeldGoldSpot(
+            account_number=_prettify_account_number(row["admn_acno"]),
+            name=row["itm_nm1"],
+            currency=row["curr_cd"],
+            exchange_rate=float(row["ea"]) / float(row["pitm_ea"]),
+            market_value=float(row["pitm_ea"]),
+            symbol=row["itm_no"],
+            quantity=float(row["hldg_q"]),
+            entry_value=float(row["pchs_a1"]),
+        )
+        for row in data["grid01"]
+    ]
+
+
+def _parse_assets(name: str, data: Any) -> Sequence[HeldAsset]:
+    if name == "foreign_currencies":
+        return _parse_foreign_currencies(data)
+    if name == "cash_equivalents":
+        return _parse_cash_equivalents(data)
+    if name == "gold_spots":
+        return _parse_gold_spots(data)
+    raise ValueError(f"unknown asset request {name!r}")
+
+
+def _holding_period_record_form(start_date: date, end_date: date, raw_account_numbers: list[str]) -> dict[str, Any]:
+    return {
+        "ivst_pca_tp": "3",
+        "bns_tlex_mtd_tp": "2",
+        "strt_dt": start_date.strftime("%Y%m%d"),
+        "end_dt": end_date.strftime("%Y%m%d"),
+        "grid_cnt01": len(raw_account_numbers),
+        **{f"GRID01_IN_acno_{i}": account_number for (i, account_number) in enumerate(raw_account_numbers)},
+    }
+
+
+def _parse_holding_period_record(data: Any, start_date: date, end_date: date) -> HoldingPeriodRecord:
+    (initial_value, closing_value, cash_inflow, cash_outflow) = _holding_period_values(data)
+    return HoldingPeriodRecord(
+        start_date=start_date,
+        end_date=end_date,
+        initial_value=initial_value,
+        closing_value=closing_value,
+        cash_inflow=cash_inflow,
+        cash_outflow=cash_outflow,
+    )
+
+
+def _holding_period_values(data: Any) -> tuple[int, int, int, int]:
+    return (
+        int(data["bss_ea"]),
+        int(data["eot_ea"]),
+        int(data["mnyi_a"]) + int(data["inq_a"]),
+        int(data["mnyo_a"]) + int(data["outq_a"]),
+    )
+
 
-    def _prettify_account_number(self, account_number: str) -> str:
-        return account_number[0:3] + "-" + account_number[3:5] + "-" + account_number[5:]
+def _prettify_account_number(account_number: str) -> str:
+    return account_number[0:3] + "-" + account_number[3:5] + "-" + account_number[5:]
@@ -0,0 +1,278 @@
+from collections.abc import Iterable, Sequence
+from datetime import date, timedelta
+from typing import Literal, Optional, Union
+
+import numpy as np
+
+from kstock_account.schemas import HoldingPeriodRecord
+
+Frequency = Union[Literal["D", "W", "M", "Q", "Y"], int]
+"""The length of a period: `D`, `W`, `M`, `Q` or `Y`, or a number of days.
+
+`W` is a week from Monday to Sunday, and `M`, `Q` and `Y` are calendar months,
+quarters and years.
+"""
+
+EmptyPeriods = Literal["merge", "skip", "keep"]
+"""What to do with a period that has no trading days."""
+
+_KRX_FIXED_HOLIDAYS = ((1, 1), (3, 1), (5, 1), (5, 5), (6, 6), (8, 15), (10, 3), (10, 9), (12, 25))
+
+_KRX_OTHER_HOLIDAYS = (
+    "2015-02-18 2015-02-19 2015-02-20 2015-05-25 2015-08-14 2015-09-28 2015-09-29 "
+    "2016-02-08 2016-02-09 2016-02-10 2016-04-13 2016-05-06 2016-09-14 2016-09-15 2016-09-16 "
+    "2017-01-27 2017-01-30 2017-05-03 2017-05-09 2017-10-02 2017-10-04 2017-10-05 2017-10-06 "
+    "2018-02-15 2018-02-16 2018-05-07 2018-05-22 2018-06-13 2018-09-24 2018-09-25 2018-09-26 "
+    "2019-02-04 2019-02-05 2019-02-06 2019-05-06 2019-09-12 2019-09-13 "
+    "2020-01-24 2020-01-27 2020-04-15 2020-04-30 2020-08-17 2020-09-30 2020-10-01 2020-10-02 "
+    "2021-02-11 2021-02-12 2021-05-19 2021-08-16 2021-09-20 2021-09-21 2021-09-22 2021-10-04 2021-10-11 "
+    "2022-01-31 2022-02-01 2022-02-02 2022-03-09 2022-06-01 2022-09-09 2022-09-12 2022-10-10 "
+    "2023-01-23 2023-01-24 2023-05-29 2023-09-28 2023-09-29 2023-10-02 "
+    "2024-02-09 2024-02-12 2024-04-10 2024-05-06 2024-05-15 2024-09-16 2024-09-17 2024-09-18 2024-10-01 "
+    "2025-01-27 2025-01-28 2025-01-29 2025-01-30 2025-03-03 2025-05-06 2025-06-03 2025-10-06 2025-10-07 2025-10-08 "
+    "2026-02-16 2026-02-17 2026-02-18 2026-03-02 2026-05-25 2026-06-03 2026-08-17 2026-09-24 2026-09-25 2026-10-05"
+)
+
+
+class TradingCalendar:
+    """A calendar of the days an exchange is open.
+
+    Attributes:
+        holidays (tuple[date, ...]): The weekdays the exchange is closed, in order.
+        weekmask (str): The days of the week the exchange is open, from Monday to
+            Sunday, as in `numpy.busdaycalendar`.
+    """
+
+    def __init__(self, holidays: Iterable[date] = (), weekmask: str = "1111100") -> None:
+        """Constructs a TradingCalendar instance.
+
+        Args:
+            holidays (Iterable[date], optional): The days the exchange is closed besides
+                the days of the week outside `weekmask`. Defaults to none.
+            weekmask (str, optional): The days of the week the exchange is open, from
+                Monday to Sunday. Defaults to Monday to Friday.
+        """
+        self.weekmask = weekmask
+        self._calendar = np.busdaycalendar(
+            weekmask=weekmask,
+            holidays=np.array(sorted(set(holidays)), dtype="datetime64[D]"),
+        )
+        self.holidays = tuple(day.item() for day in self._calendar.holidays)
+
+    def is_trading_day(self, day: date) -> bool:
+        """Returns whether the exchange is open on a day.
+
+        Args:
+            day (date): The day to check.
+
+        Returns:
+            bool: Whether `day` is a trading day.
+        """
+        return bool(np.is_busday(np.datetime64(day, "D"), busdaycal=self._calendar))
+
+    def count_trading_days(self, start_dates: np.ndarray, end_dates: np.ndarray) -> np.ndarray:
+        """Counts the trading days of many periods at once.
+
+        Args:
+            start_dates (np.ndarray): The first day of each period, as `datetime64[D]`.
+            end_dates (np.ndarray): The last day of each period, as `datetime64[D]`.
+
+        Returns:
+            np.ndarray: The number of trading days of each period, end dates included.
+        """
+        return np.busday_count(start_dates, end_dates + np.timedelta64(1, "D"), busdaycal=self._calendar)
+
+    def with_holidays(self, holidays: Iterable[date]) -> "TradingCalendar":
+        """Returns a copy of the calendar with more holidays.
+
+        Args:
+            holidays (Iterable[date]): The days to close the exchange on, such as
+                holidays announced after this version of the library.
+
+        Returns:
+            TradingCalendar: The extended calendar.
+        """
+        return TradingCalendar((*self.holidays, *holidays), self.weekmask)
+
+
+def _krx_holidays() -> tuple[date, ...]:
+    other_holidays = [date.fromisoformat(day) for day in _KRX_OTHER_HOLIDAYS.split()]
+    holidays = {
+        *(date(year, month, day) for year in range(2015, 2027) for (month, day) in _KRX_FIXED_HOLIDAYS),
+        *other_holidays,
+    }
+    for year in range(2015, 2027):
+        closing_day = date(year, 12, 31)
+        while closing_day.weekday() >= 5 or closing_day in holidays:
+            closing_day -= timedelta(days=1)
+        holidays.add(closing_day)
+    return tuple(sorted(day for day in holidays if day.weekday() < 5))
+
+
+KRX_HOLIDAYS = _krx_holidays()
+"""The weekdays the Korea Exchange is closed from 2015 through 2026.
+
+Includes public holidays, substitute and temporary holidays, election days,
+Labor Day and the year-end closing day. Later years only include the fixed-date
+holidays; add the rest with `TradingCalendar.with_holidays`.
+"""
+
+KRX_CALENDAR = TradingCalendar(KRX_HOLIDAYS)
+"""The trading calendar of the Korea Exchange."""
+
+
+def plan_periods(
+    start_date: date,
+    end_date: date,
+    frequency: Frequency = "W",
+    calendar: Optional[TradingCalendar] = None,
+    empty: EmptyPeriods = "merge",
+) -> list[tuple[date, date]]:
+    """Splits a date range into periods, leaving out the periods with no trading days.
+
+    The boundaries of all periods are computed at once as arrays. A weekly,
+    monthly, quarterly or yearly period starts on a Monday, or on the first day
+    of a month, quarter or year; the first period starts on `start_date` and the
+    last ends on `end_date`. A custom period is the given number of days long.
+
+    With a calendar, a period with no trading day, such as a week of Chuseok,
+    is merged into the period after it (or, at the end of the range, the one
+    before it), or skipped. Merging keeps the periods contiguous, so their
+    records still chain together.
+
+    Args:
+        start_date (date): The first day of the range.
+        end_date (date): The last day of the range.
+        frequency (Frequency, optional): The length of the periods. Defaults to weekly.
+        calendar (Optional[TradingCalendar]): The trading calendar to check periods
+            against. Defaults to none, which keeps every period.
+        empty (EmptyPeriods, optional): Whether a period with no trading day is
+            merged into its neighbour, skipped or kept. Defaults to merge.
+
+    Returns:
+        list[tuple[date, date]]: The first and last day of each period, in order.
+
+    Raises:
+        ValueError: If the frequency is not supported.
+    """
+    if start_date > end_date:
+        return []
+    (start_dates, end_dates) = _period_bounds(start_date, end_date, frequency)
+    if calendar is not None and empty != "keep":
+        has_trading_days = calendar.count_trading_days(start_dates, end_dates) > 0
+        if empty == "merge":
+            end_dates = end_dates[has_trading_days]
+            if len(end_dates) > 0:
+                end_dates[-1] = np.datetime64(end_date, "D")
+            start_dates = np.concatenate(
+                [np.array([start_date], dtype="datetime64[D]"), end_dates[:-1] + np.timedelta64(1, "D")],
+            )[: len(end_dates)]
+        else:
+            (start_dates, end_dates) = (start_dates[has_trading_days], end_dates[has_trading_days])
+    return list(zip(start_dates.tolist(), end_dates.tolist()))
+
+
+def common_periods(plans: Iterable[Sequence[tuple[date, date]]]) -> list[tuple[date, date]]:
+    """Returns the fewest periods that every period of several plans is made of.
+
+    A multi-frequency report fetches these periods once and builds each of its
+    plans from them with `aggregate_history`, instead of fetching every plan.
+
+    Args:
+        plans (Iterable[Sequence[tuple[date, date]]]): The periods of each plan, such
+            as the results of `plan_periods` for several frequencies.
+
+    Returns:
+        list[tuple[date, date]]: The periods cut at every boundary of every plan, in
+        order, covering only the days some plan covers.
+    """
+    periods = [period for plan in plans for period in plan]
+    if not periods:
+        return []
+    start_dates = np.array([start_date for (start_date, _) in periods], dtype="datetime64[D]")
+    end_dates = np.array([end_date for (_, end_date) in periods], dtype="datetime64[D]")
+    boundaries = np.unique(np.concatenate([start_dates, end_dates + np.timedelta64(1, "D")]))
+    (piece_starts, piece_ends) = (boundaries[:-1], boundaries[1:] - np.timedelta64(1, "D"))
+    order = np.argsort(start_dates)
+    covered_until = np.maximum.accumulate(end_dates[order])
+    latest = np.searchsorted(start_dates[order], piece_starts, side="right") - 1
+    covered = (latest >= 0) & (covered_until[np.maximum(latest, 0)] >= piece_ends)
+    return list(zip(piece_starts[covered].tolist(), piece_ends[covered].tolist()))
+
+
+def aggregate_history(
+    records: Sequence[HoldingPeriodRecord],
+    periods: Sequence[tuple[date, date]],
+) -> list[HoldingPeriodRecord]:
+    """Combines the records of short periods into the records of longer ones.
+
+    A combined record starts at the initial value of its first short record and
+    ends at the closing value of its last, and its cash flows are the sums of
+    theirs.
+
+    Args:
+        records (Sequence[HoldingPeriodRecord]): The records of the short periods, in
+            order, such as those fetched for `common_periods`.
+        periods (Sequence[tuple[date, date]]): The longer periods. Each must start and
+            end on a boundary of the short periods.
+
+    Returns:
+        list[HoldingPeriodRecord]: The record of each longer period.
+
+    Raises:
+        ValueError: If a period does not start and end on a boundary of the records.
+    """
+    if not periods:
+        return []
+    start_dates = np.array([record.start_date for record in records], dtype="datetime64[D]")
+    end_dates = np.array([record.end_date for record in records], dtype="datetime64[D]")
+    wanted_starts = np.array([start_date for (start_date, _) in periods], dtype="datetime64[D]")
+    wanted_ends = np.array([end_date for (_, end_date) in periods], dtype="datetime64[D]")
+    first = np.searchsorted(start_dates, wanted_starts)
+    last = np.searchsorted(end_dates, wanted_ends)
+    if (
+        np.any(first >= len(records))
+        or np.any(last >= len(records))
+        or np.any(start_dates[np.minimum(first, len(records) - 1)] != wanted_starts)
+        or np.any(end_dates[np.minimum(last, len(records) - 1)] != wanted_ends)
+    ):
+        raise ValueError("the periods do not start and end on boundaries of the records")
+    cash_inflows = np.cumsum([0, *(record.cash_inflow for record in records)])
+    cash_outflows = np.cumsum([0, *(record.cash_outflow for record in records)])
+    return [
+        HoldingPeriodRecord(
+            start_date=start_date,
+            end_date=end_date,
+            initial_value=records[i].initial_value,
+            closing_value=records[j].closing_value,
+            cash_inflow=int(cash_inflows[j + 1] - cash_inflows[i]),
+            cash_outflow=int(cash_outflows[j + 1] - cash_outflows[i]),
+        )
+        for ((start_date, end_date), i, j) in zip(periods, first.tolist(), last.tolist())
+    ]
+
+
+def _period_bounds(start_date: date, end_date: date, frequency: Frequency) -> tuple[np.ndarray, np.ndarray]:
+    first = np.datetime64(start_date, "D")
+    last = np.datetime64(end_date, "D")
+    if isinstance(frequency, int):
+        if frequency < 1:
+            raise ValueError(f"a period must be at least one day long, not {frequency}")
+        start_dates = np.arange(first, last + 1, frequency)
+    elif frequency == "D":
+        start_dates = np.arange(first, last + 1)
+    elif frequency == "W":
+        next_monday = first + (7 - (first.astype("i8") + 3) % 7) % 7
+        start_dates = np.arange(next_monday, last + 1, 7)
+    elif frequency in ("M", "Q", "Y"):
+        unit = "Y" if frequency == "Y" else "M"
+        step = 3 if frequency == "Q" else 1
+        first_unit = first.astype(f"datetime64[{unit}]")
+        if frequency == "Q":
+            first_unit = first_unit - first_unit.astype("i8") % 3
+        start_dates = np.arange(first_unit + step, last.astype(f"datetime64[{unit}]") + 1, step).astype("datetime64[D]")
+    else:
+        raise ValueError(f"unsupported frequency {frequency!r}")
+    start_dates = np.concatenate([np.array([first]), start_dates[start_dates > first]])
+    end_dates = np.append(start_dates[1:] - np.timedelta64(1, "D"), last)
+    return (start_dates, end_dates)
@@ -0,0 +1,155 @@
+import math
+from collections.abc import Iterable
+from typing import Union
+
+import numpy as np
+
+from kstock_account.frames import ASSET_DTYPE, assets_to_array
+from kstock_account.schemas import HeldAsset
+
+GROUP_KEYS = ("kind", "account_number", "currency", "symbol")
+"""The columns a portfolio can be grouped by."""
+
+
+class Portfolio:
+    """A collection of held assets stored column-wise.
+
+    The holdings live in a NumPy structured array with `ASSET_DTYPE`, so totals
+    and group-wise sums are computed with array operations instead of looping
+    over `HeldAsset` objects. Values are normalised to KRW with the
+    `exchange_rate` of each holding. Cash has no entry value and counts as
+    neither profit nor loss.
+
+    Attributes:
+        array (np.ndarray): The holdings, one row per asset.
+    """
+
+    def __init__(self, array: np.ndarray) -> None:
+        """Constructs a Portfolio instance.
+
+        Args:
+            array (np.ndarray): A structured array with `ASSET_DTYPE`, such as one
+                returned by `MiraeAccount.get_assets_frame`.
+
+        Raises:
+            ValueError: If the array does not have `ASSET_DTYPE`.
+        """
+        if array.dtype != ASSET_DTYPE:
+            raise ValueError("portfolio arrays must have ASSET_DTYPE")
+        self.array = array
+
+    @classmethod
+    def from_assets(cls, assets: Iterable[HeldAsset]) -> "Portfolio":
+        """Constructs a Portfolio from held assets.
+
+        Args:
+            assets (Iterable[HeldAsset]): The held assets, such as those returned by
+                `MiraeAccount.get_assets`.
+
+        Returns:
+            Portfolio: The portfolio of the assets.
+        """
+        return cls(assets_to_array(assets))
+
+    def __len__(self) -> int:
+        """Returns the number of holdings."""
+        return len(self.array)
+
+    def __getitem__(self, index: Union[np.ndarray, slice]) -> "Portfolio":
+        """Returns the holdings selected by a boolean mask, an index array or a slice."""
+        return Portfolio(self.array[index])
+
+    @property
+    def market_values(self) -> np.ndarray:
+        """The market value of each holding in KRW."""
+        return np.asarray(self.array["market_value"] * self.array["exchange_rate"])
+
+    @property
+    def entry_values(self) -> np.ndarray:
+        """The entry value of each holding in KRW, or zero for cash."""
+        values = np.asarray(self.array["entry_value"] * self.array["exchange_rate"])
+        return np.where(np.isnan(values), 0.0, values)
+
+    @property
+    def pnls(self) -> np.ndarray:
+        """The profit or loss of each holding in KRW, or zero for cash."""
+        values = np.asarray(self.array["pnl"] * self.array["exchange_rate"])
+        return np.where(np.isnan(values), 0.0, values)
+
+    @property
+    def market_value(self) -> float:
+        """The total market value of the portfolio in KRW."""
+        return float(self.market_values.sum())
+
+    @property
+    def entry_value(self) -> float:
+        """The total entry value of the non-cash holdings in KRW."""
+        return float(self.entry_values.sum())
+
+    @property
+    def pnl(self) -> float:
+        """The total profit or loss of the portfolio in KRW."""
+        return float(self.pnls.sum())
+
+    @property
+    def pnl_percent(self) -> float:
+        """The total profit or loss percentage of the non-cash holdings, or NaN if there are none."""
+        entry_value = self.entry_value
+        if entry_value == 0:
+            return math.nan
+        return self.pnl / entry_value
+
+    def weights(self) -> np.ndarray:
+        """Returns the share of each holding in the total market value.
+
+        Returns:
+            np.ndarray: The weight of each holding, summing to one.
+        """
+        market_values = self.market_values
+        return np.asarray(market_values / market_values.sum())
+
+    def group_by(self, key: str) -> dict[str, "Portfolio"]:
+        """Splits the portfolio by the value of a column.
+
+        Args:
+            key (str): One of `GROUP_KEYS`.
+
+        Returns:
+            dict[str, Portfolio]: The holdings of each distinct value of the column.
+        """
+        (labels, inverse) = self._factorize(key)
+        return {label: self[inverse == i] for (i, label) in enumerate(labels)}
+
+    def market_value_by(self, key: str) -> dict[str, float]:
+        """Returns the total market value in KRW of each distinct value of a column.
+
+        Args:
+            key (str): One of `GROUP_KEYS`, such as `"account_number"` or `"currency"`.
+
+        Returns:
+            dict[str, float]: The total market value of each group.
+        """
+        return self._sum_by(key, self.market_values)
+
+    def pnl_by(self, key: str) -> dict[str, float]:
+        """Returns the total profit or loss in KRW of each distinct value of a column.
+
+        Args:
+            key (str): One of `GROUP_KEYS`, such as `"account_number"` or `"currency"`.
+
+        Returns:
+            dict[str, float]: The total profit or loss of each group.
+        """
+        return self._sum_by(key, self.pnls)
+
+    def _sum_by(self, key: str, values: np.ndarray) -> dict[str, float]:
+        (labels, inverse) = self._factorize(key)
+        sums = np.bincount(inverse, weights=values, minlength=len(labels))
+        return dict(zip(labels, sums.tolist()))
+
+    def _factorize(self, key: str) -> tuple[list[str], np.ndarray]:
+        if key not in GROUP_KEYS:
+            raise ValueError(f"cannot group a portfolio by {key!r}")
+        column = np.array([value if value is not None else "" for value in self.array[key]], dtype=str)
+        (labels, inverse) = np.unique(column, return_inverse=True)
+        return (labels.tolist(), inverse.ravel())
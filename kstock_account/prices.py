@@ -0,0 +1,341 @@
+import io
+import json
+import shutil
+import threading
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional, Union
+from urllib.parse import quote
+
+import numpy as np
+
+from kstock_account.utils import _write_atomically, default_cache_dir
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PriceProvider = Callable[[Sequence[str], date, date], tuple[np.ndarray, np.ndarray]]
+"""A function that downloads the daily adjusted closing prices of many symbols at once.
+
+It is called with the symbols, the first date and the date after the last one,
+and returns the sorted trading dates as a `datetime64[D]` array together with
+a `(dates, symbols)` float array of prices, NaN where a symbol has no price.
+"""
+
+
+def yfinance_prices(symbols: Sequence[str], start_date: date, end_date: date) -> tuple[np.ndarray, np.ndarray]:
+    """Download daily adjusted closing prices from Yahoo Finance in one batch.
+
+    Requires the `yfinance` package.
+
+    Args:
+        symbols (Sequence[str]): The yfinance symbols, such as `005930.KS` and `^GSPC`.
+        start_date (date): The first date.
+        end_date (date): The date after the last one.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The trading dates and a `(dates, symbols)` array of prices.
+    """
+    import yfinance as yf
+
+    symbols = list(symbols)
+    frame = yf.download(symbols, start=start_date, end=end_date, auto_adjust=False, progress=False)
+    if frame.empty:
+        return (np.empty(0, dtype="datetime64[D]"), np.empty((0, len(symbols))))
+    closes = frame["Adj Close"]
+    if closes.ndim == 1:
+        closes = closes.to_frame(symbols[0])
+    closes = closes.reindex(columns=symbols)
+    dates = closes.index.to_numpy().astype("datetime64[D]")
+    return (dates, closes.to_numpy(dtype="f8"))
+
+
+class PriceStore:
+    """A persistent store of daily prices, kept as one memory-mapped column per symbol.
+
+    Each symbol has its own directory holding its dates and prices as `.npy`
+    arrays, which are memory-mapped when read, and the date range they were
+    downloaded for, so that a range without any trading day is not downloaded
+    again. Adjusted prices are kept as they were downloaded; call `clear` to
+    download them again after a split or a dividend.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        """Constructs a PriceStore instance.
+
+        Args:
+            path (Optional[Union[str, Path]]): The directory of the store. Defaults to
+                `prices` in `default_cache_dir()`.
+        """
+        self.path = Path(path) if path is not None else default_cache_dir() / "prices"
+        self._lock = threading.Lock()
+
+    def coverage(self, symbol: str) -> Optional[tuple[date, date]]:
+        """Returns the date range stored for a symbol.
+
+        Args:
+            symbol (str): The symbol.
+
+        Returns:
+            Optional[tuple[date, date]]: The first date and the date after the last one,
+            or None if nothing is stored for the symbol.
+        """
+        try:
+            (start_date, end_date) = json.loads((self._directory(symbol) / "coverage.json").read_text("utf-8"))
+        except FileNotFoundError:
+            return None
+        return (date.fromisoformat(start_date), date.fromisoformat(end_date))
+
+    def load(self, symbol: str) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the stored prices of a symbol.
+
+        Args:
+            symbol (str): The symbol.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The sorted dates and the price on each date,
+            both memory-mapped read-only. They are empty if nothing is stored.
+        """
+        directory = self._directory(symbol)
+        try:
+            dates = _load_column(directory / "dates.npy")
+            prices = _load_column(directory / "prices.npy")
+        except FileNotFoundError:
+            return (np.empty(0, dtype="datetime64[D]"), np.empty(0))
+        if len(dates) != len(prices):
+            return (np.empty(0, dtype="datetime64[D]"), np.empty(0))
+        return (dates, prices)
+
+    def save(self, symbol: str, dates: np.ndarray, prices: np.ndarray, start_date: date, end_date: date) -> None:
+        """Merges downloaded prices of a symbol into the store.
+
+        Prices on dates that are already stored are replaced. The stored range is
+        extended to cover the range the prices were downloaded for.
+
+        Args:
+            symbol (str): The symbol.
+            dates (np.ndarray): The trading dates that were downloaded.
+            prices (np.ndarray): The price on each date. NaN prices are not stored.
+            start_date (date): The first date of the downloaded range.
+            end_date (date): The date after the last one of the downloaded range.
+        """
+        directory = self._directory(symbol)
+        valid = ~np.isnan(prices)
+        (dates, prices) = (np.asarray(dates, dtype="datetime64[D]")[valid], np.asarray(prices, dtype="f8")[valid])
+        with self._lock:
+            (stored_dates, stored_prices) = self.load(symbol)
+            keep = ~np.isin(stored_dates, dates)
+            merged_dates = np.concatenate([stored_dates[keep], dates])
+            merged_prices = np.concatenate([stored_prices[keep], prices])
+            order = np.argsort(merged_dates, kind="stable")
+            coverage = self.coverage(symbol)
+            if coverage is not None:
+                start_date = min(start_date, coverage[0])
+                end_date = max(end_date, coverage[1])
+            del stored_dates, stored_prices
+            _write_atomically(directory / "dates.npy", _npy_bytes(merged_dates[order]))
+            _write_atomically(directory / "prices.npy", _npy_bytes(merged_prices[order]))
+            coverage_json = json.dumps([start_date.isoformat(), end_date.isoformat()])
+            _write_atomically(directory / "coverage.json", coverage_json.encode("utf-8"))
+
+    def clear(self) -> None:
+        """Deletes every stored price."""
+        with self._lock:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def _directory(self, symbol: str) -> Path:
+        return self.path / quote(symbol, safe="")
+
+
+class PriceLoader:
+    """A loader of aligned price panels that downloads only what its store is missing.
+
+    The ranges missing from the store are worked out per symbol, and symbols
+    missing the same range are downloaded together in one provider call, so a
+    cold load of many symbols is one batch and a warm one makes no call at all.
+    Prices from today on are never stored, because today's close is not final.
+    """
+
+    def __init__(self, provider: Optional[PriceProvider] = None, store: Optional[PriceStore] = None) -> None:
+        """Constructs a PriceLoader instance.
+
+        Args:
+            provider (Optional[PriceProvider]): The function that downloads prices.
+                Defaults to `yfinance_prices`.
+            store (Optional[PriceStore]): The store of downloaded prices. Defaults to a
+                `PriceStore` in `default_cache_dir()`.
+        """
+        self.provider = provider or yfinance_prices
+        self.store = store or PriceStore()
+
+    def get_daily_prices(
+        self,
+        symbols: Sequence[str],
+        start_date: date,
+        end_date: date,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the daily adjusted closing prices of many symbols as one panel.
+
+        Args:
+            symbols (Sequence[str]): The yfinance symbols.
+            start_date (date): The first date.
+            end_date (date): The date after the last one.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The union of the trading dates of every symbol
+            and a `(dates, symbols)` array of prices, NaN where a symbol did not trade.
+        """
+        symbols = list(symbols)
+        fetched = self._fetch_missing(symbols, start_date, end_date)
+        (start, end) = (np.datetime64(start_date, "D"), np.datetime64(end_date, "D"))
+        columns = []
+        for symbol in symbols:
+            (dates, prices) = fetched.get(symbol) or self.store.load(symbol)
+            (lo, hi) = np.searchsorted(dates, [start, end])
+            columns.append((dates[lo:hi], prices[lo:hi]))
+        all_dates = np.unique(np.concatenate([dates for (dates, _) in columns] or [np.empty(0, dtype="datetime64[D]")]))
+        panel = np.full((len(all_dates), len(symbols)), np.nan)
+        for i, (dates, prices) in enumerate(columns):
+            panel[np.searchsorted(all_dates, dates), i] = prices
+        return (all_dates, panel)
+
+    def get_weekly_prices(
+        self,
+        symbols: Sequence[str],
+        start_date: date,
+        end_date: date,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the last adjusted closing price of each W-FRI week of many symbols.
+
+        Args:
+            symbols (Sequence[str]): The yfinance symbols.
+            start_date (date): The first date.
+            end_date (date): The date after the last one.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The Friday that ends each week and a
+            `(weeks, symbols)` array of prices. See `resample_weekly`.
+        """
+        return resample_weekly(*self.get_daily_prices(symbols, start_date, end_date))
+
+    def get_weekly_prices_frame(self, symbols: Sequence[str], start_date: date, end_date: date) -> "pd.DataFrame":
+        """Returns the weekly prices of many symbols as a pandas DataFrame.
+
+        Each week is labeled with the Sunday that ends it, like the periods of
+        `MiraeAccount.get_history`, except the last one, which is labeled with
+        `end_date` like the last period of `get_history(start_date, end_date)`.
+        Requires the `pandas` package.
+
+        Args:
+            symbols (Sequence[str]): The yfinance symbols.
+            start_date (date): The first date.
+            end_date (date): The date after the last one.
+
+        Returns:
+            pd.DataFrame: A DataFrame with one column of prices per symbol.
+        """
+        import pandas as pd
+
+        (fridays, prices) = self.get_weekly_prices(symbols, start_date, end_date)
+        labels = np.minimum(fridays + np.timedelta64(2, "D"), np.datetime64(end_date, "D"))
+        return pd.DataFrame(prices, index=pd.Index(labels.astype(object)), columns=list(symbols))
+
+    def _fetch_missing(
+        self,
+        symbols: list[str],
+        start_date: date,
+        end_date: date,
+    ) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        today = date.today()
+        batches: defaultdict[tuple[date, date], list[str]] = defaultdict(list)
+        for symbol in dict.fromkeys(symbols):
+            for missing in _missing_ranges(self.store.coverage(symbol), start_date, end_date):
+                batches[missing].append(symbol)
+        fetched_today: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for (missing_start, missing_end), batch in batches.items():
+            (dates, panel) = self.provider(batch, missing_start, missing_end)
+            dates = np.asarray(dates, dtype="datetime64[D]")
+            closed = dates < np.datetime64(today, "D")
+            for i, symbol in enumerate(batch):
+                if missing_start < today:
+                    self.store.save(symbol, dates[closed], panel[closed, i], missing_start, min(missing_end, today))
+                if missing_end > today:
+                    fetched_today[symbol] = (dates[~closed], panel[~closed, i])
+        fetched = {}
+        for symbol, (dates, prices) in fetched_today.items():
+            (stored_dates, stored_prices) = self.store.load(symbol)
+            valid = ~np.isnan(prices)
+            fetched[symbol] = (
+                np.concatenate([stored_dates, dates[valid]]),
+                np.concatenate([stored_prices, prices[valid]]),
+            )
+        return fetched
+
+
+def resample_weekly(dates: np.ndarray, prices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Resample daily prices to the last price of each W-FRI week.
+
+    A W-FRI week runs from Saturday to Friday, as with pandas' `resample("W-FRI")`.
+    The last price of every week and symbol is found for all of them at once,
+    skipping NaN prices, instead of one `resample` per symbol. Like pandas,
+    every week between the first and the last date is returned, so a week
+    without any trading day is a row of NaN rather than a gap.
+
+    Args:
+        dates (np.ndarray): The sorted trading dates.
+        prices (np.ndarray): A `(dates, symbols)` array of prices.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The Friday that ends each week, and a
+        `(weeks, symbols)` array of the last price of each week, NaN where a
+        symbol has no price in a week.
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    prices = np.asarray(prices, dtype="f8")
+    if len(dates) == 0:
+        return (dates, prices)
+    weekdays = (dates.astype("i8") + 3) % 7
+    fridays = dates + ((4 - weekdays) % 7).astype("timedelta64[D]")
+    week_ends = np.flatnonzero(np.append(fridays[1:] != fridays[:-1], True))
+    week_starts = np.append(0, week_ends[:-1] + 1)
+    rows = np.arange(len(dates))[:, None]
+    last_valid = np.maximum.accumulate(np.where(np.isnan(prices), -1, rows), axis=0)[week_ends]
+    in_week = last_valid >= week_starts[:, None]
+    all_fridays = np.arange(fridays[0], fridays[-1] + np.timedelta64(1, "D"), np.timedelta64(7, "D"))
+    weekly = np.full((len(all_fridays), prices.shape[1]), np.nan)
+    weekly[(fridays[week_ends] - fridays[0]) // np.timedelta64(7, "D")] = np.where(
+        in_week,
+        prices[np.maximum(last_valid, 0), np.arange(prices.shape[1])],
+        np.nan,
+    )
+    return (all_fridays, weekly)
+
+
+def _missing_ranges(coverage: Optional[tuple[date, date]], start_date: date, end_date: date) -> list[tuple[date, date]]:
+    if start_date >= end_date:
+        return []
+    if coverage is None:
+        return [(start_date, end_date)]
+    # A range that does not touch the stored one is extended to it, so the stored range stays contiguous.
+    missing = []
+    if start_date < coverage[0]:
+        missing.append((start_date, coverage[0]))
+    if end_date > coverage[1]:
+        missing.append((coverage[1], end_date))
+    return missing
+
+
+def _load_column(path: Path) -> np.ndarray:
+    try:
+        column: np.ndarray = np.load(path, mmap_mode="r")
+    except ValueError:  # an empty array cannot be memory-mapped
+        column = np.load(path)
+    return column
+
+
+def _npy_bytes(array: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
@@ -0,0 +1,317 @@
+import gzip
+import hashlib
+import json
+import threading
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+from urllib.parse import urlencode
+
+from kstock_account.exceptions import RecordingNotFoundException
+from kstock_account.history_store import HistoryStore
+from kstock_account.metrics import Observer
+from kstock_account.mirae import MiraeAccount
+from kstock_account.symbols import SymbolCache, SymbolResolver
+from kstock_account.transport import BodyDigest, MiraeTransport, Timeout
+from kstock_account.utils import _write_atomically, convert_to_yfinance_symbol
+
+
+class ResponseArchive:
+    """A compressed, content-addressed archive of API responses.
+
+    Each distinct response body is stored once, gzip-compressed, under the
+    SHA-256 of its JSON encoding in `objects/`. An append-only `index.jsonl`
+    maps each request (path and form fields) to the body it received, and each
+    broker symbol to the Yahoo Finance symbol it resolved to. Later entries win,
+    so recording the same request again replaces its response.
+
+    Attributes:
+        path (Path): The directory of the archive.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """Constructs a ResponseArchive instance, loading the archive if it exists.
+
+        Args:
+            path (Union[str, Path]): The directory of the archive. It is created on the first write.
+        """
+        self.path = Path(path)
+        self._responses: dict[str, str] = {}
+        self._symbols: dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        index_path = self.path / "index.jsonl"
+        if index_path.exists():
+            with open(index_path, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if "request" in entry:
+                        self._responses[entry["request"]] = entry["object"]
+                    else:
+                        self._symbols[entry["symbol"]] = entry["yfinance_symbol"]
+
+    def __len__(self) -> int:
+        """Returns the number of recorded requests."""
+        return len(self._responses)
+
+    def put(self, path: str, data: Optional[Mapping[str, Any]], response: Any) -> str:
+        """Records the response to a request.
+
+        Args:
+            path (str): The request path.
+            data (Optional[Mapping[str, Any]]): The form fields of the request.
+            response (Any): The decoded JSON response body.
+
+        Returns:
+            str: The SHA-256 digest the body is stored under.
+        """
+        body = json.dumps(response, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode()
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            _write_atomically(object_path, gzip.compress(body, mtime=0))
+        request = request_key(path, data)
+        with self._lock:
+            if self._responses.get(request) != digest:
+                self._responses[request] = digest
+                self._append({"request": request, "object": digest})
+        return digest
+
+    def get(self, path: str, data: Optional[Mapping[str, Any]]) -> Any:
+        """Returns the recorded response to a request.
+
+        Args:
+            path (str): The request path.
+            data (Optional[Mapping[str, Any]]): The form fields of the request.
+
+        Returns:
+            Any: The decoded JSON response body.
+
+        Raises:
+            RecordingNotFoundException: If the request was not recorded.
+        """
+        return json.loads(self.get_body(path, data))
+
+    def get_body(self, path: str, data: Optional[Mapping[str, Any]]) -> bytes:
+        """Returns the recorded response body to a request, without decoding it.
+
+        Args:
+            path (str): The request path.
+            data (Optional[Mapping[str, Any]]): The form fields of the request.
+
+        Returns:
+            bytes: The JSON response body, as it was recorded.
+
+        Raises:
+            RecordingNotFoundException: If the request was not recorded.
+        """
+        request = request_key(path, data)
+        with self._lock:
+            digest = self._responses.get(request)
+        if digest is None:
+            raise RecordingNotFoundException(request)
+        return gzip.decompress(self._object_path(digest).read_bytes())
+
+    def put_symbols(self, symbols: Mapping[str, Optional[str]]) -> None:
+        """Records resolved Yahoo Finance symbols.
+
+        Args:
+            symbols (Mapping[str, Optional[str]]): The Yahoo Finance symbol of each broker
+                symbol, or None for a symbol that could not be resolved.
+        """
+        with self._lock:
+            for symbol, yfinance_symbol in symbols.items():
+                if symbol not in self._symbols or self._symbols[symbol] != yfinance_symbol:
+                    self._symbols[symbol] = yfinance_symbol
+                    self._append({"symbol": symbol, "yfinance_symbol": yfinance_symbol})
+
+    def lookup_symbol(self, symbol: str) -> str:
+        """Returns the recorded Yahoo Finance symbol of a broker symbol.
+
+        The signature matches `convert_to_yfinance_symbol`, so the method can be
+        the `lookup_fn` of a `SymbolResolver`.
+
+        Args:
+            symbol (str): The broker symbol.
+
+        Returns:
+            str: The recorded Yahoo Finance symbol.
+
+        Raises:
+            KeyError: If no Yahoo Finance symbol was recorded for the symbol.
+        """
+        with self._lock:
+            yfinance_symbol = self._symbols.get(symbol)
+        if yfinance_symbol is None:
+            raise KeyError(symbol)
+        return yfinance_symbol
+
+    def _object_path(self, digest: str) -> Path:
+        return self.path / "objects" / digest[:2] / f"{digest[2:]}.json.gz"
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / "index.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class RecordingTransport(MiraeTransport):
+    """A `MiraeTransport` that records every successful response to an archive.
+
+    Attributes:
+        archive (ResponseArchive): The archive responses are recorded to.
+    """
+
+    def __init__(self, archive: ResponseArchive, *args: Any, **kwargs: Any) -> None:
+        """Constructs a RecordingTransport instance.
+
+        Args:
+            archive (ResponseArchive): The archive to record responses to.
+            *args: The positional arguments of `MiraeTransport`.
+            **kwargs: The keyword arguments of `MiraeTransport`.
+        """
+        super().__init__(*args, **kwargs)
+        self.archive = archive
+
+    def _send(
+        self,
+        path: str,
+        data: Optional[Mapping[str, Any]],
+        timeout: Optional[Timeout],
+        stats: Optional[dict[str, Any]],
+        body_digest: Optional[BodyDigest] = None,
+    ) -> Any:
+        response = super()._send(path, data, timeout, stats, body_digest)
+        if body_digest is None or body_digest.digest != body_digest.previous:
+            self.archive.put(path, data, response)
+        return response
+
+
+class RecordingSymbolResolver(SymbolResolver):
+    """A `SymbolResolver` that records every resolved symbol to an archive.
+
+    Attributes:
+        archive (ResponseArchive): The archive symbols are recorded to.
+    """
+
+    def __init__(
+        self,
+        archive: ResponseArchive,
+        cache: Optional[SymbolCache] = None,
+        lookup_fn: Callable[[str], str] = convert_to_yfinance_symbol,
+    ) -> None:
+        """Constructs a RecordingSymbolResolver instance.
+
+        Args:
+            archive (ResponseArchive): The archive to record symbols to.
+            cache (Optional[SymbolCache]): The cache to use. Defaults to a `SymbolCache`
+                in `default_cache_dir()`.
+            lookup_fn (Callable[[str], str], optional): The function that looks a symbol
+                up on a cache miss. Defaults to `convert_to_yfinance_symbol`.
+        """
+        super().__init__(cache, lookup_fn)
+        self.archive = archive
+
+    def resolve_many(
+        self,
+        symbols: Iterable[str],
+        max_workers: int = 8,
+        stats: Optional[dict[str, int]] = None,
+    ) -> dict[str, str]:
+        """Resolves symbols like `SymbolResolver.resolve_many` and records the result."""
+        resolved = super().resolve_many(symbols, max_workers, stats)
+        self.archive.put_symbols(resolved)
+        return resolved
+
+
+class ReplayTransport(MiraeTransport):
+    """A transport that answers every request from an archive, without a network.
+
+    Attributes:
+        archive (ResponseArchive): The archive responses are read from.
+    """
+
+    def __init__(self, archive: ResponseArchive, observer: Optional[Observer] = None) -> None:
+        """Constructs a ReplayTransport instance.
+
+        Args:
+            archive (ResponseArchive): The archive to read responses from.
+            observer (Optional[Observer]): A function called with a `CallEvent` after each request.
+        """
+        super().__init__(observer=observer)
+        self.archive = archive
+
+    def _send(
+        self,
+        path: str,
+        data: Optional[Mapping[str, Any]],
+        timeout: Optional[Timeout],
+        stats: Optional[dict[str, Any]],
+        body_digest: Optional[BodyDigest] = None,
+    ) -> Any:
+        body = self.archive.get_body(path, data)
+        if body_digest is not None and body_digest.matches(body):
+            return None
+        return json.loads(body)
+
+
+class ReplayAccount(MiraeAccount):
+    """A `MiraeAccount` that replays recorded responses instead of calling the API.
+
+    No login, browser or network access is needed, so an analysis that ran
+    once against a recording runs again in milliseconds and gives the same
+    results. Record an archive by giving a live account a `RecordingTransport`
+    and a `RecordingSymbolResolver`::
+
+        archive = ResponseArchive("recordings/2024-06-30")
+        account = MiraeAccount.login(user_id, user_password, transport=RecordingTransport(archive))
+        account.symbol_resolver = RecordingSymbolResolver(archive)
+        history = account.get_history(start_date, end_date)
+
+        replayed = ReplayAccount(archive).get_history(start_date, end_date)
+
+    A request that was not recorded raises `RecordingNotFoundException`, and a
+    symbol that was not recorded keeps the broker's symbol.
+
+    Attributes:
+        archive (ResponseArchive): The archive responses are read from.
+    """
+
+    def __init__(
+        self,
+        archive: Union[ResponseArchive, str, Path],
+        symbol_resolver: Optional[SymbolResolver] = None,
+        history_store: Optional[HistoryStore] = None,
+        observer: Optional[Observer] = None,
+    ) -> None:
+        """Constructs a ReplayAccount instance.
+
+        Args:
+            archive (Union[ResponseArchive, str, Path]): The archive, or the directory of
+                the archive, to replay.
+            symbol_resolver (Optional[SymbolResolver]): The resolver used to map equity
+                symbols to Yahoo Finance symbols. Defaults to one that only knows the
+                symbols recorded in the archive.
+            history_store (Optional[HistoryStore]): The store that `get_history` reads
+                closed weeks from and saves them to. Defaults to no store.
+            observer (Optional[Observer]): A function called with a `CallEvent` after each
+                replayed request, symbol resolution and history store lookup.
+        """
+        self.archive = archive if isinstance(archive, ResponseArchive) else ResponseArchive(archive)
+        if symbol_resolver is None:
+            symbol_resolver = SymbolResolver(SymbolCache(":memory:"), self.archive.lookup_symbol)
+        super().__init__("", ReplayTransport(self.archive), symbol_resolver, history_store, observer)
+
+
+def request_key(path: str, data: Optional[Mapping[str, Any]]) -> str:
+    """Returns the key a request is recorded under.
+
+    Args:
+        path (str): The request path.
+        data (Optional[Mapping[str, Any]]): The form fields of the request.
+
+    Returns:
+        str: The path followed by the form fields sorted by name, as a query string.
+    """
+    if not data:
+        return path
+    return path + "?" + urlencode(sorted((key, str(value)) for (key, value) in data.items()))
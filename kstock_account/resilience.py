@@ -0,0 +1,169 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from kstock_account.exceptions import CircuitOpenException, ThrottledException
+
+
+class RateLimiter:
+    """A token bucket that limits how often requests are sent.
+
+    The bucket holds up to `burst` tokens and refills at `rate` tokens per
+    second. Each request takes one token, and waits for the bucket to refill
+    when it is empty. Waiting requests are served in the order they arrived.
+
+    Attributes:
+        rate (float): The sustained number of requests per second.
+        burst (int): The number of requests that may be sent at once after a quiet period.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        """Constructs a RateLimiter instance.
+
+        Args:
+            rate (float): The sustained number of requests per second.
+            burst (Optional[int]): The size of the bucket. Defaults to `rate`, rounded
+                up to at least one request.
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, round(rate))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token and returns how long to wait before it may be used.
+
+        The token is taken even if the bucket is empty, so callers must wait the
+        returned delay before sending their request.
+
+        Returns:
+            float: The delay in seconds, zero if a token was available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1.0
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        """Blocks until a request may be sent."""
+        if (delay := self.reserve()) > 0:
+            time.sleep(delay)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """A dataclass that represents how transient failures are retried.
+
+    Delays grow exponentially with each attempt and are drawn uniformly between
+    zero and the exponential bound ("full jitter"), so clients that failed
+    together do not retry together.
+    """
+
+    max_attempts: int = 3
+    """The maximum number of attempts, including the first one."""
+
+    backoff: float = 0.5
+    """The upper bound of the first delay in seconds."""
+
+    max_backoff: float = 10.0
+    """The upper bound of any delay in seconds."""
+
+    def delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """Returns how long to wait before retrying.
+
+        Args:
+            attempt (int): The number of attempts made so far, starting at 1.
+            error (Optional[Exception]): The error of the last attempt. The delay is at
+                least the `retry_after` of a `ThrottledException`.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        delay = random.uniform(0.0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+        if isinstance(error, ThrottledException) and error.retry_after is not None:
+            delay = max(delay, error.retry_after)
+        return delay
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+"""A retry policy that never retries."""
+
+
+class CircuitBreaker:
+    """Fails fast while an endpoint keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens, and calls
+    raise `CircuitOpenException` without reaching the endpoint. Once
+    `reset_timeout` has passed, a single trial call is let through: the circuit
+    closes again if it succeeds and stays open for another `reset_timeout` if it
+    fails.
+
+    Attributes:
+        failure_threshold (int): The number of consecutive failures that opens the circuit.
+        reset_timeout (float): How long in seconds the circuit stays open before a trial call.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        """Constructs a CircuitBreaker instance.
+
+        Args:
+            failure_threshold (int, optional): The number of consecutive failures that
+                opens the circuit. Defaults to 5.
+            reset_timeout (float, optional): How long in seconds the circuit stays open
+                before a trial call. Defaults to 30 seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently failing fast."""
+        with self._lock:
+            return self._opened_at is not None
+
+    def before_call(self) -> None:
+        """Checks that a call may be made.
+
+        Raises:
+            CircuitOpenException: If the circuit is open.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self._trial_in_flight:
+                raise CircuitOpenException(max(remaining, 0.0))
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        """Records a successful call and closes the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_inconclusive(self) -> None:
+        """Records a call that failed for a reason other than the endpoint's health.
+
+        Such a call, like one rejected for an expired session, neither closes nor
+        opens the circuit, but it lets the next trial call through.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Records a failed call, opening the circuit once the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
@@ -1,7 +1,32 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import date
+from typing import Any, TypeVar, cast
 
+_T = TypeVar("_T")
 
+
+def _slotted(cls: type[_T]) -> type[_T]:
+    # Equivalent to `dataclass(slots=True)`, which needs Python 3.10. Each class
+    # only declares slots for its own fields, so subclasses stay compact too.
+    names = tuple(f.name for f in fields(cls))  # type: ignore[arg-type]
+    inherited = {name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())}
+    namespace = {key: value for (key, value) in cls.__dict__.items() if key not in {*names, "__dict__", "__weakref__"}}
+    namespace["__slots__"] = tuple(name for name in names if name not in inherited)
+    namespace["__getstate__"] = _getstate
+    namespace["__setstate__"] = _setstate
+    return cast("type[_T]", type(cls.__name__, cls.__bases__, namespace))
+
+
+def _getstate(self: Any) -> list[Any]:
+    return [getattr(self, f.name) for f in fields(self)]
+
+
+def _setstate(self: Any, state: list[Any]) -> None:
+    for f, value in zip(fields(self), state):
+        object.__setattr__(self, f.name, value)
+
+
+@_slotted
 @dataclass(frozen=True)
 class HeldAsset:
     """A dataclass that represents a financial asset held by the user."""
@@ -22,11 +47,13 @@ class HeldAsset:
     """The market value of the asset."""
 
 
+@_slotted
 @dataclass(frozen=True)
 class HeldCash(HeldAsset):
     """A dataclass that represents cash held by the user."""
 
 
+@_slotted
 @dataclass(frozen=True)
 class HeldCashEquivalent(HeldCash):
     """A dataclass that represents cash equivalents held by the user.
@@ -52,6 +79,7 @@ class HeldCashEquivalent(HeldCash):
         return self.pnl / self.entry_value
 
 
+@_slotted
 @dataclass(frozen=True)
 class HeldEquity(HeldAsset):
     """A dataclass that represents equity held by the user."""
@@ -86,6 +114,7 @@ class HeldEquity(HeldAsset):
         return self.entry_value / self.quantity
 
 
+@_slotted
 @dataclass(frozen=True)
 class HeldGoldSpot(HeldAsset):
     """A dataclass that represents gold spot held by the user."""
@@ -120,6 +149,7 @@ class HeldGoldSpot(HeldAsset):
         return self.entry_value / self.quantity
 
 
+@_slotted
 @dataclass(frozen=True)
 class HoldingPeriodRecord:
     """A dataclass that represents an asset holding period record."""
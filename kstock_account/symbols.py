@@ -0,0 +1,256 @@
+import csv
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from kstock_account.exceptions import SymbolNotFoundException
+from kstock_account.utils import convert_to_yfinance_symbol, default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolCache:
+    """A two-level cache of Yahoo Finance symbols keyed by the raw broker symbol.
+
+    Lookups hit an in-process LRU first and fall back to an SQLite database on
+    disk, so resolved symbols survive process restarts. Symbols that could not
+    be resolved are cached as well (as `None`) with a shorter TTL, so a missing
+    listing is not looked up again on every call.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        ttl: timedelta = timedelta(days=30),
+        negative_ttl: timedelta = timedelta(days=1),
+        maxsize: int = 4096,
+    ) -> None:
+        """Constructs a SymbolCache instance.
+
+        Args:
+            path (Optional[Union[str, Path]]): The path of the SQLite database, or
+                `":memory:"` to keep the cache in process only. Defaults to
+                `symbols.sqlite3` in `default_cache_dir()`.
+            ttl (timedelta, optional): How long a resolved symbol stays valid. Defaults to 30 days.
+            negative_ttl (timedelta, optional): How long a failed lookup stays cached. Defaults to 1 day.
+            maxsize (int, optional): The maximum number of entries kept in memory. Defaults to 4096.
+        """
+        if path is None:
+            path = default_cache_dir() / "symbols.sqlite3"
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self._memory: OrderedDict[str, tuple[Optional[str], Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS symbols (symbol TEXT PRIMARY KEY, yfinance_symbol TEXT, expires_at REAL)",
+            )
+
+    def get(self, symbol: str) -> tuple[bool, Optional[str]]:
+        """Returns the cached Yahoo Finance symbol for a raw symbol.
+
+        Args:
+            symbol (str): The raw broker symbol.
+
+        Returns:
+            tuple[bool, Optional[str]]: Whether a valid entry was found, and the cached
+            symbol, which is `None` if the symbol is cached as not found.
+        """
+        now = time.time()
+        with self._lock:
+            if (entry := self._memory.get(symbol)) is not None:
+                if entry[1] is None or entry[1] > now:
+                    self._memory.move_to_end(symbol)
+                    return (True, entry[0])
+                del self._memory[symbol]
+            row = self._db.execute(
+                "SELECT yfinance_symbol, expires_at FROM symbols WHERE symbol = ?",
+                (symbol,),
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                return (False, None)
+            self._remember(symbol, row[0], row[1])
+            return (True, row[0])
+
+    def set(self, symbol: str, yfinance_symbol: Optional[str], ttl: Optional[timedelta] = None) -> None:
+        """Caches the Yahoo Finance symbol for a raw symbol.
+
+        Args:
+            symbol (str): The raw broker symbol.
+            yfinance_symbol (Optional[str]): The Yahoo Finance symbol, or `None` if it could not be resolved.
+            ttl (Optional[timedelta]): How long the entry stays valid. Defaults to `ttl`
+                for resolved symbols and `negative_ttl` for failed lookups.
+        """
+        if ttl is None:
+            ttl = self.ttl if yfinance_symbol is not None else self.negative_ttl
+        self._set_many([(symbol, yfinance_symbol, time.time() + ttl.total_seconds())])
+
+    def seed_from_csv(self, path: Union[str, Path]) -> int:
+        """Pre-seeds the cache from a CSV file.
+
+        The file must have a `symbol` and a `yfinance_symbol` column. Seeded
+        entries never expire. A row with an empty `yfinance_symbol` marks the
+        symbol as not found.
+
+        Args:
+            path (Union[str, Path]): The path of the CSV file.
+
+        Returns:
+            int: The number of seeded entries.
+        """
+        with open(path, newline="", encoding="utf-8") as f:
+            entries = [(row["symbol"], row["yfinance_symbol"] or None, None) for row in csv.DictReader(f)]
+        self._set_many(entries)
+        return len(entries)
+
+    def clear(self) -> None:
+        """Removes every entry from the cache."""
+        with self._lock, self._db:
+            self._memory.clear()
+            self._db.execute("DELETE FROM symbols")
+
+    def close(self) -> None:
+        """Closes the underlying database."""
+        self._db.close()
+
+    def _set_many(self, entries: Sequence[tuple[str, Optional[str], Optional[float]]]) -> None:
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO symbols (symbol, yfinance_symbol, expires_at) VALUES (?, ?, ?)",
+                entries,
+            )
+            for symbol, yfinance_symbol, expires_at in entries:
+                self._remember(symbol, yfinance_symbol, expires_at)
+
+    def _remember(self, symbol: str, yfinance_symbol: Optional[str], expires_at: Optional[float]) -> None:
+        self._memory[symbol] = (yfinance_symbol, expires_at)
+        self._memory.move_to_end(symbol)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+
+class SymbolResolver:
+    """Resolves raw broker symbols to Yahoo Finance symbols through a `SymbolCache`.
+
+    Attributes:
+        cache (SymbolCache): The cache consulted before looking a symbol up.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[SymbolCache] = None,
+        lookup_fn: Callable[[str], str] = convert_to_yfinance_symbol,
+    ) -> None:
+        """Constructs a SymbolResolver instance.
+
+        Args:
+            cache (Optional[SymbolCache]): The cache to use. Defaults to a `SymbolCache`
+                in `default_cache_dir()`.
+            lookup_fn (Callable[[str], str], optional): The function that looks a symbol
+                up on a cache miss. Defaults to `convert_to_yfinance_symbol`.
+        """
+        self.cache = cache if cache is not None else SymbolCache()
+        self.lookup_fn = lookup_fn
+
+    def resolve(self, symbol: str) -> str:
+        """Returns the Yahoo Finance symbol for a raw broker symbol.
+
+        Args:
+            symbol (str): The raw broker symbol.
+
+        Returns:
+            str: The corresponding Yahoo Finance symbol.
+
+        Raises:
+            SymbolNotFoundException: If the symbol has no Yahoo Finance listing.
+        """
+        (found, yfinance_symbol) = self.cache.get(symbol)
+        if not found:
+            try:
+                yfinance_symbol = self.lookup_fn(symbol)
+            except (IndexError, KeyError):
+                yfinance_symbol = None
+            self.cache.set(symbol, yfinance_symbol)
+        if yfinance_symbol is None:
+            raise SymbolNotFoundException(symbol)
+        return yfinance_symbol
+
+    def resolve_many(
+        self,
+        symbols: Iterable[str],
+        max_workers: int = 8,
+        stats: Optional[dict[str, int]] = None,
+    ) -> dict[str, str]:
+        """Returns the Yahoo Finance symbols for many raw broker symbols at once.
+
+        Duplicates are resolved once, cache hits are answered without a lookup,
+        and the remaining misses are looked up in parallel. A symbol that cannot
+        be resolved maps to itself, so one bad listing does not fail the batch.
+
+        Args:
+            symbols (Iterable[str]): The raw broker symbols.
+            max_workers (int, optional): The maximum number of lookups in flight. Defaults to 8.
+            stats (Optional[dict[str, int]]): A dictionary to fill with the number of
+                cache `hits` and `misses`.
+
+        Returns:
+            dict[str, str]: The Yahoo Finance symbol for each distinct raw symbol.
+        """
+        resolved: dict[str, str] = {}
+        misses: list[str] = []
+        for symbol in dict.fromkeys(symbols):
+            (found, yfinance_symbol) = self.cache.get(symbol)
+            if not found:
+                misses.append(symbol)
+            else:
+                resolved[symbol] = yfinance_symbol if yfinance_symbol is not None else symbol
+        if misses:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(misses)))) as executor:
+                resolved.update(zip(misses, executor.map(self._resolve_or_keep, misses)))
+        if stats is not None:
+            stats["hits"] = len(resolved) - len(misses)
+            stats["misses"] = len(misses)
+        return resolved
+
+    def _resolve_or_keep(self, symbol: str) -> str:
+        try:
+            return self.resolve(symbol)
+        except Exception as e:  # noqa: BLE001 - lookup_fn is pluggable; any failure keeps the broker's symbol
+            logger.warning("Could not resolve %s to a Yahoo Finance symbol: %s", symbol, e)
+            return symbol
+
+
+_default_symbol_resolver: Optional[SymbolResolver] = None
+_default_symbol_resolver_lock = threading.Lock()
+
+
+def default_symbol_resolver() -> SymbolResolver:
+    """Returns the process-wide symbol resolver, creating it on first use.
+
+    If the on-disk cache cannot be opened, such as when the cache directory is
+    not writable, the resolver keeps its cache in process only.
+
+    Returns:
+        SymbolResolver: The shared symbol resolver backed by the on-disk cache.
+    """
+    global _default_symbol_resolver
+    with _default_symbol_resolver_lock:
+        if _default_symbol_resolver is None:
+            try:
+                cache = SymbolCache()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Could not open the symbol cache, keeping it in memory: %s", e)
+                cache = SymbolCache(":memory:")
+            _default_symbol_resolver = SymbolResolver(cache)
+        return _default_symbol_resolver
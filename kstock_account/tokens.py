@@ -0,0 +1,216 @@
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from kstock_account.utils import _write_atomically, default_cache_dir
+
+
+@dataclass(frozen=True)
+class StoredToken:
+    """A dataclass that represents an access token saved for later reuse."""
+
+    access_token: str
+    """The access token."""
+
+    expires_at: datetime
+    """The time after which the token is considered expired."""
+
+    def is_expired(self, margin: timedelta = timedelta(0)) -> bool:
+        """Returns whether the token expires within `margin` from now.
+
+        Args:
+            margin (timedelta, optional): How long before the expiry the token already
+                counts as expired. Defaults to zero.
+
+        Returns:
+            bool: True if the token is expired.
+        """
+        return datetime.now() + margin >= self.expires_at
+
+
+class FileTokenStore:
+    """Saves access tokens in a JSON file that only the current user can read.
+
+    The file is created with `0600` permissions and rewritten atomically.
+    Tokens are keyed by a hash of the user ID, so the file does not reveal which
+    users logged in.
+
+    Attributes:
+        path (Path): The path of the token file.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        """Constructs a FileTokenStore instance.
+
+        Args:
+            path (Optional[Union[str, Path]]): The path of the token file. Defaults to
+                `tokens.json` in `default_cache_dir()`.
+        """
+        self.path = Path(path) if path is not None else default_cache_dir() / "tokens.json"
+        self._lock = threading.Lock()
+
+    def load(self, user_id: str) -> Optional[StoredToken]:
+        """Returns the token saved for a user.
+
+        Args:
+            user_id (str): The user ID.
+
+        Returns:
+            Optional[StoredToken]: The saved token, or None if there is none.
+        """
+        with self._lock:
+            entry = self._read().get(self._key(user_id))
+        if entry is None:
+            return None
+        return StoredToken(entry["access_token"], datetime.fromisoformat(entry["expires_at"]))
+
+    def save(self, user_id: str, token: StoredToken) -> None:
+        """Saves the token for a user, replacing any previous one.
+
+        Args:
+            user_id (str): The user ID.
+            token (StoredToken): The token to save.
+        """
+        with self._lock:
+            entries = self._read()
+            entries[self._key(user_id)] = {
+                "access_token": token.access_token,
+                "expires_at": token.expires_at.isoformat(),
+            }
+            self._write(entries)
+
+    def delete(self, user_id: str) -> None:
+        """Removes the token saved for a user.
+
+        Args:
+            user_id (str): The user ID.
+        """
+        with self._lock:
+            entries = self._read()
+            if entries.pop(self._key(user_id), None) is not None:
+                self._write(entries)
+
+    def _key(self, user_id: str) -> str:
+        return hashlib.sha256(user_id.encode()).hexdigest()
+
+    def _read(self) -> dict[str, dict[str, str]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries: dict[str, dict[str, str]] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return entries
+
+    def _write(self, entries: dict[str, dict[str, str]]) -> None:
+        _write_atomically(self.path, json.dumps(entries).encode("utf-8"), mode=0o600)
+
+
+class TokenRefresher:
+    """Obtains fresh access tokens and saves them to a token store.
+
+    With `start`, the token is refreshed in a background thread shortly before
+    it expires, so a long-running process does not stall on a browser login in
+    the middle of a request.
+
+    Attributes:
+        token (StoredToken): The current token.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        login_fn: Callable[[], str],
+        token: StoredToken,
+        token_store: Optional[FileTokenStore] = None,
+        token_ttl: timedelta = timedelta(minutes=30),
+        refresh_margin: timedelta = timedelta(minutes=5),
+        retry_interval: timedelta = timedelta(minutes=1),
+    ) -> None:
+        """Constructs a TokenRefresher instance.
+
+        Args:
+            user_id (str): The user ID the token belongs to.
+            login_fn (Callable[[], str]): A function that logs in and returns a new access token.
+            token (StoredToken): The current token.
+            token_store (Optional[FileTokenStore]): The store to save refreshed tokens to.
+            token_ttl (timedelta, optional): How long a new token is assumed to stay valid.
+                Defaults to 30 minutes.
+            refresh_margin (timedelta, optional): How long before the expiry the token is
+                refreshed. Defaults to 5 minutes.
+            retry_interval (timedelta, optional): How long to wait before retrying a failed
+                background refresh. Defaults to 1 minute.
+        """
+        self.user_id = user_id
+        self.login_fn = login_fn
+        self.token = token
+        self.token_store = token_store
+        self.token_ttl = token_ttl
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._on_refresh: Optional[Callable[[str], None]] = None
+
+    def refresh(self) -> str:
+        """Logs in again and returns the new access token.
+
+        Returns:
+            str: The new access token.
+
+        Raises:
+            LoginFailedException: If the login attempt fails.
+        """
+        with self._lock:
+            if not self.token.is_expired(self.refresh_margin):
+                return self.token.access_token
+            self.token = StoredToken(self.login_fn(), datetime.now() + self.token_ttl)
+            if self.token_store is not None:
+                self.token_store.save(self.user_id, self.token)
+        if self._on_refresh is not None:
+            self._on_refresh(self.token.access_token)
+        return self.token.access_token
+
+    def needs_refresh(self) -> bool:
+        """Returns whether the current token is expired or about to expire.
+
+        Returns:
+            bool: True if the token should be refreshed before the next request.
+        """
+        return self.token.is_expired(self.refresh_margin)
+
+    def start(self, on_refresh: Callable[[str], None]) -> None:
+        """Starts refreshing the token in the background before it expires.
+
+        Args:
+            on_refresh (Callable[[str], None]): A function called with each new access token.
+        """
+        self._on_refresh = on_refresh
+        self._schedule()
+
+    def stop(self) -> None:
+        """Stops the background refresh."""
+        self._on_refresh = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _schedule(self, delay: Optional[float] = None) -> None:
+        if delay is None:
+            delay = max((self.token.expires_at - self.refresh_margin - datetime.now()).total_seconds(), 0.0)
+        self._timer = threading.Timer(delay, self._refresh_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception:  # noqa: BLE001 - login_fn is pluggable; the timer thread retries after any failure
+            if self._on_refresh is not None:
+                self._schedule(self.retry_interval.total_seconds())
+            return
+        if self._on_refresh is not None:
+            self._schedule()
@@ -0,0 +1,537 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from kstock_account.decoding import json_decoder
+from kstock_account.exceptions import (
+    MalformedResponseException,
+    ServiceUnavailableException,
+    SessionExpiredException,
+    ThrottledException,
+)
+from kstock_account.metrics import CallEvent, Observer, count_rows, endpoint_name
+from kstock_account.resilience import CircuitBreaker, RateLimiter, RetryPolicy
+
+if TYPE_CHECKING:
+    import httpx
+
+MIRAE_BASE_URL = "https://securities.miraeasset.com"
+"""The base URL of the Mirae Asset Securities website."""
+
+MIRAE_ACCESS_TOKEN_COOKIE = "MIREADW_D"
+"""The name of the cookie that carries the Mirae Asset Securities access token."""
+
+Timeout = Union[float, tuple[float, float]]
+
+
+class BodyDigest:
+    """The BLAKE2b digest of a response body, compared with the digest of a body seen earlier.
+
+    Attributes:
+        previous (Optional[bytes]): The digest of the body seen earlier.
+        digest (bytes): The digest of the last body passed to `matches`.
+    """
+
+    def __init__(self, previous: Optional[bytes] = None) -> None:
+        """Constructs a BodyDigest instance.
+
+        Args:
+            previous (Optional[bytes]): The digest of the body seen earlier.
+        """
+        self.previous = previous
+        self.digest = b""
+
+    def matches(self, content: bytes) -> bool:
+        """Hashes a response body and tells whether it is the body seen earlier.
+
+        Args:
+            content (bytes): The raw response body.
+
+        Returns:
+            bool: True if the body hashes to `previous`.
+        """
+        self.digest = hashlib.blake2b(content, digest_size=16).digest()
+        return self.digest == self.previous
+
+
+class MiraeTransport:
+    """A pooled, keep-alive HTTP transport for the Mirae Asset Securities API.
+
+    The transport owns a `requests.Session` whose connection pool is reused
+    across calls, so consecutive requests skip the TCP and TLS handshakes.
+    The access token cookie is set once on the session instead of on every
+    request.
+
+    Transient failures (connection errors, timeouts, throttling and server
+    errors) are retried according to `retry_policy`, and `circuit_breaker`
+    fails requests fast while the API keeps failing.
+
+    Attributes:
+        base_url (str): The base URL that request paths are resolved against.
+        timeout (Timeout): The connect and read timeouts in seconds.
+        session (requests.Session): The underlying HTTP session.
+        rate_limiter (Optional[RateLimiter]): The limiter every request waits on.
+        retry_policy (RetryPolicy): How transient failures are retried.
+        circuit_breaker (CircuitBreaker): The breaker that fails requests fast while the API keeps failing.
+        observer (Optional[Observer]): The function called with a `CallEvent` after each request.
+    """
+
+    def __init__(
+        self,
+        access_token: Optional[str] = None,
+        base_url: str = MIRAE_BASE_URL,
+        pool_size: int = 10,
+        timeout: Timeout = (3.05, 30.0),
+        session: Optional[requests.Session] = None,
+        max_concurrency: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        observer: Optional[Observer] = None,
+    ) -> None:
+        """Constructs a MiraeTransport instance.
+
+        Args:
+            access_token (Optional[str]): The access token for the account API.
+            base_url (str, optional): The base URL of the API. Point it at a local
+                stub server for tests and benchmarks. Defaults to `MIRAE_BASE_URL`.
+            pool_size (int, optional): The maximum number of pooled keep-alive
+                connections. Defaults to 10.
+            timeout (Timeout, optional): The connect and read timeouts in seconds.
+                Defaults to `(3.05, 30.0)`.
+            session (Optional[requests.Session]): A preconfigured session to use
+                instead of creating a new one.
+            max_concurrency (Optional[int]): The maximum number of requests in flight
+                to the host at once, shared by all threads using this transport.
+                Defaults to `pool_size`.
+            rate_limiter (Optional[RateLimiter]): The limiter every request waits on.
+                Share one limiter between transports to limit them together.
+                Defaults to no limit.
+            retry_policy (Optional[RetryPolicy]): How connection errors, timeouts,
+                throttling and server errors are retried. Defaults to `RetryPolicy()`.
+            circuit_breaker (Optional[CircuitBreaker]): The breaker that fails requests
+                fast while the API keeps failing. Defaults to a new `CircuitBreaker`.
+            observer (Optional[Observer]): A function called with a `CallEvent` after each
+                request. Defaults to none, which skips the instrumentation entirely.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self._semaphore = threading.BoundedSemaphore(max_concurrency if max_concurrency is not None else pool_size)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.observer = observer
+        if access_token is not None:
+            self.access_token = access_token
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """The access token sent with every request."""
+        return self.session.cookies.get(MIRAE_ACCESS_TOKEN_COOKIE)
+
+    @access_token.setter
+    def access_token(self, access_token: str) -> None:
+        self.session.cookies.set(MIRAE_ACCESS_TOKEN_COOKIE, access_token)
+
+    def post(self, path: str, data: Optional[Mapping[str, Any]] = None, timeout: Optional[Timeout] = None) -> Any:
+        """Sends a POST request to the API and returns the decoded JSON body.
+
+        Args:
+            path (str): The request path, relative to `base_url`.
+            data (Optional[Mapping[str, Any]]): The form fields to send.
+            timeout (Optional[Timeout]): The timeouts of this request. Defaults to `timeout`.
+
+        Returns:
+            Any: The decoded JSON response body.
+
+        Raises:
+            SessionExpiredException: If the access token is no longer accepted.
+            ThrottledException: If the API is still throttling after the last retry.
+            ServiceUnavailableException: If the API still answers with a server error after the last retry.
+            MalformedResponseException: If the response is not JSON.
+            CircuitOpenException: If the circuit breaker is open.
+            requests.RequestException: If the request still fails after the last retry.
+        """
+        return self._observed_send(path, data, timeout, None)
+
+    def post_changed(
+        self,
+        path: str,
+        data: Optional[Mapping[str, Any]] = None,
+        digest: Optional[bytes] = None,
+        timeout: Optional[Timeout] = None,
+    ) -> tuple[bytes, Any]:
+        """Sends a POST request to the API and decodes the body only if it changed.
+
+        The raw response body is hashed with BLAKE2b before it is decoded. A body
+        that hashes to `digest` is not decoded at all.
+
+        Args:
+            path (str): The request path, relative to `base_url`.
+            data (Optional[Mapping[str, Any]]): The form fields to send.
+            digest (Optional[bytes]): The digest of the body last seen. Defaults to none.
+            timeout (Optional[Timeout]): The timeouts of this request. Defaults to `timeout`.
+
+        Returns:
+            tuple[bytes, Any]: The digest of the body, and the decoded JSON body or
+            None if the body hashes to `digest`.
+
+        Raises:
+            SessionExpiredException: If the access token is no longer accepted.
+            ThrottledException: If the API is still throttling after the last retry.
+            ServiceUnavailableException: If the API still answers with a server error after the last retry.
+            MalformedResponseException: If the response is not JSON.
+            CircuitOpenException: If the circuit breaker is open.
+            requests.RequestException: If the request still fails after the last retry.
+        """
+        body_digest = BodyDigest(digest)
+        response = self._observed_send(path, data, timeout, body_digest)
+        return (body_digest.digest, response)
+
+    def _observed_send(
+        self,
+        path: str,
+        data: Optional[Mapping[str, Any]],
+        timeout: Optional[Timeout],
+        body_digest: Optional[BodyDigest],
+    ) -> Any:
+        observer = self.observer
+        if observer is None:
+            return self._send(path, data, timeout, None, body_digest)
+        stats = _new_call_stats()
+        started_at = time.perf_counter()
+        try:
+            response = self._send(path, data, timeout, stats, body_digest)
+        except Exception as e:
+            observer(CallEvent(endpoint_name(path), time.perf_counter() - started_at, error=type(e).__name__, **stats))
+            raise
+        observer(CallEvent(endpoint_name(path), time.perf_counter() - started_at, rows=count_rows(response), **stats))
+        return response
+
+    def _send(
+        self,
+        path: str,
+        data: Optional[Mapping[str, Any]],
+        timeout: Optional[Timeout],
+        stats: Optional[dict[str, Any]],
+        body_digest: Optional[BodyDigest] = None,
+    ) -> Any:
+        attempt = 0
+        while True:
+            attempt += 1
+            self.circuit_breaker.before_call()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                with self._semaphore:
+                    r = self.session.post(
+                        self.base_url + path,
+                        data=data,
+                        timeout=timeout if timeout is not None else self.timeout,
+                    )
+                response = _decode_response(
+                    path,
+                    r.status_code,
+                    r.url,
+                    r.headers,
+                    r.content,
+                    json_decoder(r.content, r.encoding, r.json),
+                    stats,
+                    body_digest,
+                )
+            except (requests.ConnectionError, requests.Timeout, ThrottledException, ServiceUnavailableException) as e:
+                self.circuit_breaker.record_failure()
+                if attempt >= self.retry_policy.max_attempts:
+                    raise
+                if stats is not None:
+                    stats["retries"] += 1
+                time.sleep(self.retry_policy.delay(attempt, e))
+                continue
+            except BaseException:
+                self.circuit_breaker.record_inconclusive()
+                raise
+            self.circuit_breaker.record_success()
+            return response
+
+    def close(self) -> None:
+        """Closes the pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> "MiraeTransport":
+        """Returns the transport itself."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Closes the pooled connections."""
+        self.close()
+
+
+class AsyncMiraeTransport:
+    """An asyncio HTTP transport for the Mirae Asset Securities API.
+
+    The asyncio counterpart of `MiraeTransport`, backed by a pooled
+    `httpx.AsyncClient`. Requires the `httpx` package, which is installed with
+    the `async` extra.
+
+    Attributes:
+        base_url (str): The base URL that request paths are resolved against.
+        client (httpx.AsyncClient): The underlying HTTP client.
+        rate_limiter (Optional[RateLimiter]): The limiter every request waits on.
+        retry_policy (RetryPolicy): How transient failures are retried.
+        circuit_breaker (CircuitBreaker): The breaker that fails requests fast while the API keeps failing.
+        observer (Optional[Observer]): The function called with a `CallEvent` after each request.
+    """
+
+    def __init__(
+        self,
+        access_token: Optional[str] = None,
+        base_url: str = MIRAE_BASE_URL,
+        pool_size: int = 10,
+        timeout: Timeout = (3.05, 30.0),
+        client: Optional["httpx.AsyncClient"] = None,
+        max_concurrency: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        observer: Optional[Observer] = None,
+    ) -> None:
+        """Constructs an AsyncMiraeTransport instance.
+
+        Args:
+            access_token (Optional[str]): The access token for the account API.
+            base_url (str, optional): The base URL of the API. Defaults to `MIRAE_BASE_URL`.
+            pool_size (int, optional): The maximum number of pooled keep-alive
+                connections. Defaults to 10.
+            timeout (Timeout, optional): The connect and read timeouts in seconds.
+                Defaults to `(3.05, 30.0)`.
+            client (Optional[httpx.AsyncClient]): A preconfigured client to use
+                instead of creating a new one.
+            max_concurrency (Optional[int]): The maximum number of requests in flight
+                to the host at once. Defaults to `pool_size`.
+            rate_limiter (Optional[RateLimiter]): The limiter every request waits on.
+                Defaults to no limit.
+            retry_policy (Optional[RetryPolicy]): How connection errors, timeouts,
+                throttling and server errors are retried. Defaults to `RetryPolicy()`.
+            circuit_breaker (Optional[CircuitBreaker]): The breaker that fails requests
+                fast while the API keeps failing. Defaults to a new `CircuitBreaker`.
+            observer (Optional[Observer]): A function called with a `CallEvent` after each
+                request. Defaults to none, which skips the instrumentation entirely.
+        """
+        import httpx
+
+        self.base_url = base_url.rstrip("/")
+        if client is None:
+            connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            )
+        self.client = client
+        self._max_concurrency = max_concurrency if max_concurrency is not None else pool_size
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.observer = observer
+        if access_token is not None:
+            self.access_token = access_token
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """The access token sent with every request."""
+        return self.client.cookies.get(MIRAE_ACCESS_TOKEN_COOKIE)
+
+    @access_token.setter
+    def access_token(self, access_token: str) -> None:
+        self.client.cookies.set(MIRAE_ACCESS_TOKEN_COOKIE, access_token)
+
+    async def post(self, path: str, data: Optional[Mapping[str, Any]] = None, timeout: Optional[Timeout] = None) -> Any:
+        """Sends a POST request to the API and returns the decoded JSON body.
+
+        Args:
+            path (str): The request path, relative to `base_url`.
+            data (Optional[Mapping[str, Any]]): The form fields to send.
+            timeout (Optional[Timeout]): The timeouts of this request. Defaults to the
+                timeouts of the client.
+
+        Returns:
+            Any: The decoded JSON response body.
+
+        Raises:
+            SessionExpiredException: If the access token is no longer accepted.
+            ThrottledException: If the API is still throttling after the last retry.
+            ServiceUnavailableException: If the API still answers with a server error after the last retry.
+            MalformedResponseException: If the response is not JSON.
+            CircuitOpenException: If the circuit breaker is open.
+            httpx.TransportError: If the request still fails after the last retry.
+        """
+        return await self._observed_send(path, data, timeout, None)
+
+    async def post_changed(
+        self,
+        path: str,
+        data: Optional[Mapping[str, Any]] = None,
+        digest: Optional[bytes] = None,
+        timeout: Optional[Timeout] = None,
+    ) -> tuple[bytes, Any]:
+        """Sends a POST request to the API and decodes the body only if it changed.
+
+        The asyncio counterpart of `MiraeTransport.post_changed`.
+
+        Args:
+            path (str): The request path, relative to `base_url`.
+            data (Optional[Mapping[str, Any]]): The form fields to send.
+            digest (Optional[bytes]): The digest of the body last seen. Defaults to none.
+            timeout (Optional[Timeout]): The timeouts of this request. Defaults to the
+                timeouts of the client.
+
+        Returns:
+            tuple[bytes, Any]: The digest of the body, and the decoded JSON body or
+            None if the body hashes to `digest`.
+        """
+        body_digest = BodyDigest(digest)
+        response = await self._observed_send(path, data, timeout, body_digest)
+        return (body_digest.digest, response)
+
+    async def _observed_send(
+        self,
+        path: str,
+        data: Optional[Mapping[str, Any]],
+        timeout: Optional[Timeout],
+        body_digest: Optional[BodyDigest],
+    ) -> Any:
+        observer = self.observer
+        if observer is None:
+            return await self._send(path, data, timeout, None, body_digest)
+        stats = _new_call_stats()
+        started_at = time.perf_counter()
+        try:
+            response = await self._send(path, data, timeout, stats, body_digest)
+        except Exception as e:
+            observer(CallEvent(endpoint_name(path), time.perf_counter() - started_at, error=type(e).__name__, **stats))
+            raise
+        observer(CallEvent(endpoint_name(path), time.perf_counter() - started_at, rows=count_rows(response), **stats))
+        return response
+
+    async def _send(
+        self,
+        path: str,
+        data: Optional[Mapping[str, Any]],
+        timeout: Optional[Timeout],
+        stats: Optional[dict[str, Any]],
+        body_digest: Optional[BodyDigest] = None,
+    ) -> Any:
+        import httpx
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        options: dict[str, Any] = {}
+        if timeout is not None:
+            connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            options["timeout"] = httpx.Timeout(read_timeout, connect=connect_timeout)
+        attempt = 0
+        while True:
+            attempt += 1
+            self.circuit_breaker.before_call()
+            if self.rate_limiter is not None and (delay := self.rate_limiter.reserve()) > 0:
+                await asyncio.sleep(delay)
+            try:
+                async with self._semaphore:
+                    r = await self.client.post(self.base_url + path, data=data, **options)
+                response = _decode_response(
+                    path,
+                    r.status_code,
+                    str(r.url),
+                    r.headers,
+                    r.content,
+                    json_decoder(r.content, r.charset_encoding, r.json),
+                    stats,
+                    body_digest,
+                )
+            except (httpx.TransportError, ThrottledException, ServiceUnavailableException) as e:
+                self.circuit_breaker.record_failure()
+                if attempt >= self.retry_policy.max_attempts:
+                    raise
+                if stats is not None:
+                    stats["retries"] += 1
+                await asyncio.sleep(self.retry_policy.delay(attempt, e))
+                continue
+            except BaseException:
+                self.circuit_breaker.record_inconclusive()
+                raise
+            self.circuit_breaker.record_success()
+            return response
+
+    async def aclose(self) -> None:
+        """Closes the pooled connections."""
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncMiraeTransport":
+        """Returns the transport itself."""
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        """Closes the pooled connections."""
+        await self.aclose()
+
+
+def _decode_response(
+    path: str,
+    status_code: int,
+    url: str,
+    headers: Mapping[str, str],
+    content: bytes,
+    decode_json: Callable[[], Any],
+    stats: Optional[dict[str, Any]],
+    body_digest: Optional[BodyDigest] = None,
+) -> Any:
+    if stats is not None:
+        stats["bytes_received"] += len(content)
+    if status_code in (401, 403) or "/login" in url:
+        raise SessionExpiredException
+    if status_code == 429:
+        raise ThrottledException(_parse_retry_after(headers.get("Retry-After")))
+    if status_code >= 500:
+        raise ServiceUnavailableException(status_code)
+    if body_digest is not None and body_digest.matches(content):
+        return None
+    started_at = time.perf_counter() if stats is not None else 0.0
+    try:
+        response = decode_json()
+    except ValueError:
+        if b"login.do" in content:
+            raise SessionExpiredException
+        raise MalformedResponseException(path, f"HTTP {status_code} response is not JSON")
+    if stats is not None:
+        stats["decode_time"] += time.perf_counter() - started_at
+    return response
+
+
+def _new_call_stats() -> dict[str, Any]:
+    return {"bytes_received": 0, "retries": 0, "decode_time": 0.0}
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -1,19 +1,29 @@
+import json
+import os
 import re
+import tempfile
+import time
+from collections.abc import Iterable
 from datetime import date, timedelta
-from typing import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 import requests
-from selenium import webdriver
-from selenium.webdriver.edge.options import Options
-from selenium.webdriver.edge.service import Service
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
 
+if TYPE_CHECKING:
+    from selenium import webdriver
 
-def convert_to_yfinance_symbol(symbol: str) -> str:
+YAHOO_FINANCE_SEARCH_URL = "https://query1.finance.yahoo.com/v1/finance/search"
+"""The Yahoo Finance search endpoint used to look symbols up."""
+
+
+def convert_to_yfinance_symbol(symbol: str, search_url: str = YAHOO_FINANCE_SEARCH_URL) -> str:
     """Convert a stock symbol to a symbol used by Yahoo Finance.
 
     Args:
         symbol (str): The stock symbol.
+        search_url (str, optional): The search endpoint to query. Point it at a local
+            stub server for tests and benchmarks. Defaults to `YAHOO_FINANCE_SEARCH_URL`.
 
     Returns:
         str: The corresponding Yahoo Finance symbol.
@@ -21,7 +31,7 @@ def convert_to_yfinance_symbol(symbol: str) -> str:
     if re.match(r"^A\d{6}$", symbol):
         symbol = symbol[1:]
     r = requests.get(
-        f"https://query1.finance.yahoo.com/v1/finance/search?q={symbol}",
+        f"{search_url}?q={symbol}",
         headers={
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36 Edg/126.0.0.0",
         },
@@ -33,18 +43,74 @@ def convert_to_yfinance_symbol(symbol: str) -> str:
     return yfinance_symbol
 
 
-def create_headless_edge_webdriver() -> webdriver.Remote:
+def default_cache_dir() -> Path:
+    """Return the directory where kstock-account keeps its on-disk caches.
+
+    The directory is taken from the `KSTOCK_ACCOUNT_CACHE_DIR` environment
+    variable, falling back to `kstock-account` in the user cache directory.
+
+    Returns:
+        Path: The cache directory. It may not exist yet.
+    """
+    if cache_dir := os.environ.get("KSTOCK_ACCOUNT_CACHE_DIR"):
+        return Path(cache_dir)
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "kstock-account"
+
+
+def create_headless_edge_webdriver(driver_refresh_interval: timedelta = timedelta(days=1)) -> "webdriver.Remote":
     """Create a headless Edge webdriver instance.
 
+    Selenium is imported on the first call, so importing this package does not
+    pay for the browser stack unless a browser is actually started.
+
+    Args:
+        driver_refresh_interval (timedelta, optional): How long the resolved driver
+            binary is reused before checking for a new version. Defaults to 1 day.
+
     Returns:
         webdriver.Remote: A headless Edge webdriver instance.
     """
+    from selenium import webdriver
+    from selenium.webdriver.edge.options import Options
+    from selenium.webdriver.edge.service import Service
+
     options = Options()
     options.add_argument("--headless=new")
-    driver = webdriver.Edge(options=options, service=Service(EdgeChromiumDriverManager().install()))
+    driver = webdriver.Edge(options=options, service=Service(edge_driver_path(driver_refresh_interval)))
     return driver
 
 
+def edge_driver_path(refresh_interval: timedelta = timedelta(days=1)) -> str:
+    """Return the path of the Edge webdriver binary, installing it if needed.
+
+    `webdriver_manager` checks the installed browser version on every install,
+    so the resolved path is cached in `default_cache_dir()` and reused until
+    `refresh_interval` has passed or the binary disappears.
+
+    Args:
+        refresh_interval (timedelta, optional): How long a resolved path is reused. Defaults to 1 day.
+
+    Returns:
+        str: The path of the Edge webdriver binary.
+    """
+    cache_path = default_cache_dir() / "edgedriver.json"
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if time.time() - cached["resolved_at"] < refresh_interval.total_seconds() and os.path.exists(cached["path"]):
+            return str(cached["path"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    from webdriver_manager.microsoft import EdgeChromiumDriverManager
+
+    path = EdgeChromiumDriverManager().install()
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump({"path": path, "resolved_at": time.time()}, f)
+    return path
+
+
 def daterange(start_date: date, end_date: date) -> Iterable[date]:
     """Generate all dates between start_date and end_date (inclusive).
 
@@ -78,3 +144,22 @@ def weekrange(start_date: date, end_date: date) -> Iterable[tuple[date, date]]:
         s = e + timedelta(days=1)
         e = s + timedelta(days=6)
     yield (s, end_date)
+
+
+def _write_atomically(path: Path, content: bytes, mode: Optional[int] = None) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    (fd, temp_path) = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+    try:
+        try:
+            if mode is not None:
+                os.chmod(temp_path, mode)
+            f = os.fdopen(fd, "wb")
+        except BaseException:
+            os.close(fd)
+            raise
+        with f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
@@ -0,0 +1,412 @@
+import asyncio
+import math
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+from kstock_account.mirae import ASSET_REQUESTS, AsyncMiraeAccount, MiraeAccount
+from kstock_account.periods import KRX_CALENDAR
+from kstock_account.schemas import HeldAsset
+
+KST = timezone(timedelta(hours=9), "KST")
+"""Korea Standard Time, the time zone of the Korea Exchange."""
+
+KRX_OPEN = timedelta(hours=9)
+"""The time of day the Korea Exchange regular session opens."""
+
+KRX_CLOSE = timedelta(hours=15, minutes=30)
+"""The time of day the Korea Exchange regular session closes."""
+
+HoldingKey = tuple[str, str]
+"""The account number and symbol that identify a holding across polls."""
+
+
+@dataclass(frozen=True)
+class HoldingEvent:
+    """A dataclass that represents a change to one holding between two polls.
+
+    Cash and cash equivalents have no symbol and are keyed by their name
+    instead. Rows of one account that share a symbol are told apart by a `#2`,
+    `#3`, … suffix in the order the API returns them.
+    """
+
+    account_number: str
+    """The account number of the holding."""
+
+    symbol: str
+    """The symbol of the holding, or the name of a cash asset."""
+
+    @property
+    def key(self) -> HoldingKey:
+        """The account number and symbol of the holding."""
+        return (self.account_number, self.symbol)
+
+
+@dataclass(frozen=True)
+class HoldingAdded(HoldingEvent):
+    """A dataclass that represents a holding that appeared."""
+
+    asset: HeldAsset
+    """The new holding."""
+
+
+@dataclass(frozen=True)
+class HoldingRemoved(HoldingEvent):
+    """A dataclass that represents a holding that disappeared."""
+
+    asset: HeldAsset
+    """The holding as last reported."""
+
+
+@dataclass(frozen=True)
+class QuantityChanged(HoldingEvent):
+    """A dataclass that represents a holding whose quantity changed."""
+
+    previous: HeldAsset
+    """The holding as last reported."""
+
+    current: HeldAsset
+    """The holding now."""
+
+
+@dataclass(frozen=True)
+class ValueMoved(HoldingEvent):
+    """A dataclass that represents a holding whose value moved by more than the threshold."""
+
+    previous: HeldAsset
+    """The holding as last reported."""
+
+    current: HeldAsset
+    """The holding now."""
+
+    @property
+    def change(self) -> float:
+        """The relative change of the value in KRW since the holding was last reported.
+
+        NaN if the holding was last reported with a value of 0.
+        """
+        previous = _krw_value(self.previous)
+        if previous == 0:
+            return math.nan
+        return _krw_value(self.current) / previous - 1.0
+
+
+class HoldingsWatcher:
+    """Polls the holdings of an account and reports only what changed.
+
+    Each poll requests the same endpoints as `get_assets`. The raw body of
+    each response is hashed before it is decoded, and a body that hashes the
+    same as last time is neither decoded nor parsed, nor are its symbols
+    resolved again, so a poll that finds nothing new, the usual case outside
+    trading hours, costs only the requests. Changes are reported as
+    `HoldingAdded`, `HoldingRemoved`, `QuantityChanged` and `ValueMoved`
+    events. The first poll reports every holding as added.
+
+    A value move is measured in KRW against the value last reported for the
+    holding, so slow drifts are reported once they add up to the threshold.
+
+    Attributes:
+        account (MiraeAccount): The account to poll.
+        value_threshold (float): The relative move of a holding's value that is reported.
+        interval (float): The seconds between polls while the market is open.
+        closed_interval (float): The longest wait in seconds between polls while the market is closed.
+        is_market_open (Callable[[datetime], bool]): The function that tells whether the market is open.
+        next_market_open (Optional[Callable[[datetime], datetime]]): The function that tells when the
+            market opens next, if known.
+    """
+
+    def __init__(
+        self,
+        account: MiraeAccount,
+        value_threshold: float = 0.01,
+        interval: float = 60.0,
+        closed_interval: float = 1800.0,
+        is_market_open: Optional[Callable[[datetime], bool]] = None,
+        next_market_open: Optional[Callable[[datetime], datetime]] = None,
+    ) -> None:
+        """Constructs a HoldingsWatcher instance.
+
+        Args:
+            account (MiraeAccount): The account to poll.
+            value_threshold (float, optional): The relative move of a holding's value
+                that is reported. Defaults to 0.01 (1%).
+            interval (float, optional): The seconds between polls while the market is
+                open. Defaults to 60 seconds.
+            closed_interval (float, optional): The longest wait in seconds between polls
+                while the market is closed. The wait is shortened to end when the
+                market opens, if `next_market_open` is known. Defaults to 30 minutes.
+            is_market_open (Optional[Callable[[datetime], bool]]): The function that tells
+                whether the market is open at a time. Defaults to `is_krx_open`.
+            next_market_open (Optional[Callable[[datetime], datetime]]): The function that
+                tells when the market opens next after a time. Defaults to `next_krx_open`
+                if `is_market_open` is not given, and to none otherwise, in which case
+                the wait while the market is closed is always `closed_interval`.
+        """
+        self.account = account
+        self.value_threshold = value_threshold
+        self.interval = interval
+        self.closed_interval = closed_interval
+        if is_market_open is None:
+            (is_market_open, next_market_open) = (is_krx_open, next_market_open or next_krx_open)
+        self.is_market_open = is_market_open
+        self.next_market_open = next_market_open
+        self._feed = _HoldingsFeed()
+
+    def poll(self) -> list[HoldingEvent]:
+        """Requests the holdings once and returns what changed since the last poll.
+
+        Returns:
+            list[HoldingEvent]: The changes, empty if nothing changed.
+        """
+        with self._feed.lock:
+            digests = dict(self._feed.digests)
+        responses = self.account._fetch_changed_asset_payloads(digests)
+        with self._feed.lock:
+            changed = self._feed.changed(responses)
+            if not changed:
+                return []
+            for name, (_, payload) in changed.items():
+                self._feed.assets[name] = self.account._build_assets(name, payload)
+            self._feed.digests.update({name: digest for (name, (digest, _)) in changed.items()})
+            return self._feed.diff(self.value_threshold)
+
+    def next_interval(self, now: Optional[datetime] = None) -> float:
+        """Returns how long to wait before the next poll.
+
+        Args:
+            now (Optional[datetime]): The current time. Defaults to now.
+
+        Returns:
+            float: The wait in seconds.
+        """
+        return _next_interval(self.is_market_open, self.next_market_open, self.interval, self.closed_interval, now)
+
+    def watch(self, stop: Optional[threading.Event] = None) -> Iterator[list[HoldingEvent]]:
+        """Polls until stopped and yields the changes of every poll that found any.
+
+        Args:
+            stop (Optional[threading.Event]): An event that ends the iteration once set.
+                Defaults to polling forever.
+
+        Yields:
+            list[HoldingEvent]: The changes found by one poll.
+        """
+        while stop is None or not stop.is_set():
+            events = self.poll()
+            if events:
+                yield events
+            if stop is None:
+                time.sleep(self.next_interval())
+            else:
+                stop.wait(self.next_interval())
+
+
+class AsyncHoldingsWatcher:
+    """Polls the holdings of an account and reports only what changed.
+
+    The asyncio counterpart of `HoldingsWatcher`.
+
+    Attributes:
+        account (AsyncMiraeAccount): The account to poll.
+        value_threshold (float): The relative move of a holding's value that is reported.
+        interval (float): The seconds between polls while the market is open.
+        closed_interval (float): The longest wait in seconds between polls while the market is closed.
+        is_market_open (Callable[[datetime], bool]): The function that tells whether the market is open.
+        next_market_open (Optional[Callable[[datetime], datetime]]): The function that tells when the
+            market opens next, if known.
+    """
+
+    def __init__(
+        self,
+        account: AsyncMiraeAccount,
+        value_threshold: float = 0.01,
+        interval: float = 60.0,
+        closed_interval: float = 1800.0,
+        is_market_open: Optional[Callable[[datetime], bool]] = None,
+        next_market_open: Optional[Callable[[datetime], datetime]] = None,
+    ) -> None:
+        """Constructs an AsyncHoldingsWatcher instance.
+
+        Args:
+            account (AsyncMiraeAccount): The account to poll.
+            value_threshold (float, optional): The relative move of a holding's value
+                that is reported. Defaults to 0.01 (1%).
+            interval (float, optional): The seconds between polls while the market is
+                open. Defaults to 60 seconds.
+            closed_interval (float, optional): The longest wait in seconds between polls
+                while the market is closed. The wait is shortened to end when the
+                market opens, if `next_market_open` is known. Defaults to 30 minutes.
+            is_market_open (Optional[Callable[[datetime], bool]]): The function that tells
+                whether the market is open at a time. Defaults to `is_krx_open`.
+            next_market_open (Optional[Callable[[datetime], datetime]]): The function that
+                tells when the market opens next after a time. Defaults to `next_krx_open`
+                if `is_market_open` is not given, and to none otherwise, in which case
+                the wait while the market is closed is always `closed_interval`.
+        """
+        self.account = account
+        self.value_threshold = value_threshold
+        self.interval = interval
+        self.closed_interval = closed_interval
+        if is_market_open is None:
+            (is_market_open, next_market_open) = (is_krx_open, next_market_open or next_krx_open)
+        self.is_market_open = is_market_open
+        self.next_market_open = next_market_open
+        self._feed = _HoldingsFeed()
+
+    async def poll(self) -> list[HoldingEvent]:
+        """Requests the holdings once and returns what changed since the last poll.
+
+        Returns:
+            list[HoldingEvent]: The changes, empty if nothing changed.
+        """
+        responses = await self.account._fetch_changed_asset_payloads(dict(self._feed.digests))
+        changed = self._feed.changed(responses)
+        if not changed:
+            return []
+        for name, (_, payload) in changed.items():
+            self._feed.assets[name] = await self.account._build_assets(name, payload)
+        self._feed.digests.update({name: digest for (name, (digest, _)) in changed.items()})
+        return self._feed.diff(self.value_threshold)
+
+    def next_interval(self, now: Optional[datetime] = None) -> float:
+        """Returns how long to wait before the next poll.
+
+        Args:
+            now (Optional[datetime]): The current time. Defaults to now.
+
+        Returns:
+            float: The wait in seconds.
+        """
+        return _next_interval(self.is_market_open, self.next_market_open, self.interval, self.closed_interval, now)
+
+    async def watch(self) -> AsyncIterator[list[HoldingEvent]]:
+        """Polls forever and yields the changes of every poll that found any.
+
+        Cancel the task iterating over the watcher to stop it.
+
+        Yields:
+            list[HoldingEvent]: The changes found by one poll.
+        """
+        while True:
+            events = await self.poll()
+            if events:
+                yield events
+            await asyncio.sleep(self.next_interval())
+
+
+def is_krx_open(at: Optional[datetime] = None) -> bool:
+    """Returns whether the Korea Exchange regular session is open.
+
+    Args:
+        at (Optional[datetime]): The time to check. A naive time is taken as KST.
+            Defaults to now.
+
+    Returns:
+        bool: Whether `at` is within 09:00 to 15:30 KST on a trading day of `KRX_CALENDAR`.
+    """
+    at = _to_kst(at)
+    since_midnight = at - at.replace(hour=0, minute=0, second=0, microsecond=0)
+    return KRX_OPEN <= since_midnight < KRX_CLOSE and KRX_CALENDAR.is_trading_day(at.date())
+
+
+def next_krx_open(at: Optional[datetime] = None) -> datetime:
+    """Returns when the Korea Exchange regular session next opens.
+
+    Args:
+        at (Optional[datetime]): The time to start from. A naive time is taken as KST.
+            Defaults to now.
+
+    Returns:
+        datetime: The next opening time after `at`, in KST.
+    """
+    at = _to_kst(at)
+    opening = at.replace(hour=0, minute=0, second=0, microsecond=0) + KRX_OPEN
+    while opening <= at or not KRX_CALENDAR.is_trading_day(opening.date()):
+        opening += timedelta(days=1)
+    return opening
+
+
+class _HoldingsFeed:
+    def __init__(self) -> None:
+        self.digests: dict[str, bytes] = {}
+        self.assets: dict[str, Sequence[HeldAsset]] = {}
+        self.reported: dict[HoldingKey, HeldAsset] = {}
+        self.lock = threading.Lock()
+
+    def changed(self, responses: dict[str, tuple[bytes, Any]]) -> dict[str, tuple[bytes, Any]]:
+        # A payload is None when its body hashed to the digest it was requested
+        # with. The digests are saved by the caller once the payloads are parsed,
+        # so a payload that fails to parse is parsed again on the next poll.
+        return {
+            name: (digest, payload)
+            for (name, (digest, payload)) in responses.items()
+            if payload is not None and self.digests.get(name) != digest
+        }
+
+    def diff(self, value_threshold: float) -> list[HoldingEvent]:
+        current = _key_assets(asset for name in ASSET_REQUESTS for asset in self.assets.get(name, ()))
+        events: list[HoldingEvent] = []
+        for key, asset in current.items():
+            previous = self.reported.get(key)
+            if previous is None:
+                events.append(HoldingAdded(*key, asset))
+            elif getattr(asset, "quantity", None) != getattr(previous, "quantity", None):
+                events.append(QuantityChanged(*key, previous, asset))
+            elif _moved(previous, asset, value_threshold):
+                events.append(ValueMoved(*key, previous, asset))
+            else:
+                continue
+            self.reported[key] = asset
+        for key in [key for key in self.reported if key not in current]:
+            events.append(HoldingRemoved(*key, self.reported.pop(key)))
+        return events
+
+
+def _next_interval(
+    is_market_open: Callable[[datetime], bool],
+    next_market_open: Optional[Callable[[datetime], datetime]],
+    interval: float,
+    closed_interval: float,
+    now: Optional[datetime],
+) -> float:
+    now = _to_kst(now)
+    if is_market_open(now):
+        return interval
+    if next_market_open is None:
+        return closed_interval
+    return max(interval, min(closed_interval, (next_market_open(now) - now).total_seconds()))
+
+
+def _to_kst(at: Optional[datetime]) -> datetime:
+    if at is None:
+        return datetime.now(KST)
+    if at.tzinfo is None:
+        return at.replace(tzinfo=KST)
+    return at.astimezone(KST)
+
+
+def _key_assets(assets: Iterable[HeldAsset]) -> dict[HoldingKey, HeldAsset]:
+    keyed: dict[HoldingKey, HeldAsset] = {}
+    for asset in assets:
+        symbol = getattr(asset, "symbol", asset.name)
+        key = (asset.account_number, symbol)
+        occurrence = 1
+        while key in keyed:
+            occurrence += 1
+            key = (asset.account_number, f"{symbol}#{occurrence}")
+        keyed[key] = asset
+    return keyed
+
+
+def _moved(previous: HeldAsset, current: HeldAsset, threshold: float) -> bool:
+    (before, after) = (_krw_value(previous), _krw_value(current))
+    if before == 0:
+        return after != 0
+    return abs(after / before - 1.0) > threshold
+
+
+def _krw_value(asset: HeldAsset) -> float:
+    return asset.market_value * asset.exchange_rate
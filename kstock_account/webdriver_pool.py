@@ -0,0 +1,105 @@
+import queue
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+from typing import TYPE_CHECKING, Callable
+
+from kstock_account.utils import create_headless_edge_webdriver
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+
+class WebDriverPool:
+    """A pool of long-lived webdrivers that are reused across logins.
+
+    Drivers are created on demand, up to `size` of them, and handed out one
+    caller at a time. Cookies are cleared when a driver is returned, so each
+    login starts from a clean cookie context. A driver that raised a
+    `WebDriverException` while in use is shut down and replaced instead of being
+    returned.
+
+    Attributes:
+        size (int): The maximum number of drivers.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        webdriver_fn: Callable[[], "webdriver.Remote"] = create_headless_edge_webdriver,
+    ) -> None:
+        """Constructs a WebDriverPool instance.
+
+        Args:
+            size (int, optional): The maximum number of drivers. Defaults to 4.
+            webdriver_fn (Callable[[], webdriver.Remote], optional): A function that creates
+                a webdriver instance. Defaults to `create_headless_edge_webdriver`.
+        """
+        self.size = size
+        self.webdriver_fn = webdriver_fn
+        self._idle: queue.LifoQueue[webdriver.Remote] = queue.LifoQueue()
+        self._drivers: list[webdriver.Remote] = []
+        self._lock = threading.Lock()
+        self._available = threading.Semaphore(size)
+
+    @contextmanager
+    def driver(self) -> Iterator["webdriver.Remote"]:
+        """Borrows a driver from the pool for the duration of a `with` block.
+
+        Yields:
+            webdriver.Remote: A driver with no cookies set.
+        """
+        from selenium.common.exceptions import WebDriverException
+
+        with self._available:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self.webdriver_fn()
+                with self._lock:
+                    self._drivers.append(driver)
+            healthy = True
+            try:
+                yield driver
+            except WebDriverException:
+                healthy = False
+                raise
+            finally:
+                if healthy:
+                    try:
+                        driver.delete_all_cookies()
+                        self._idle.put(driver)
+                    except WebDriverException:
+                        self._discard(driver)
+                else:
+                    self._discard(driver)
+
+    def close(self) -> None:
+        """Shuts every driver in the pool down."""
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            _quit(driver)
+        while not self._idle.empty():
+            self._idle.get_nowait()
+
+    def __enter__(self) -> "WebDriverPool":
+        """Returns the pool itself."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Shuts every driver in the pool down."""
+        self.close()
+
+    def _discard(self, driver: "webdriver.Remote") -> None:
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        _quit(driver)
+
+
+def _quit(driver: "webdriver.Remote") -> None:
+    from selenium.common.exceptions import WebDriverException
+
+    with suppress(WebDriverException):
+        driver.quit()
@@ -0,0 +1,11 @@
+from collections.abc import Iterator
+
+import pytest
+from stub_server import StubBroker
+
+
+@pytest.fixture
+def broker() -> Iterator[StubBroker]:
+    """Runs a stub broker for the test."""
+    with StubBroker() as broker:
+        yield broker
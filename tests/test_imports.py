@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+import pytest
+
+LAZY_IMPORTS = {
+    "kstock_account.mirae": ("selenium", "webdriver_manager"),
+    "kstock_account.prices": ("yfinance", "pandas"),
+}
+"""The packages that importing each module must not load, because they are only imported when used."""
+
+IMPORT_TIME_BUDGET = 1.0
+"""The most seconds importing a module may take in a fresh interpreter."""
+
+
+@pytest.mark.parametrize(("module", "packages"), LAZY_IMPORTS.items())
+def test_lazy_imports(module: str, packages: tuple[str, ...]) -> None:
+    """Imports a module in a fresh interpreter without loading its optional packages."""
+    code = (
+        "import sys, time\n"
+        "started_at = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - started_at)\n"
+        f"print(' '.join(p for p in {packages!r} if p in sys.modules))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    (elapsed, loaded) = output.split("\n", 1)
+    assert loaded.split() == []
+    assert float(elapsed) < IMPORT_TIME_BUDGET
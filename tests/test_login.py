@@ -0,0 +1,51 @@
+from typing import Any
+
+import pytest
+from stub_server import ACCESS_TOKEN, USER_PASSWORD, StubBroker
+
+from kstock_account.exceptions import LoginFailedException
+from kstock_account.mirae import MiraeAccount, _login_with_http
+from kstock_account.transport import MiraeTransport
+
+
+class _BrowserStarted(Exception):
+    pass
+
+
+def _no_webdriver() -> Any:
+    raise _BrowserStarted
+
+
+def test_http_login(broker: StubBroker) -> None:
+    """Logs in over HTTP with the right password."""
+    assert _login_with_http("user", USER_PASSWORD, broker.url) == ACCESS_TOKEN
+
+
+def test_http_login_with_wrong_password(broker: StubBroker) -> None:
+    """Rejects a login that is sent back to the login form, despite its cookie."""
+    with pytest.raises(LoginFailedException):
+        _login_with_http("user", "wrong-password", broker.url)
+
+
+def test_login_over_http(broker: StubBroker) -> None:
+    """Logs in without starting a browser."""
+    account = MiraeAccount.login(
+        "user",
+        USER_PASSWORD,
+        webdriver_fn=_no_webdriver,
+        transport=MiraeTransport(base_url=broker.url),
+        http_login=True,
+    )
+    assert account.access_token == ACCESS_TOKEN
+
+
+def test_login_with_wrong_password_falls_back_to_browser(broker: StubBroker) -> None:
+    """Falls back to the browser login when the HTTP login is rejected."""
+    with pytest.raises(_BrowserStarted):
+        MiraeAccount.login(
+            "user",
+            "wrong-password",
+            webdriver_fn=_no_webdriver,
+            transport=MiraeTransport(base_url=broker.url),
+            http_login=True,
+        )
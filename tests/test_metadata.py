@@ -0,0 +1,41 @@
+import threading
+
+from kstock_account.metadata import MetadataCache
+
+
+def _load_while(cache, key, during):
+    started = threading.Event()
+    release = threading.Event()
+
+    def loader():
+        started.set()
+        release.wait()
+        return key
+
+    thread = threading.Thread(target=cache.get, args=(key, loader))
+    thread.start()
+    started.wait()
+    during()
+    release.set()
+    thread.join()
+
+
+def test_invalidating_a_key_keeps_other_loads():
+    """Invalidating one key does not discard a load of another key in flight."""
+    cache = MetadataCache()
+    _load_while(cache, "a", lambda: cache.invalidate("b"))
+    assert cache.get("a", lambda: "reloaded") == "a"
+
+
+def test_invalidating_a_key_discards_its_load():
+    """Invalidating a key discards a load of it in flight."""
+    cache = MetadataCache()
+    _load_while(cache, "a", lambda: cache.invalidate("a"))
+    assert cache.get("a", lambda: "reloaded") == "reloaded"
+
+
+def test_invalidating_everything_discards_every_load():
+    """Invalidating every key discards a load in flight."""
+    cache = MetadataCache()
+    _load_while(cache, "a", lambda: cache.invalidate())
+    assert cache.get("a", lambda: "reloaded") == "reloaded"
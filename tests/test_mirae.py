@@ -0,0 +1,57 @@
+import asyncio
+from datetime import date
+from functools import partial
+
+import numpy as np
+from stub_server import ACCESS_TOKEN, StubBroker
+
+from kstock_account.history_store import HistoryStore
+from kstock_account.mirae import AsyncMiraeAccount, MiraeAccount
+from kstock_account.symbols import SymbolCache, SymbolResolver
+from kstock_account.transport import AsyncMiraeTransport, MiraeTransport
+from kstock_account.utils import convert_to_yfinance_symbol
+
+START_DATE = date(2024, 1, 1)
+END_DATE = date(2024, 3, 31)
+
+
+def _symbol_resolver(broker: StubBroker) -> SymbolResolver:
+    lookup_fn = partial(convert_to_yfinance_symbol, search_url=broker.yahoo_search_url)
+    return SymbolResolver(SymbolCache(":memory:"), lookup_fn)
+
+
+def test_async_account_matches_account(broker: StubBroker) -> None:
+    """Returns the same assets and history from both accounts."""
+    account = MiraeAccount(ACCESS_TOKEN, MiraeTransport(base_url=broker.url), _symbol_resolver(broker))
+    async_account = AsyncMiraeAccount(ACCESS_TOKEN, AsyncMiraeTransport(base_url=broker.url), _symbol_resolver(broker))
+
+    async def fetch() -> tuple[object, ...]:
+        return (
+            await async_account.get_assets(),
+            await async_account.get_history(START_DATE, END_DATE),
+            await async_account.get_histories(START_DATE, END_DATE),
+            await async_account.get_history_frame(START_DATE, END_DATE),
+            [record async for record in async_account.iter_history(START_DATE, END_DATE)],
+        )
+
+    (assets, history, histories, frame, records) = asyncio.run(fetch())
+    assert assets == account.get_assets()
+    assert history == account.get_history(START_DATE, END_DATE, max_workers=4)
+    assert histories == account.get_histories(START_DATE, END_DATE)
+    assert np.array_equal(frame, account.get_history_frame(START_DATE, END_DATE))
+    assert records == list(account.iter_history(START_DATE, END_DATE, max_workers=4)) == history
+
+
+def test_history_store_serves_closed_weeks(broker: StubBroker) -> None:
+    """Requests the closed weeks once, whichever account asks first."""
+    history_store = HistoryStore(":memory:")
+    account = MiraeAccount(ACCESS_TOKEN, MiraeTransport(base_url=broker.url), history_store=history_store)
+    async_account = AsyncMiraeAccount(
+        ACCESS_TOKEN,
+        AsyncMiraeTransport(base_url=broker.url),
+        history_store=history_store,
+    )
+    history = account.sync_history(START_DATE, END_DATE)
+    request_count = broker.request_count
+    assert asyncio.run(async_account.sync_history(START_DATE, END_DATE)) == history
+    assert broker.request_count == request_count + 1
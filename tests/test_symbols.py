@@ -0,0 +1,21 @@
+import pytest
+
+from kstock_account import symbols
+from kstock_account.mirae import MiraeAccount
+
+
+def test_default_resolver_is_created_on_first_use(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Constructs an account without touching the cache directory."""
+    monkeypatch.setattr(symbols, "_default_symbol_resolver", None)
+    account = MiraeAccount("token")
+    assert symbols._default_symbol_resolver is None
+    assert account.symbol_resolver is symbols.default_symbol_resolver()
+
+
+def test_default_resolver_without_cache_dir(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keeps the symbol cache in memory if the cache directory cannot be created."""
+    monkeypatch.setattr(symbols, "_default_symbol_resolver", None)
+    monkeypatch.setenv("KSTOCK_ACCOUNT_CACHE_DIR", "/proc/kstock-account")
+    resolver = symbols.default_symbol_resolver()
+    resolver.cache.set("005930", "005930.KS")
+    assert resolver.cache.get("005930") == (True, "005930.KS")
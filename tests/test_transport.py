@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+from stub_server import StubBroker
+
+from kstock_account.exceptions import SessionExpiredException
+from kstock_account.mirae import HOLDING_PATH
+from kstock_account.resilience import CircuitBreaker
+from kstock_account.transport import AsyncMiraeTransport, MiraeTransport
+
+
+def _open_circuit_breaker() -> CircuitBreaker:
+    circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    circuit_breaker.record_failure()
+    return circuit_breaker
+
+
+def test_session_expiry_leaves_circuit_open(broker: StubBroker) -> None:
+    """Neither closes the circuit nor blocks the next trial call on a non-transient error."""
+    circuit_breaker = _open_circuit_breaker()
+    transport = MiraeTransport(base_url=broker.url, circuit_breaker=circuit_breaker)
+    with pytest.raises(SessionExpiredException):
+        transport.post("/mw/login.do")
+    assert circuit_breaker.is_open
+    transport.post(HOLDING_PATH)
+    assert not circuit_breaker.is_open
+
+
+def test_async_session_expiry_leaves_circuit_open(broker: StubBroker) -> None:
+    """Neither closes the circuit nor blocks the next trial call on a non-transient error."""
+    circuit_breaker = _open_circuit_breaker()
+
+    async def post() -> None:
+        async with AsyncMiraeTransport(base_url=broker.url, circuit_breaker=circuit_breaker) as transport:
+            with pytest.raises(SessionExpiredException):
+                await transport.post("/mw/login.do")
+            assert circuit_breaker.is_open
+            await transport.post(HOLDING_PATH)
+
+    asyncio.run(post())
+    assert not circuit_breaker.is_open
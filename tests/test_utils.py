@@ -0,0 +1,41 @@
+import os
+import stat
+import tempfile
+from pathlib import Path
+from typing import Any, NoReturn
+
+import pytest
+
+from kstock_account.utils import _write_atomically
+
+
+def test_write_atomically(tmp_path: Path) -> None:
+    """Replaces the file with the content and the given mode."""
+    path = tmp_path / "tokens.json"
+    path.write_bytes(b"old")
+    _write_atomically(path, b"new", mode=0o600)
+    assert path.read_bytes() == b"new"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_write_atomically_when_open_fails(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Closes and removes the temporary file if it cannot be opened."""
+    fds = []
+    mkstemp = tempfile.mkstemp
+
+    def recording_mkstemp(*args: Any, **kwargs: Any) -> tuple[int, str]:
+        (fd, path) = mkstemp(*args, **kwargs)
+        fds.append(fd)
+        return (fd, path)
+
+    def failing_fdopen(*args: Any, **kwargs: Any) -> NoReturn:
+        raise OSError("fdopen failed")
+
+    monkeypatch.setattr(tempfile, "mkstemp", recording_mkstemp)
+    monkeypatch.setattr(os, "fdopen", failing_fdopen)
+    with pytest.raises(OSError, match="fdopen failed"):
+        _write_atomically(tmp_path / "tokens.json", b"new")
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(OSError):
+        os.fstat(fds[0])
@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta, timezone
+
+from kstock_account.watch import HoldingsWatcher
+
+KST = timezone(timedelta(hours=9))
+
+
+def test_custom_calendar_waits_closed_interval():
+    """A custom is_market_open without next_market_open waits closed_interval while closed."""
+    watcher = HoldingsWatcher(None, closed_interval=600.0, is_market_open=lambda now: False)  # type: ignore[arg-type]
+    # 08:59 KST on a weekday is one minute before KRX opens, which must not shorten the wait.
+    assert watcher.next_interval(datetime(2024, 7, 2, 8, 59, tzinfo=KST)) == 600.0
+
+
+def test_custom_calendar_uses_next_market_open():
+    """A custom next_market_open shortens the wait to the next open."""
+    watcher = HoldingsWatcher(
+        None,  # type: ignore[arg-type]
+        interval=60.0,
+        closed_interval=1800.0,
+        is_market_open=lambda now: False,
+        next_market_open=lambda now: now + timedelta(seconds=300),
+    )
+    assert watcher.next_interval(datetime(2024, 7, 2, 20, 0, tzinfo=KST)) == 300.0
+
+
+def test_krx_calendar_waits_until_open():
+    """The default KRX calendar shortens the wait to the KRX open."""
+    watcher = HoldingsWatcher(None, closed_interval=1800.0)  # type: ignore[arg-type]
+    assert watcher.next_interval(datetime(2024, 7, 2, 8, 55, tzinfo=KST)) == 300.0